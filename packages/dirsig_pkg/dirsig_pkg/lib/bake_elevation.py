@@ -0,0 +1,137 @@
+#---------------------------------------
+# Copyright 2019-2025 DADoES, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License in the root directory in the "LICENSE" file or at:
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#---------------------------------------
+
+# Offline baking of terrain heightfield sidecars for the dirsig-shared
+# backgrounds. Run against a local copy of the volume, then upload the
+# generated files alongside the elevation glists:
+#
+#   python -m dirsig_pkg.lib.bake_elevation --volume /path/to/dirsig-shared
+#
+# Each elevation glist gets a memory-mappable <name>.heightfield.npy and a
+# <name>.heightfield.json header (origin, spacing, bounds, source hash).
+# Terrains too large for one grid (or any, with --pyramid) get a tiled
+# <name>.heightfield.pyramid/ directory instead. terrain.load_heightfield()
+# uses them at runtime when the hash matches.
+
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+from dirsig_pkg.lib.geometry_files import glist_portable_hash
+from dirsig_pkg.lib.terrain import (
+    ELEVATION_GLISTS,
+    Heightfield,
+    HeightfieldPyramid,
+    needs_pyramid,
+    pyramid_sidecar_path,
+    sidecar_path,
+    terrain_vertices,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def bake(elevation_glist_path, output_dir=None, spacing=None, force=False, pyramid=None,
+         tile_size=512):
+    """Bake the heightfield sidecar for one elevation glist.
+
+    ``pyramid`` forces (True) or suppresses (False) a tiled pyramid; by
+    default one is baked when a single grid would be too large.
+
+    Returns the path of the written (or already up to date) ``.npy`` or
+    pyramid directory.
+    """
+    elevation_glist_path = Path(elevation_glist_path)
+    npyPath = sidecar_path(elevation_glist_path)
+    pyramidRoot = pyramid_sidecar_path(elevation_glist_path)
+    if output_dir is not None:
+        npyPath = Path(output_dir) / npyPath.name
+        pyramidRoot = Path(output_dir) / pyramidRoot.name
+    sourceHash = glist_portable_hash(elevation_glist_path)
+
+    if not force:
+        for headerPath, target in ((pyramidRoot / HeightfieldPyramid.HEADER, pyramidRoot),
+                                   (npyPath.with_suffix(".json"), npyPath)):
+            if not headerPath.exists():
+                continue
+            if json.loads(headerPath.read_text()).get("source_hash") == sourceHash:
+                logger.info(f"{target} is up to date")
+                return target
+
+    vertices = terrain_vertices(elevation_glist_path)
+    if pyramid is None:
+        pyramid = needs_pyramid(vertices, spacing)
+    if pyramid:
+        built = HeightfieldPyramid.build(
+            elevation_glist_path, pyramidRoot, spacing=spacing, tile_size=tile_size,
+            source_hash=sourceHash, vertices=vertices,
+        )
+        ny, nx = built.shape
+        logger.info(
+            f"Wrote {pyramidRoot} ({nx}x{ny}, {built.tile_size} sample tiles, "
+            f"spacing {built.spacing[0]:.2f} m)"
+        )
+        return pyramidRoot
+
+    heightfield = Heightfield.from_glist(elevation_glist_path, spacing=spacing, vertices=vertices)
+    heightfield.source_hash = sourceHash
+    npyPath.parent.mkdir(parents=True, exist_ok=True)
+    heightfield.save(npyPath)
+    logger.info(
+        f"Wrote {npyPath} ({heightfield.shape[1]}x{heightfield.shape[0]}, "
+        f"spacing {heightfield.spacing[0]:.2f} m)"
+    )
+    return npyPath
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Bake terrain heightfield sidecars for the dirsig-shared backgrounds."
+    )
+    parser.add_argument("--volume", required=True, type=Path,
+                        help="Root of a local copy of the dirsig-shared volume")
+    parser.add_argument("--background", action="append", choices=sorted(ELEVATION_GLISTS),
+                        help="Background to bake (repeatable; default: all)")
+    parser.add_argument("--output-dir", type=Path, default=None,
+                        help="Write sidecars here instead of next to each glist")
+    parser.add_argument("--spacing", type=float, default=None,
+                        help="Grid spacing in meters (default: from mesh density)")
+    parser.add_argument("--force", action="store_true",
+                        help="Rebake even when the existing sidecar hash matches")
+    parser.add_argument("--pyramid", action="store_true", default=None,
+                        help="Bake a tiled pyramid even for terrains that fit one grid")
+    parser.add_argument("--tile-size", type=int, default=512,
+                        help="Pyramid tile size in samples (default: 512)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    failed = []
+    for name in args.background or sorted(ELEVATION_GLISTS):
+        relPath = ELEVATION_GLISTS[name].split(":", 1)[1]
+        glistPath = args.volume / relPath
+        outputDir = args.output_dir / name if args.output_dir else None
+        try:
+            bake(glistPath, output_dir=outputDir, spacing=args.spacing, force=args.force,
+                 pyramid=args.pyramid, tile_size=args.tile_size)
+        except (OSError, ValueError) as e:
+            logger.error(f"{name}: {e}")
+            failed.append(name)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
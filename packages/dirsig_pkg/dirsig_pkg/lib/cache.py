@@ -0,0 +1,119 @@
+#---------------------------------------
+# Copyright 2019-2025 DADoES, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License in the root directory in the "LICENSE" file or at:
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#---------------------------------------
+
+# Helpers for the persistent, machine-wide caches used by the channel (terrain
+# heightfields, compiled elevation scenes, ...). Everything lives under one
+# root so a single environment variable can move it onto local NVMe.
+
+import os
+import hashlib
+import tempfile
+import time
+from pathlib import Path
+
+CACHE_ROOT_ENV = "DIRSIG_PKG_CACHE"
+
+
+def cache_root():
+    """Return the root directory of the channel's persistent caches.
+
+    Defaults to ``<tmp>/dirsig_pkg_cache`` and can be overridden with the
+    ``DIRSIG_PKG_CACHE`` environment variable.
+    """
+    root = os.environ.get(CACHE_ROOT_ENV)
+    if root:
+        return Path(root)
+    return Path(tempfile.gettempdir()) / "dirsig_pkg_cache"
+
+
+def cache_dir(name):
+    """Return (and create) the cache subdirectory ``name``."""
+    path = cache_root() / name
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def file_key(path):
+    """Cheap identity of a file on disk: path + mtime + size."""
+    path = Path(path)
+    stat = path.stat()
+    return "{}|{}|{}".format(path, stat.st_mtime_ns, stat.st_size)
+
+
+def files_digest(paths, seed=""):
+    """Hex digest over the identity of several files.
+
+    Files that do not exist contribute their path only, so a missing
+    reference changes the digest once it appears.
+    """
+    h = hashlib.sha1(seed.encode())
+    for path in paths:
+        try:
+            h.update(file_key(path).encode())
+        except OSError:
+            h.update(str(path).encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def cache_limit_bytes(name, default_mb):
+    """Size cap of cache ``name`` in bytes.
+
+    Overridable per cache with ``DIRSIG_PKG_CACHE_<NAME>_MB``.
+    """
+    env = "DIRSIG_PKG_CACHE_{}_MB".format(name.upper())
+    return int(float(os.environ.get(env, default_mb)) * 1024 * 1024)
+
+
+def touch(path):
+    """Mark a cache entry as recently used."""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def prune_lru(directory, max_bytes, keep=(), min_age=0):
+    """Delete least recently used files until ``directory`` fits ``max_bytes``.
+
+    Recency is the file mtime, which :func:`touch` refreshes on every cache
+    hit. Paths in ``keep`` are never removed, nor are files used within the
+    last ``min_age`` seconds, which another process may be about to read.
+    """
+    keep = {Path(p).resolve() for p in keep}
+    cutoff = time.time() - min_age
+    entries = []
+    for path in Path(directory).iterdir():
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        if path.is_file():
+            entries.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    for mtime, size, path in sorted(entries, key=lambda e: e[0]):
+        if total <= max_bytes:
+            break
+        if mtime > cutoff:
+            break
+        if path.resolve() in keep:
+            continue
+        try:
+            path.unlink()
+            total -= size
+        except OSError:
+            pass
+    return total
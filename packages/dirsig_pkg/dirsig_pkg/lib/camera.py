@@ -24,6 +24,24 @@ import os
 
 PACKAGE_ROOT = os.path.join('packages', 'dirsig_pkg', 'dirsig_pkg')
 
+def pixel_ifov(pixel_pitch, focal_length):
+    """Instantaneous field of view of one detector element.
+
+    Args:
+        pixel_pitch (float): The detector pitch in microns.
+        focal_length (float): The focal length in mm.
+
+    Returns:
+        The angle subtended by one pixel, in radians.
+
+    The sensor builders below return it alongside the sensor plugin as
+    ``(sensor, ifov)``; sensor nodes pass it on as the ``ifov`` of their
+    sensor assets for the nadir GSD estimate (None when the mount does not
+    look down).
+    """
+    return pixel_pitch * 1e-3 / focal_length
+
+
 def instrument(instrument_name, focal_length, focal_plane=None, aperture_diameter=None, aperture_throughput=None):
     """Creates a DIRSIG generic instrument with specified optical properties.
 
@@ -157,6 +175,7 @@ def rgb_camera(
         schedule="simulation", detector_clock_rate=30
     ):
     sensorName = "RGB Camera"
+    pixelPitch = 10
 
     #Spectral Response
     platformFilepath = Path(PACKAGE_ROOT) / "platform" / "rgb_camera_spectralresponse.json"
@@ -169,7 +188,7 @@ def rgb_camera(
     focalPlane.set_detector_array(
         ps.DetectorArray("microns")
         .set_clock(ps.IndependentDetectorClock(detector_clock_rate, 0))
-        .set_elements(1280, 720, 10, 10, 10, 10, 0, 0, False, True)
+        .set_elements(1280, 720, pixelPitch, pixelPitch, pixelPitch, pixelPitch, 0, 0, False, True)
         )
     
     #Set truth bands
@@ -179,7 +198,7 @@ def rgb_camera(
     focalPlane.set_truth_collection(truthCollection)
 
     # Sensor
-    rgbInstrument = instrument(sensorName, focal_length=35, focal_plane=focalPlane)
+    rgbInstrument = instrument(sensorName, focal_length=focal_length, focal_plane=focalPlane)
 
     staticMount = ps.StaticMount("Static Mount")
     staticMount.set_rotation(
@@ -192,12 +211,16 @@ def rgb_camera(
     mountAttachment = ps.Attachment(staticMount)
     mountAttachment.add_attachment(ps.Attachment(rgbInstrument))
     sensor = ps.PlatformSensorPlugin().add_attachment(mountAttachment)
+    # Nadir GSD estimates only hold for an unrotated mount
+    ifov = pixel_ifov(pixelPitch, focal_length) if not any(rotation) else None
 
-    return sensor
+    return sensor, ifov
 
 
 def wv3_sensor(truth_bands=[], schedule="simulation", detector_clock_rate=30):
     sensorName = "WV3"
+    pixelPitch = 20
+    focalLength = 10000
 
     #Spectral Response
     platformFilepath = Path(PACKAGE_ROOT) / "platform" / "wv3_640x480_spectralresponse.json"
@@ -210,7 +233,7 @@ def wv3_sensor(truth_bands=[], schedule="simulation", detector_clock_rate=30):
     focalPlane.set_detector_array(
         ps.DetectorArray("microns")
         .set_clock(ps.IndependentDetectorClock(detector_clock_rate, 0))
-        .set_elements(640, 480, 20, 20, 20, 20, 0, 0, False, True)
+        .set_elements(640, 480, pixelPitch, pixelPitch, pixelPitch, pixelPitch, 0, 0, False, True)
         )
     
     #Set truth bands
@@ -220,17 +243,19 @@ def wv3_sensor(truth_bands=[], schedule="simulation", detector_clock_rate=30):
     focalPlane.set_truth_collection(truthCollection)
     
     # Sensor
-    wv3Instrument = instrument(sensorName, focal_length=10000, focal_plane=focalPlane)
+    wv3Instrument = instrument(sensorName, focal_length=focalLength, focal_plane=focalPlane)
 
     mountAttachment = ps.Attachment(ps.StaticMount("Static Mount"))
     mountAttachment.add_attachment(ps.Attachment(wv3Instrument))
     sensor = ps.PlatformSensorPlugin().add_attachment(mountAttachment)
 
-    return sensor
+    return sensor, pixel_ifov(pixelPitch, focalLength)
 
 
 def skysat_sensor(truth_bands=[], schedule="simulation", detector_clock_rate=30):
     sensorName = "SkySat"
+    pixelPitch = 6.5
+    focalLength = 3600
     
     #Spectral Response
     platformFilepath = Path(PACKAGE_ROOT) / "platform" / "planet_skysat_1024x768_spectralresponse.json"
@@ -243,7 +268,7 @@ def skysat_sensor(truth_bands=[], schedule="simulation", detector_clock_rate=30)
     focalPlane.set_detector_array(
         ps.DetectorArray("microns")
         .set_clock(ps.IndependentDetectorClock(detector_clock_rate, 0))
-        .set_elements(1024, 768, 6.5, 6.5, 6.5, 6.5, 0, 0, False, True)
+        .set_elements(1024, 768, pixelPitch, pixelPitch, pixelPitch, pixelPitch, 0, 0, False, True)
         )
     
     #Set truth bands
@@ -253,17 +278,19 @@ def skysat_sensor(truth_bands=[], schedule="simulation", detector_clock_rate=30)
     focalPlane.set_truth_collection(truthCollection)
     
     # Sensor
-    skysatInstrument = instrument(sensorName, focal_length=3600, aperture_diameter=0.35, aperture_throughput=1, focal_plane=focalPlane)
+    skysatInstrument = instrument(sensorName, focal_length=focalLength, aperture_diameter=0.35, aperture_throughput=1, focal_plane=focalPlane)
 
     mountAttachment = ps.Attachment(ps.StaticMount("Static Mount"))
     mountAttachment.add_attachment(ps.Attachment(skysatInstrument))
     sensor = ps.PlatformSensorPlugin().add_attachment(mountAttachment)
 
-    return sensor
+    return sensor, pixel_ifov(pixelPitch, focalLength)
 
 
 def superdove_sensor(truth_bands=[], schedule="simulation", detector_clock_rate=30):
     sensorName = "SuperDove"
+    pixelPitch = 8.0
+    focalLength = 1140
 
     #Spectral Response
     platformFilepath = Path(PACKAGE_ROOT) / "platform" / "planet_superdove_640x480_spectralresponse.json"
@@ -276,7 +303,7 @@ def superdove_sensor(truth_bands=[], schedule="simulation", detector_clock_rate=
     focalPlane.set_detector_array(
         ps.DetectorArray("microns")
         .set_clock(ps.IndependentDetectorClock(detector_clock_rate, 0))
-        .set_elements(640, 480, 8.0, 8.0, 8.0, 8.0, 0, 0, False, True)
+        .set_elements(640, 480, pixelPitch, pixelPitch, pixelPitch, pixelPitch, 0, 0, False, True)
         )
     
     #Set truth bands
@@ -286,17 +313,19 @@ def superdove_sensor(truth_bands=[], schedule="simulation", detector_clock_rate=
     focalPlane.set_truth_collection(truthCollection)
     
     # Sensor
-    superdoveInstrument = instrument(sensorName, focal_length=1140, aperture_diameter=0.09, aperture_throughput=1, focal_plane=focalPlane)
+    superdoveInstrument = instrument(sensorName, focal_length=focalLength, aperture_diameter=0.09, aperture_throughput=1, focal_plane=focalPlane)
 
     mountAttachment = ps.Attachment(ps.StaticMount("Static Mount"))
     mountAttachment.add_attachment(ps.Attachment(superdoveInstrument))
     sensor = ps.PlatformSensorPlugin().add_attachment(mountAttachment)
 
-    return sensor
+    return sensor, pixel_ifov(pixelPitch, focalLength)
 
 
 def aviris_sensor(truth_bands=[], schedule="simulation", detector_clock_rate=1000):
     sensorName = "AVIRIS"
+    pixelPitch = 200
+    focalLength = 197.6
     
     #Spectral Response
     platformFilepath = Path(PACKAGE_ROOT) / "platform" / "aviris_spectralresponse.json"
@@ -309,7 +338,7 @@ def aviris_sensor(truth_bands=[], schedule="simulation", detector_clock_rate=100
     focalPlane.set_detector_array(
         ps.DetectorArray("microns")
         .set_clock(ps.IndependentDetectorClock(detector_clock_rate, 0))
-        .set_elements(667, 512, 200, 200, 200, 200, 0, 0, False, False)
+        .set_elements(667, 512, pixelPitch, pixelPitch, pixelPitch, pixelPitch, 0, 0, False, False)
         )
     
     #Set truth bands
@@ -319,13 +348,13 @@ def aviris_sensor(truth_bands=[], schedule="simulation", detector_clock_rate=100
     focalPlane.set_truth_collection(truthCollection)
     
     # Sensor
-    avirisInstrument = instrument(sensorName, focal_length=197.6, aperture_diameter=0.2, focal_plane=focalPlane)
+    avirisInstrument = instrument(sensorName, focal_length=focalLength, aperture_diameter=0.2, focal_plane=focalPlane)
 
     mountAttachment = ps.Attachment(ps.StaticMount("Static Mount"))
     mountAttachment.add_attachment(ps.Attachment(avirisInstrument))
     sensor = ps.PlatformSensorPlugin().add_attachment(mountAttachment)
 
-    return sensor
+    return sensor, pixel_ifov(pixelPitch, focalLength)
 
 
 def thermal_sensor(integration_time=None, band_limits=[8, 14], focal_length=1142, resolution=(400, 260), pixel_pitch=8, truth_bands=[], schedule="simulation", detector_clock_rate=25, psf=None):
@@ -355,6 +384,7 @@ def thermal_sensor(integration_time=None, band_limits=[8, 14], focal_length=1142
 def altumPT_sensor(resolution=(2064, 1544), truth_bands=[], rgb_only=False, use_real_integration_times=False, detector_clock_rate=30, schedule="simulation", add_pan=False, override_focal_length=None, mount_orientation="Down", pan_only=False, sensor_name=None):
     sensorName = sensor_name if sensor_name else "AltumPT"
     datatype = 4
+    pixelPitch = 3.45
 
     imgbasename = '{:010}-{}'.format(ctx.interp_num, sensorName)
     truthCollection = None
@@ -410,7 +440,7 @@ def altumPT_sensor(resolution=(2064, 1544), truth_bands=[], rgb_only=False, use_
     if not pan_only:
         msi_img_basename = f"{imgbasename}_MSI"
         msi_img_file = ps.ImageFile(msi_img_basename, schedule=schedule)
-        msi_detector = detector_array(resolution=resolution, pixel_pitch=3.45, detector_clock_rate=detector_clock_rate)
+        msi_detector = detector_array(resolution=resolution, pixel_pitch=pixelPitch, detector_clock_rate=detector_clock_rate)
         msi_focal_plane = focal_plane("MSI", msi_img_file, msi_spectral_response, dirfm_detector_array=msi_detector)
         if truthCollection:
             msi_focal_plane.set_truth_collection(truthCollection)
@@ -420,7 +450,7 @@ def altumPT_sensor(resolution=(2064, 1544), truth_bands=[], rgb_only=False, use_
     pan_img_file = ps.ImageFile(pan_img_basename, schedule=schedule)
     # PAN resolution is 2x MSI when used alongside MSI, otherwise use resolution directly
     pan_resolution = resolution if pan_only else (resolution[0]*2, resolution[1]*2)
-    pan_detector = detector_array(resolution=pan_resolution, pixel_pitch=3.45, detector_clock_rate=detector_clock_rate)
+    pan_detector = detector_array(resolution=pan_resolution, pixel_pitch=pixelPitch, detector_clock_rate=detector_clock_rate)
     pan_focal_plane = focal_plane("PAN", pan_img_file, pan_spectral_response, dirfm_detector_array=pan_detector)
 
     if pan_only:
@@ -463,4 +493,12 @@ def altumPT_sensor(resolution=(2064, 1544), truth_bands=[], rgb_only=False, use_
             mountAttachment.add_attachment(ps.Attachment(panInstrument))
     sensor.add_attachment(mountAttachment)
 
-    return sensor
+    # Finest pixel of the attached focal planes; nadir GSD needs a downward mount
+    if mount_orientation == "Forward":
+        ifov = None
+    elif pan_only or (not rgb_only and add_pan):
+        ifov = pixel_ifov(pixelPitch, pan_focal_length)
+    else:
+        ifov = pixel_ifov(pixelPitch, msi_focal_length)
+
+    return sensor, ifov
@@ -0,0 +1,291 @@
+#---------------------------------------
+# Copyright 2019-2025 DADoES, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License in the root directory in the "LICENSE" file or at:
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#---------------------------------------
+
+# In-process readers for the DIRSIG geometry files the channel references:
+# Wavefront OBJ vertex data and the file references / static instance
+# transforms of a glist. These let the channel answer geometry questions
+# without starting DIRSIG tools.
+
+import os
+import re
+import json
+import hashlib
+import logging
+import threading
+import time
+from pathlib import Path
+import numpy as np
+from lxml.etree import parse
+from dirsig_pkg.lib.cache import cache_dir, files_digest
+
+logger = logging.getLogger(__name__)
+
+_OBJ_VERTEX_RE = re.compile(rb'^v[ \t]+(\S+)[ \t]+(\S+)[ \t]+(\S+)', re.MULTILINE)
+_OBJ_FACE_RE = re.compile(rb'^f[ \t]+([^\r\n]*)', re.MULTILINE)
+_OBJ_USEMTL_RE = re.compile(rb'^usemtl[ \t]+(\S+)', re.MULTILINE)
+
+
+def read_obj_vertices(obj_path):
+    """Return the ``v`` records of a Wavefront OBJ as an (N, 3) float array.
+
+    Extra per-vertex columns (w or vertex colors) are ignored.
+    """
+    data = Path(obj_path).read_bytes()
+    records = _OBJ_VERTEX_RE.findall(data)
+    if not records:
+        return np.zeros((0, 3))
+    return np.array(records, dtype=float)
+
+
+def obj_triangles(obj_path):
+    """Number of triangles in a Wavefront OBJ once polygons are fanned."""
+    data = Path(obj_path).read_bytes()
+    return sum(max(len(face.split()) - 2, 0) for face in _OBJ_FACE_RE.findall(data))
+
+
+def obj_material_names(obj_path):
+    """Material names (``usemtl``) used by a Wavefront OBJ, in first-use order."""
+    data = Path(obj_path).read_bytes()
+    return list(dict.fromkeys(name.decode() for name in _OBJ_USEMTL_RE.findall(data)))
+
+
+def obj_bounds(obj_path):
+    """Axis-aligned bounding box of a Wavefront OBJ as ``(min_xyz, max_xyz)``.
+
+    Raises:
+        ValueError: if the OBJ has no vertices.
+    """
+    vertices = read_obj_vertices(obj_path)
+    if not len(vertices):
+        raise ValueError(f"{obj_path}: no vertices")
+    return vertices.min(axis=0), vertices.max(axis=0)
+
+
+def _triple(elem, default):
+    """Read an x/y/z triple from a glist transform element."""
+    if elem is None:
+        return np.array(default, dtype=float)
+    values = []
+    for axis in ("x", "y", "z"):
+        child = elem.find(".//" + axis)
+        if child is None:
+            break
+        values.append(float(child.text))
+    if len(values) == 3:
+        return np.array(values)
+    # Compact form: "<point>1, 2, 3</point>"
+    text = " ".join(t.strip() for t in elem.itertext() if t.strip())
+    return np.array([float(v) for v in re.split(r"[,\s]+", text) if v][:3])
+
+
+def glist_referenced_files(glist_path, recursive=True):
+    """Return every file referenced by a glist, following nested glists.
+
+    Paths are resolved relative to the directory of the glist that
+    references them. The glist itself is not included. With
+    ``recursive=False`` only the glist's own references are returned.
+    """
+    glist_path = Path(glist_path)
+    found = []
+    seen = {glist_path.resolve()}
+    stack = [glist_path]
+    while stack:
+        current = stack.pop()
+        tree = parse(str(current))
+        for elem in tree.getroot().iter("filename"):
+            if not elem.text:
+                continue
+            ref = current.parent / elem.text.strip()
+            found.append(ref)
+            if recursive and ref.suffix == ".glist" and ref.resolve() not in seen and ref.exists():
+                seen.add(ref.resolve())
+                stack.append(ref)
+    return found
+
+
+def glist_source_hash(glist_path):
+    """Digest identifying a glist's content and every file it references."""
+    glist_path = Path(glist_path)
+    return files_digest(
+        [glist_path] + sorted(glist_referenced_files(glist_path)),
+        seed=glist_path.read_text(),
+    )
+
+
+def glist_portable_hash(glist_path):
+    """Location-independent digest of a glist and the files it references.
+
+    Hashes the glist text plus the relative path and size of each
+    referenced file, so it survives copying the volume between machines
+    (which changes absolute paths and mtimes). Used to validate baked
+    sidecars that ship with the volume content.
+    """
+    glist_path = Path(glist_path)
+    h = hashlib.sha1(glist_path.read_bytes())
+    for ref in sorted(glist_referenced_files(glist_path)):
+        try:
+            size = ref.stat().st_size
+        except OSError:
+            size = -1
+        h.update("{}|{}\0".format(os.path.relpath(ref, glist_path.parent), size).encode())
+    return h.hexdigest()
+
+
+def glist_wavefront_instances(glist_path, scale=(1, 1, 1), translation=(0, 0, 0)):
+    """Flatten a glist into ``(obj_path, scale, translation)`` placements.
+
+    Only static instances with translation and scale are supported, which
+    covers the terrain elevation glists shipped with each background.
+
+    Raises:
+        ValueError: if an instance is rotated or uses an instance type whose
+            placement cannot be resolved from the glist alone.
+    """
+    glist_path = Path(glist_path)
+    scale = np.asarray(scale, dtype=float)
+    translation = np.asarray(translation, dtype=float)
+    placements = []
+    tree = parse(str(glist_path))
+    for obj in tree.getroot().iter("object"):
+        base = obj.find("basegeometry")
+        if base is None:
+            continue
+        instances = obj.findall("staticinstance")
+        if not instances:
+            if len(obj) > 1:
+                raise ValueError(
+                    f"{glist_path}: only static instances can be flattened"
+                )
+            instances = [None]
+        for inst in instances:
+            if inst is not None:
+                rot = _triple(inst.find("rotation"), [0, 0, 0])
+                if np.any(np.abs(rot) > 1e-9):
+                    raise ValueError(f"{glist_path}: rotated instances are not supported")
+                s = _triple(inst.find("scale"), [1, 1, 1])
+                t = _triple(inst.find("translation"), [0, 0, 0])
+            else:
+                s, t = np.ones(3), np.zeros(3)
+            inst_scale = scale * s
+            inst_translation = translation + scale * t
+            for geom in base:
+                filename = geom.find("filename")
+                if filename is None or not filename.text:
+                    continue
+                ref = glist_path.parent / filename.text.strip()
+                if ref.suffix == ".obj":
+                    placements.append((ref, inst_scale, inst_translation))
+                elif ref.suffix == ".glist":
+                    placements.extend(
+                        glist_wavefront_instances(ref, inst_scale, inst_translation)
+                    )
+    return placements
+
+
+def glist_placements(glist_path):
+    """Like :func:`glist_wavefront_instances`, falling back for rotated instances.
+
+    Glists it cannot flatten place their first referenced OBJ untransformed,
+    which is what ``object_tool`` reported for them.
+    """
+    glist_path = Path(glist_path)
+    try:
+        return glist_wavefront_instances(glist_path)
+    except ValueError:
+        objs = [p for p in glist_referenced_files(glist_path) if p.suffix == ".obj"]
+        return [(objs[0], np.ones(3), np.zeros(3))] if objs else []
+
+
+def glist_bounds(glist_path):
+    """Axis-aligned bounding box of the Wavefront geometry a glist places.
+
+    Raises:
+        ValueError: if the glist references no Wavefront geometry.
+    """
+    placements = glist_placements(glist_path)
+    if not placements:
+        raise ValueError(f"{glist_path}: no Wavefront geometry")
+    lows, highs = [], []
+    for objPath, scale, trans in placements:
+        low, high = obj_bounds(objPath)
+        corners = np.stack([low * scale + trans, high * scale + trans])
+        lows.append(corners.min(axis=0))
+        highs.append(corners.max(axis=0))
+    return np.min(lows, axis=0), np.max(highs, axis=0)
+
+
+# Sizes saved in sizes.json, dropping the least recently used beyond this
+SIZE_CACHE_ENTRIES = 50000
+
+_SIZES = None
+_SIZES_LOCK = threading.Lock()
+
+
+def _size_cache_path():
+    return cache_dir("object_size") / "sizes.json"
+
+
+def _read_size_cache():
+    """``{key: {"size": [x, y, z], "used": unix time}}`` saved by earlier runs."""
+    try:
+        entries = json.loads(_size_cache_path().read_text())
+    except (OSError, ValueError):
+        return {}
+    return {k: v for k, v in entries.items() if isinstance(v, dict) and "size" in v}
+
+
+def _save_size_cache(entries):
+    """Merge ``entries`` into the saved cache, keep the most recent ones and replace it."""
+    merged = _read_size_cache()
+    merged.update(entries)
+    if len(merged) > SIZE_CACHE_ENTRIES:
+        recent = sorted(merged.items(), key=lambda item: item[1]["used"], reverse=True)
+        merged = dict(recent[:SIZE_CACHE_ENTRIES])
+    cachePath = _size_cache_path()
+    tmpPath = cachePath.with_name(f"{cachePath.name}.{os.getpid()}.tmp")
+    try:
+        tmpPath.write_text(json.dumps(merged, separators=(",", ":")))
+        os.replace(tmpPath, cachePath)
+    except OSError as e:
+        logger.warning(f"Could not save the object size cache ({e})")
+    return merged
+
+
+def glist_size(glist_path):
+    """``[x, y, z]`` extent of a glist's geometry in meters.
+
+    Sizes are kept in ``<cache>/object_size/sizes.json``, keyed by the path
+    and mtime of the glist and every file it references, so a size is only
+    computed once per asset version across runs. Entries written by other
+    processes are merged in on save, and only the ``SIZE_CACHE_ENTRIES``
+    most recently used are kept.
+    """
+    global _SIZES
+    glist_path = Path(glist_path)
+    key = glist_source_hash(glist_path)
+    with _SIZES_LOCK:
+        if _SIZES is None:
+            _SIZES = _read_size_cache()
+        entry = _SIZES.get(key)
+        if entry is not None:
+            entry["used"] = time.time()
+            return list(entry["size"])
+    low, high = glist_bounds(glist_path)
+    size = [float(v) for v in high - low]
+    with _SIZES_LOCK:
+        _SIZES[key] = {"size": size, "used": time.time()}
+        _SIZES = _save_size_cache(_SIZES)
+    return size
@@ -0,0 +1,453 @@
+#---------------------------------------
+# Copyright 2019-2025 DADoES, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License in the root directory in the "LICENSE" file or at:
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#---------------------------------------
+
+# Level of detail for scene geometry and texture maps, chosen from the
+# sensor's ground sample distance (GSD). Background nodes run before the
+# sensor is known, so they hand DIRSIG a per-run "slot" path from
+# lod_wavefront() instead of the OBJ itself, and set drape-projected maps
+# through lod_texture(). Once Simulate has estimated the GSD, resolve_lod()
+# links every slot to the coarsest cached variant of its mesh whose geometric
+# error is still a fraction of a pixel, and re-points every map at the
+# coarsest mip level that still oversamples the GSD.
+#
+#   <cache>/mesh_lod/<source digest>.json          triangle count and error per level
+#   <cache>/mesh_lod/<source digest>.L<k>.obj      mesh decimated to 1/4^k triangles
+#   <cache>/texture_mips/<source digest>.json      image size
+#   <cache>/texture_mips/<source digest>.L<k>.<ext> image downsampled by 2^k
+#
+# Set DIRSIG_PKG_LOD=0 to always render full-resolution meshes and maps.
+
+import os
+import json
+import hashlib
+import logging
+import shutil
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import numpy as np
+import cv2
+from dirsig_pkg.lib.cache import cache_dir, cache_limit_bytes, files_digest, prune_lru, touch
+from dirsig_pkg.lib.staging import PRUNE_GRACE_SECONDS, stage
+from dirsig_pkg.lib.workspace import run_workspace
+
+logger = logging.getLogger(__name__)
+
+LOD_ENV = "DIRSIG_PKG_LOD"
+
+# Variant k keeps about 1 / LOD_REDUCTION**k of the source triangles
+LOD_LEVELS = 3
+LOD_REDUCTION = 4
+# Largest vertex displacement allowed in a variant, as a fraction of the GSD
+LOD_PIXEL_FRACTION = 0.5
+
+# Map texels per GSD the chosen mip level must keep, and its smallest side
+TEXTURE_OVERSAMPLE = 2
+MIN_TEXTURE_SIZE = 16
+
+EARTH_RADIUS = 6371000.0
+
+
+def lod_enabled():
+    return os.environ.get(LOD_ENV, "1") != "0"
+
+
+def estimate_gsd(sensor_assets, ground_altitude=0.0):
+    """Estimate the finest nadir ground sample distance of a sensor, in meters.
+
+    Uses the ``ifov`` (radians per pixel) of the sensor assets and the
+    lowest height of the platform's flex motion trajectory above the
+    ground. Geodetic and ECEF positions are measured from the ellipsoid, so
+    ``ground_altitude`` (the scene origin altitude, meters) is subtracted
+    from them; scene frame positions are already relative to the origin.
+    Returns None when either is unknown, e.g. for forward looking mounts or
+    motion not built by the flex motion nodes.
+    """
+    ifov = sensor_assets.get("ifov")
+    locationEngine = getattr(sensor_assets.get("motion"), "engines", (None, None))[0]
+    trajectory = getattr(locationEngine, "trajectory", None)
+    if ifov is None or trajectory is None:
+        return None
+    if trajectory.frame == "ecef":
+        altitude = np.linalg.norm(trajectory.positions, axis=1) - EARTH_RADIUS - ground_altitude
+    elif trajectory.frame == "geodetic":
+        altitude = trajectory.positions[:, 2] - ground_altitude
+    else:
+        altitude = trajectory.positions[:, 2]
+    altitude = float(altitude.min())
+    if altitude <= 0:
+        return None
+    return altitude * ifov
+
+
+class ObjMesh:
+    """Wavefront OBJ held as a triangle list for decimation.
+
+    Every line other than ``v`` and ``f`` records (groups, ``usemtl``,
+    texture coordinates, normals) is written back unchanged, so material
+    assignments survive. Polygons are fan-triangulated.
+    """
+
+    def __init__(self, path):
+        self.items = []
+        vertices = []
+        triangles = []
+        suffixes = []
+        with open(path) as f:
+            for line in f:
+                if line.startswith("v "):
+                    if not vertices:
+                        self.items.append(None)
+                    vertices.append(line.split()[1:4])
+                elif line.startswith("f "):
+                    corners = []
+                    for token in line.split()[1:]:
+                        index, _, rest = token.partition("/")
+                        index = int(index)
+                        corners.append((index - 1 if index > 0 else len(vertices) + index,
+                                        "/" + rest if rest else ""))
+                    start = len(triangles) // 3
+                    for i in range(1, len(corners) - 1):
+                        for v, suffix in (corners[0], corners[i], corners[i + 1]):
+                            triangles.append(v)
+                            suffixes.append(suffix)
+                    self.items.append((start, len(triangles) // 3))
+                else:
+                    self.items.append(line)
+        self.vertices = np.array(vertices, dtype=float).reshape(-1, 3)
+        self.triangles = np.array(triangles, dtype=np.int64).reshape(-1, 3)
+        self.suffixes = suffixes
+
+    def cluster(self, cell):
+        """Snap vertices to a ``cell`` sized grid.
+
+        Returns ``(labels, positions, keep)``: the cluster of every vertex,
+        the mean position of every cluster, and which triangles survive
+        (not collapsed and not duplicating an earlier triangle).
+        """
+        cells = np.floor((self.vertices - self.vertices.min(axis=0)) / cell).astype(np.int64)
+        _, labels = np.unique(cells, axis=0, return_inverse=True)
+        labels = labels.reshape(-1)
+        counts = np.bincount(labels)
+        positions = np.stack(
+            [np.bincount(labels, self.vertices[:, axis]) / counts for axis in range(3)], axis=-1
+        )
+        tri = labels[self.triangles]
+        keep = (tri[:, 0] != tri[:, 1]) & (tri[:, 1] != tri[:, 2]) & (tri[:, 0] != tri[:, 2])
+        _, first = np.unique(np.sort(tri[keep], axis=1), axis=0, return_index=True)
+        unique = np.zeros(int(keep.sum()), dtype=bool)
+        unique[first] = True
+        keep[keep] = unique
+        return labels, positions, keep
+
+    def cell_for_budget(self, budget, iterations=16):
+        """Smallest clustering cell that leaves at most ``budget`` triangles."""
+        extent = np.ptp(self.vertices, axis=0).max()
+        lo, hi = extent * 1e-6, extent * 2
+        for _ in range(iterations):
+            mid = np.sqrt(lo * hi)
+            if self.cluster(mid)[2].sum() > budget:
+                lo = mid
+            else:
+                hi = mid
+        return hi
+
+    def write(self, path, cell):
+        """Write the mesh clustered at ``cell``; returns the triangle count."""
+        labels, positions, keep = self.cluster(cell)
+        with open(path, "w") as f:
+            for item in self.items:
+                if item is None:
+                    f.writelines(f"v {x:.6f} {y:.6f} {z:.6f}\n" for x, y, z in positions)
+                elif isinstance(item, tuple):
+                    start, end = item
+                    for t in range(start, end):
+                        if keep[t]:
+                            f.write("f " + " ".join(
+                                f"{labels[self.triangles[t, c]] + 1}{self.suffixes[3 * t + c]}"
+                                for c in range(3)
+                            ) + "\n")
+                else:
+                    f.write(item)
+        return int(keep.sum())
+
+
+class MeshLodCache:
+    """Decimated variants of OBJ files, keyed by source identity and level.
+
+    Variants are built on demand, coarsening one level at a time until a
+    level's geometric error exceeds what was asked for, so an asset never
+    has more than one unused level built. The cache is kept below
+    ``DIRSIG_PKG_CACHE_MESH_LOD_MB`` (default 4 GB).
+    """
+
+    def __init__(self, root=None):
+        self.root = Path(root) if root is not None else cache_dir("mesh_lod")
+
+    def _read_index(self, key):
+        try:
+            return json.loads((self.root / f"{key}.json").read_text())
+        except (OSError, ValueError):
+            return {"levels": {}}
+
+    def _write_index(self, key, index):
+        tmpPath = self.root / f"{key}.json.{os.getpid()}.tmp"
+        tmpPath.write_text(json.dumps(index))
+        os.replace(tmpPath, self.root / f"{key}.json")
+
+    def variant(self, source, mesh_path, max_error):
+        """Coarsest variant of ``source`` with error below ``max_error`` meters.
+
+        ``source`` identifies the asset (its volume path); ``mesh_path`` is
+        the file read when a variant has to be built. Returns ``mesh_path``
+        when no decimated level is accurate enough.
+        """
+        key = files_digest([source], seed="mesh_lod")
+        index = self._read_index(key)
+        mesh = None
+        chosen = mesh_path
+        for level in range(1, LOD_LEVELS + 1):
+            variantPath = self.root / f"{key}.L{level}.obj"
+            entry = index["levels"].get(str(level))
+            if entry is None or (entry["error"] <= max_error and not variantPath.exists()):
+                if mesh is None:
+                    mesh = ObjMesh(mesh_path)
+                    index["triangles"] = len(mesh.triangles)
+                if len(mesh.triangles) == 0:
+                    break
+                cell = mesh.cell_for_budget(len(mesh.triangles) / LOD_REDUCTION ** level)
+                tmpPath = self.root / f"{key}.L{level}.{os.getpid()}.tmp"
+                triangles = mesh.write(tmpPath, cell)
+                os.replace(tmpPath, variantPath)
+                # A vertex moves at most one cell diagonal
+                entry = {"triangles": triangles, "error": float(cell * np.sqrt(3))}
+                index["levels"][str(level)] = entry
+                self._write_index(key, index)
+            if entry["error"] > max_error:
+                break
+            chosen = variantPath
+            touch(variantPath)
+        return chosen
+
+    def prune(self):
+        prune_lru(self.root, cache_limit_bytes("mesh_lod", 4096), min_age=PRUNE_GRACE_SECONDS)
+
+
+class TexturePyramid:
+    """Mip levels of an image map, keyed by source identity.
+
+    Level ``k`` halves level ``k - 1`` with area averaging (odd sizes round
+    up); normal maps are renormalized after averaging. Levels are built on
+    demand and cached below ``DIRSIG_PKG_CACHE_TEXTURE_MIPS_MB`` (default
+    2 GB).
+    """
+
+    def __init__(self, source, image_path, normal=False, root=None):
+        self.root = Path(root) if root is not None else cache_dir("texture_mips")
+        self.image_path = Path(image_path)
+        self.normal = normal
+        self.key = files_digest([source], seed=f"texture_mips:{normal}")
+
+    def shape(self):
+        """(height, width) of the full-resolution image."""
+        indexPath = self.root / f"{self.key}.json"
+        try:
+            return tuple(json.loads(indexPath.read_text())["shape"])
+        except (OSError, ValueError, KeyError):
+            pass
+        shape = self._read(self.image_path).shape[:2]
+        tmpPath = self.root / f"{self.key}.json.{os.getpid()}.tmp"
+        tmpPath.write_text(json.dumps({"shape": shape}))
+        os.replace(tmpPath, indexPath)
+        return shape
+
+    def level_for(self, pixel_size, max_texel):
+        """Coarsest level whose texels (``pixel_size * 2**k``) fit ``max_texel``."""
+        if pixel_size >= max_texel:
+            return 0
+        level = int(np.floor(np.log2(max_texel / pixel_size)))
+        # Stop before the image gets smaller than MIN_TEXTURE_SIZE on a side
+        level = min(level, int(np.floor(np.log2(max(min(self.shape()) / MIN_TEXTURE_SIZE, 1)))))
+        return max(level, 0)
+
+    def level_pixel_size(self, pixel_size, level):
+        """Projection pixel size that keeps level ``level`` on the source footprint."""
+        width = self.shape()[1]
+        levelWidth = width
+        for _ in range(level):
+            levelWidth = (levelWidth + 1) // 2
+        return pixel_size * width / levelWidth
+
+    @staticmethod
+    def _read(path):
+        image = cv2.imread(str(path), cv2.IMREAD_UNCHANGED)
+        if image is None:
+            raise ValueError(f"Cannot read image {path}")
+        return image
+
+    def level(self, level):
+        """Path of mip ``level`` (0 is the source image), building it if needed."""
+        if level == 0:
+            return self.image_path
+        levelPath = self.root / f"{self.key}.L{level}{self.image_path.suffix}"
+        if levelPath.exists():
+            touch(levelPath)
+            return levelPath
+        image = self._read(self.level(level - 1))
+        height, width = image.shape[:2]
+        size = ((width + 1) // 2, (height + 1) // 2)
+        if self.normal and image.ndim == 3 and np.issubdtype(image.dtype, np.integer):
+            half = np.iinfo(image.dtype).max / 2
+            vectors = cv2.resize(image.astype(np.float32) / half - 1, size, interpolation=cv2.INTER_AREA)
+            vectors[..., :3] /= np.maximum(np.linalg.norm(vectors[..., :3], axis=-1, keepdims=True), 1e-6)
+            small = np.clip(np.rint((vectors + 1) * half), 0, 2 * half).astype(image.dtype)
+        else:
+            small = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+        tmpPath = self.root / f"{self.key}.L{level}.{os.getpid()}.tmp{self.image_path.suffix}"
+        if not cv2.imwrite(str(tmpPath), small):
+            raise OSError(f"Cannot write {tmpPath}")
+        os.replace(tmpPath, levelPath)
+        return levelPath
+
+
+# Slot path -> source OBJ for the meshes of the current run
+_SLOTS = {}
+
+
+def lod_wavefront(path):
+    """Path to give ``glist.Wavefront`` for an OBJ that may be decimated.
+
+    Returns a slot in the run workspace that :func:`resolve_lod` later links
+    to the variant matching the sensor GSD. Falls back to :func:`stage` when
+    LOD is disabled or the file does not exist.
+    """
+    path = Path(path)
+    if not lod_enabled() or not path.is_file():
+        return stage(path)
+    digest = hashlib.sha1(str(path.resolve()).encode()).hexdigest()[:16]
+    slotPath = run_workspace().file("lod", digest, path.name)
+    _SLOTS[slotPath] = path
+    return slotPath
+
+
+# id(material) -> (weak reference, {setter: [make_map, source, pixel_size, normal, level]})
+_TEXTURES = {}
+
+
+def lod_texture(material, setter, make_map, path, pixel_size, normal=False):
+    """Set a drape-projected map on ``material`` at a GSD-driven mip level.
+
+    ``make_map(image_path, pixel_size)`` builds the map object and
+    ``setter`` names the material method that takes it (``set_normal_map``,
+    ``set_material_map``, ...). The full-resolution map is set now;
+    :func:`resolve_lod` sets it again with the chosen mip level and the
+    matching projection pixel size.
+    """
+    path = Path(path)
+    getattr(material, setter)(make_map(stage(path), pixel_size))
+    if lod_enabled() and path.is_file():
+        _, maps = _TEXTURES.setdefault(id(material), (weakref.ref(material), {}))
+        maps[setter] = [make_map, path, pixel_size, normal, 0]
+    return material
+
+
+def _link(target, slot_path):
+    """Point a workspace ``slot_path`` at ``target`` (hard link, copy as fallback).
+
+    The slot never refers to the cache entry by name, so pruning the cache
+    cannot pull a file from under a render.
+    """
+    if slot_path.exists() and os.path.samefile(target, slot_path):
+        return
+    tmpPath = slot_path.with_name(f".{slot_path.name}.{os.getpid()}")
+    try:
+        os.link(target, tmpPath)
+    except OSError:
+        shutil.copyfile(target, tmpPath)
+    os.replace(tmpPath, slot_path)
+
+
+def _resolve_meshes(gsd):
+    global _SLOTS
+    slots, _SLOTS = _SLOTS, {}
+    slots = {slot: source for slot, source in slots.items() if slot.parent.exists()}
+    if not slots:
+        return
+    cache = MeshLodCache()
+    maxError = None if gsd is None else gsd * LOD_PIXEL_FRACTION
+
+    def resolve(item):
+        slotPath, source = item
+        staged = target = stage(source, wait=True)
+        if maxError is not None:
+            try:
+                target = cache.variant(source, staged, maxError)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not decimate {source} ({e}); using full resolution")
+        _link(target, slotPath)
+        return target != staged
+
+    with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as pool:
+        reduced = sum(pool.map(resolve, slots.items()))
+    if gsd is None:
+        logger.info(f"GSD unknown; rendering {len(slots)} meshes at full resolution")
+    else:
+        logger.info(f"Using decimated variants for {reduced} of {len(slots)} meshes at {gsd:.2f} m GSD")
+    cache.prune()
+
+
+def _resolve_textures(gsd):
+    for key, (materialRef, maps) in list(_TEXTURES.items()):
+        material = materialRef()
+        if material is None:
+            del _TEXTURES[key]
+            continue
+        for setter, entry in maps.items():
+            make_map, source, pixelSize, normal, current = entry
+            staged = imagePath = stage(source, wait=True)
+            level, levelPixelSize = 0, pixelSize
+            if gsd is not None:
+                pyramid = TexturePyramid(source, staged, normal)
+                try:
+                    level = pyramid.level_for(pixelSize, gsd / TEXTURE_OVERSAMPLE)
+                    imagePath = pyramid.level(level)
+                    levelPixelSize = pyramid.level_pixel_size(pixelSize, level)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Could not build mip levels of {source} ({e}); using full resolution")
+                    level, imagePath, levelPixelSize = 0, staged, pixelSize
+            if level == current:
+                continue
+            if level > 0:
+                slotPath = run_workspace().file("mips", imagePath.name)
+                _link(imagePath, slotPath)
+                imagePath = slotPath
+            getattr(material, setter)(make_map(imagePath, levelPixelSize))
+            entry[4] = level
+            logger.info(f"Using mip level {level} of {source.name} ({levelPixelSize:g} m texels)")
+    if gsd is not None:
+        prune_lru(cache_dir("texture_mips"), cache_limit_bytes("texture_mips", 2048),
+                  min_age=PRUNE_GRACE_SECONDS)
+
+
+def resolve_lod(gsd):
+    """Apply the level of detail suited to a ``gsd`` (m) to the run's scene.
+
+    Mesh slots are linked to their decimated variants and maps set through
+    :func:`lod_texture` are switched to their mip levels. With an unknown
+    GSD everything is used at full resolution.
+    """
+    _resolve_meshes(gsd)
+    _resolve_textures(gsd)
@@ -22,6 +22,8 @@ from dirfm import materials as m
 from dirfm.utilities.material_manager import MasterMaterialList
 
 from anatools.lib.package_utils import get_volume_path
+from dirsig_pkg.lib.lod import lod_texture
+from dirsig_pkg.lib.staging import stage
 
 map_path = Path(get_volume_path("dirsig_pkg", "dirsig-shared:Desert_Highway_v2")) / "maps"
 curve_path = (
@@ -30,6 +32,16 @@ curve_path = (
 forest_materials_path = Path(get_volume_path("dirsig_pkg", "dirsig-shared:Forest")) / "materials"
 europe_materials_path = Path(get_volume_path("dirsig_pkg", "dirsig-shared:Europe7km-11-July-2024")) / "Europe7km" / "materials"
 
+
+def _repeating_normal_map(image_path, pixel_size):
+    return m.NormalMap(
+        image_path,
+        m.DrapeProjection(
+            [0, 0], pixel_size, origin="cartesian", extendx="repeat", extendy="repeat"
+        ),
+    )
+
+
 def create_mml(road_type="Paved"):
     """Create and return a MasterMaterialList with configurable road type.
     
@@ -109,14 +121,10 @@ def create_mml(road_type="Paved"):
             .add_surface_properties(
                 m.SimpleReflectanceSurfaceProperty(asphalt_r[:, 0], asphalt_r[:, 1])
             )
-            .set_normal_map(
-                m.NormalMap(
-                    map_path / "Asphalt-Normal.png",
-                    m.DrapeProjection(
-                        [0, 0], 0.001, origin="cartesian", extendx="repeat", extendy="repeat"
-                    ),
-                )
-            )
+        )
+        lod_texture(
+            mml["Road"], "set_normal_map", _repeating_normal_map,
+            map_path / "Asphalt-Normal.png", 0.001, normal=True,
         )
     else:
         mml.add_entry(
@@ -135,18 +143,14 @@ def create_mml(road_type="Paved"):
             )
             .add_surface_properties(
                 m.ClassicEmissivitySurfaceProperty(
-                    ems=europe_materials_path / "dirt_micro_no.ems",
+                    ems=stage(europe_materials_path / "dirt_micro_no.ems"),
                     specularity=0
                 )
             )
-            .set_normal_map(
-                m.NormalMap(
-                    map_path / "Dirt-Normal.jpg",
-                    m.DrapeProjection(
-                        [0, 0], 0.001, origin="cartesian", extendx="repeat", extendy="repeat"
-                    ),
-                )
-            )
+        )
+        lod_texture(
+            mml["Road"], "set_normal_map", _repeating_normal_map,
+            map_path / "Dirt-Normal.jpg", 0.001, normal=True,
         )
 
     # WhiteLine: bright matte white paint on Paved roads; blends into dirt when unpaved.
@@ -167,14 +171,10 @@ def create_mml(road_type="Paved"):
             )
             # Ward BRDF: ~70% diffuse + low specular + slight roughness ~ matte white paint.
             .add_surface_properties(m.WardBrdfSurfaceProperty([0.7, 0.05], [0.1, 0.1]))
-            .set_normal_map(
-                m.NormalMap(
-                    map_path / "Asphalt-Normal.png",
-                    m.DrapeProjection(
-                        [0, 0], 0.001, origin="cartesian", extendx="repeat", extendy="repeat"
-                    ),
-                )
-            )
+        )
+        lod_texture(
+            mml["WhiteLine"], "set_normal_map", _repeating_normal_map,
+            map_path / "Asphalt-Normal.png", 0.001, normal=True,
         )
     else:
         # For dirt roads, make WhiteLine look like dirt (same as Road)
@@ -194,18 +194,14 @@ def create_mml(road_type="Paved"):
             )
             .add_surface_properties(
                 m.ClassicEmissivitySurfaceProperty(
-                    ems=europe_materials_path / "dirt_micro_no.ems",
+                    ems=stage(europe_materials_path / "dirt_micro_no.ems"),
                     specularity=0
                 )
             )
-            .set_normal_map(
-                m.NormalMap(
-                    map_path / "Dirt-Normal.jpg",
-                    m.DrapeProjection(
-                        [0, 0], 0.001, origin="cartesian", extendx="repeat", extendy="repeat"
-                    ),
-                )
-            )
+        )
+        lod_texture(
+            mml["WhiteLine"], "set_normal_map", _repeating_normal_map,
+            map_path / "Dirt-Normal.jpg", 0.001, normal=True,
         )
 
     soil_idx_list = [0, 2, 5]
@@ -234,23 +230,21 @@ def create_mml(road_type="Paved"):
     mml.add_entry(
         m.Material("Terrain", True, ID="Terrain")
         .set_rad_solver(m.SimpleRadiationSolver("LOW"))
-        .set_normal_map(
-            m.NormalMap(
-                map_path / "Asphalt-Normal.png",
-                m.DrapeProjection(
-                    [0, 0], 0.001, origin="cartesian", extendx="repeat", extendy="repeat"
-                ),
-            )
-        )
-        .set_material_map(
-            m.MaterialMap(
-                "Gradient",
-                map_path / "Terrain.png",
-                m.DrapeProjection([0, 0], 6, origin="cartesian"),
-                [(0, mml["Soil-0000"]), (128, mml["Soil-0001"]), (255, mml["Soil-0002"])],
-            )
-        )
     )
+    lod_texture(
+        mml["Terrain"], "set_normal_map", _repeating_normal_map,
+        map_path / "Asphalt-Normal.png", 0.001, normal=True,
+    )
+
+    def terrain_material_map(image_path, pixel_size):
+        return m.MaterialMap(
+            "Gradient",
+            image_path,
+            m.DrapeProjection([0, 0], pixel_size, origin="cartesian"),
+            [(0, mml["Soil-0000"]), (128, mml["Soil-0001"]), (255, mml["Soil-0002"])],
+        )
+
+    lod_texture(mml["Terrain"], "set_material_map", terrain_material_map, map_path / "Terrain.png", 6)
 
     for grass_idx in range(8):
         name = "Dry-Grass-{:04d}".format(grass_idx)
@@ -22,6 +22,7 @@ from dirfm import materials as m
 from dirfm.utilities.material_manager import MasterMaterialList
 
 from anatools.lib.package_utils import get_volume_path
+from dirsig_pkg.lib.lod import lod_texture
 
 mml = MasterMaterialList()
 
@@ -35,16 +36,6 @@ terrain_r = np.loadtxt(curve_path / "soil.txt")
 mml.add_entry(
     m.Material("Terrain", True, ID="Terrain")
     .set_rad_solver(m.SimpleRadiationSolver("LOW"))
-    .set_bump_map(
-        m.BumpMap(
-            "dirt_bump",
-            map_path / "dirt_bump.jpg",
-            m.DrapeProjection(
-                [0, 0], 0.01, origin="cartesian", extendx="repeat", extendy="repeat"
-            ),
-            0.1,
-        )
-    )
     .set_temp_solver(
             m.ThermTempSolver(
                 specific_heat=0.370,
@@ -61,6 +52,20 @@ mml.add_entry(
     )
 )
 
+
+def _dirt_bump_map(image_path, pixel_size):
+    return m.BumpMap(
+        "dirt_bump",
+        image_path,
+        m.DrapeProjection(
+            [0, 0], pixel_size, origin="cartesian", extendx="repeat", extendy="repeat"
+        ),
+        0.1,
+    )
+
+
+lod_texture(mml["Terrain"], "set_bump_map", _dirt_bump_map, map_path / "dirt_bump.jpg", 0.01)
+
 mml.add_entry(
     m.Material("Tree", True, ID="Tree")
     .set_rad_solver(m.SimpleRadiationSolver("LOW"))
@@ -0,0 +1,132 @@
+#---------------------------------------
+# Copyright 2019-2025 DADoES, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License in the root directory in the "LICENSE" file or at:
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#---------------------------------------
+
+# In-process description of the paths produced by the flex motion nodes, used
+# to drape dynamic objects onto terrain. DIRSIG evaluates location engines at
+# render time, so the motion nodes record a Trajectory alongside each engine
+# they build; draping samples it, looks up the terrain along the whole path in
+# one batch and replaces the engine with a terrain-following waypoint engine.
+
+import logging
+import numpy as np
+import dirfm.flexible_motion as fm
+
+logger = logging.getLogger(__name__)
+
+# Length of the window sampled for engines without an end time
+DEFAULT_DRAPE_DURATION = 60.0
+
+
+class Trajectory:
+    """Piecewise-linear path of a location engine.
+
+    ``times`` are the key times in seconds and ``positions`` the matching
+    (N, 3) locations in ``frame``. ``velocity`` is set for open-ended straight
+    line motion, which continues past the last key at that rate.
+    """
+
+    def __init__(self, times, positions, frame="scene", velocity=None):
+        order = np.argsort(np.asarray(times, dtype=float))
+        self.times = np.asarray(times, dtype=float)[order]
+        self.positions = np.asarray(positions, dtype=float).reshape(-1, 3)[order]
+        self.frame = frame
+        self.velocity = None if velocity is None else np.asarray(velocity, dtype=float)
+
+    @classmethod
+    def waypoints(cls, entries, frame="scene"):
+        """Trajectory through ``(time, [x, y, z])`` entries."""
+        return cls([t for t, _ in entries], [p for _, p in entries], frame)
+
+    @classmethod
+    def straight(cls, position, heading, speed, frame="scene"):
+        """Straight line from ``position`` at ``speed`` (m/s) along a compass
+        ``heading`` (degrees clockwise from north, the scene's +y axis)."""
+        heading = np.radians(heading)
+        velocity = speed * np.array([np.sin(heading), np.cos(heading), 0.0])
+        return cls([0.0], [position], frame, velocity=velocity)
+
+    @classmethod
+    def fixed(cls, position, frame="scene"):
+        """Stationary trajectory at ``position``."""
+        return cls([0.0], [position], frame)
+
+    def sample(self, time_step, duration=DEFAULT_DRAPE_DURATION):
+        """Sample the path every ``time_step`` seconds.
+
+        Waypoint paths are sampled over their own time span, keeping every
+        key time so corners are preserved. Single-key paths (straight and
+        fixed) are sampled over ``[t0, t0 + duration]``.
+
+        Returns:
+            tuple ``(times, positions)`` shaped ``(M,)`` and ``(M, 3)``.
+        """
+        if time_step <= 0:
+            raise ValueError(f"Drape time step must be positive, got {time_step}")
+        start = self.times[0]
+        end = self.times[-1] if len(self.times) > 1 else start + duration
+        times = np.union1d(np.append(np.arange(start, end, time_step), end), self.times)
+        positions = np.stack(
+            [np.interp(times, self.times, self.positions[:, axis]) for axis in range(3)], axis=-1
+        )
+        if self.velocity is not None:
+            positions += np.maximum(times - self.times[-1], 0)[:, None] * self.velocity
+        return times, positions
+
+
+def set_trajectory(engine, trajectory):
+    """Record the in-process trajectory of a location engine."""
+    engine.trajectory = trajectory
+    return engine
+
+
+def flex_motion(location_engine, orientation_engine):
+    """Build a FlexMotion that remembers its engines for later draping."""
+    motion = fm.FlexMotion(location_engine, orientation_engine)
+    motion.engines = (location_engine, orientation_engine)
+    return motion
+
+
+def drape_motion(motion, terrain, time_step=1.0, duration=DEFAULT_DRAPE_DURATION):
+    """Return a copy of ``motion`` that follows the terrain.
+
+    The location engine is sampled every ``time_step`` seconds and the
+    terrain height under the whole path is looked up in one batched
+    :meth:`TerrainElevation.elevation_many` query. The sampled z values are
+    treated as heights above ground, as for static instances. The result
+    uses a scene-frame waypoint location engine and the original
+    orientation engine.
+
+    Returns None (with a warning) when the motion was not built by the flex
+    motion nodes or is not in the scene frame.
+    """
+    locationEngine, orientationEngine = getattr(motion, "engines", (None, None))
+    trajectory = getattr(locationEngine, "trajectory", None)
+    if trajectory is None:
+        logger.warning("Cannot drape a motion without a known location engine trajectory")
+        return None
+    if trajectory.frame != "scene":
+        logger.warning(f"Cannot drape {trajectory.frame} frame motion onto terrain; use the scene frame")
+        return None
+
+    times, positions = trajectory.sample(time_step, duration)
+    heights, _ = terrain.elevation_many(positions[:, 0], positions[:, 1])
+    positions[:, 2] += heights
+
+    drapedEngine = fm.WaypointsLocationEngine("scene")
+    for t, position in zip(times, positions):
+        drapedEngine.add_point(float(t), [float(v) for v in position])
+    set_trajectory(drapedEngine, Trajectory(times, positions, "scene"))
+    return flex_motion(drapedEngine, orientationEngine)
@@ -17,35 +17,100 @@
 
 import os
 import logging
-import subprocess
 import json
-from lxml.etree import parse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from lxml.etree import XMLSyntaxError
 from pathlib import Path
+import numpy as np
+from lxml import etree as et
 from anatools.lib.ana_object import AnaBaseObject
 from anatools.lib.generator import Generator
 import anatools.lib.context as ctx
-from anatools.lib.package_utils import get_volume_path
 from anatools.lib.file_object import FileObject
 from anatools.lib.directory_object import DirectoryObject
 from dirfm import glist
+from dirsig_pkg.lib.cache import cache_dir
+from dirsig_pkg.lib.geometry_files import glist_referenced_files, glist_size
+from dirsig_pkg.lib.object_catalog import object_catalog
+from dirsig_pkg.lib.motion import DEFAULT_DRAPE_DURATION, drape_motion
+from dirsig_pkg.lib.staging import stage
+from dirsig_pkg.lib.workspace import run_workspace
 
 logger = logging.getLogger(__name__)
 
+# Objects with more static instances than this are written as a
+# StaticInstanceBinaryFile instead of one glist element per instance
+BINARY_INSTANCES_ENV = "DIRSIG_PKG_BINARY_INSTANCES"
+DEFAULT_BINARY_INSTANCES = 1000
+
 
 def get_file_generator(package, object_class, object_type):
     """
     Helper function that creates a generator from an object
     definition in the package.yml file
     """
-    rel_path = ctx.packages[package]["objects"][object_type]["filename"]
     generator = ObjectDirsigGenerator(
         object_class,
         object_type,
-        file_path=get_volume_path(package, rel_path),
+        file_path=object_catalog().glist_path(object_type, package),
         config=ctx.packages[package]["objects"][object_type])
     return generator
 
 
+_GEOMETRY_SIZES = {}
+
+
+def glist_object_size(glist_path):
+    """Raw ``[x, y, z]`` size of an object glist (volume or staged path), or [] if unknown.
+
+    Answered from the object catalog or the size cache; memoized per run.
+    """
+    key = os.path.abspath(glist_path)
+    if key not in _GEOMETRY_SIZES:
+        entry = object_catalog().entry(glist_path)
+        if entry is not None:
+            _GEOMETRY_SIZES[key] = list(entry["size"])
+        else:
+            try:
+                _GEOMETRY_SIZES[key] = glist_size(glist_path)
+            except (OSError, ValueError, XMLSyntaxError) as e:
+                logger.warning(f"Could not determine the size of {glist_path} ({e})")
+                _GEOMETRY_SIZES[key] = []
+    return list(_GEOMETRY_SIZES[key])
+
+
+def glist_object_footprint(glist_path):
+    """x/y footprint polygon of an object glist, or [] if unknown.
+
+    The catalog's convex hull when the glist is a package object, otherwise
+    the rectangle of its size centered on the origin.
+    """
+    entry = object_catalog().entry(glist_path)
+    if entry is not None:
+        return entry["footprint"]
+    size = glist_object_size(glist_path)
+    if not size:
+        return []
+    return [[-size[0] / 2, -size[1] / 2], [size[0] / 2, -size[1] / 2],
+            [size[0] / 2, size[1] / 2], [-size[0] / 2, size[1] / 2]]
+
+
+def generator_size(generator):
+    """Largest raw ``[x, y, z]`` size an object generator can produce, or [] if unknown.
+
+    Leaf :class:`ObjectDirsigGenerator` instances answer from their glist;
+    modifiers and other generators take the per-axis maximum over their
+    children. No objects are loaded.
+    """
+    if isinstance(generator, ObjectDirsigGenerator):
+        return generator.get_size()
+    sizes = [size for size in map(generator_size, getattr(generator, "children", [])) if size]
+    if not sizes:
+        return []
+    return np.max(sizes, axis=0).tolist()
+
+
 class ObjectDirsigGenerator(Generator):
     """
     Object Generator
@@ -56,6 +121,18 @@ class ObjectDirsigGenerator(Generator):
         self.object_class = object_class
         self.object_type = object_type
 
+    def get_size(self):
+        """ Raw [x, y, z] size of the object this generator loads, without loading it """
+        if "file_path" not in self.kwargs:
+            return []
+        return glist_object_size(self.kwargs["file_path"])
+
+    def get_footprint(self):
+        """ x/y footprint polygon of the object this generator loads, without loading it """
+        if "file_path" not in self.kwargs:
+            return []
+        return glist_object_footprint(self.kwargs["file_path"])
+
     def exec(self, *args, **kwargs):
         """ Return a new instance of the specified object """
         # instantiate the object class
@@ -76,6 +153,60 @@ class ObjectDirsigGenerator(Generator):
         })
 
 
+def binary_instance_threshold():
+    """Instance count above which an object's static instances go to a binary file."""
+    return int(os.environ.get(BINARY_INSTANCES_ENV, DEFAULT_BINARY_INSTANCES))
+
+
+class InstanceTable:
+    """Static instances of an object as NumPy arrays.
+
+    Row i holds the translation (meters), rotation (degrees) and scale of
+    one instance and the index of its name in ``names``.
+    """
+
+    def __init__(self):
+        self.translation = np.zeros((0, 3))
+        self.rotation = np.zeros((0, 3))
+        self.scale = np.ones((0, 3))
+        self.name_index = np.zeros(0, dtype=np.int32)
+        self.names = []
+
+    def __len__(self):
+        return len(self.name_index)
+
+    def append(self, names, translation=None, rotation=None, scale=None):
+        """Add one row per name; transforms broadcast from a single triple."""
+        count = len(names)
+
+        def rows(values, default):
+            if values is None:
+                return np.full((count, 3), default, dtype=float)
+            return np.broadcast_to(np.asarray(values, dtype=float).reshape(-1, 3), (count, 3))
+
+        self.translation = np.concatenate([self.translation, rows(translation, 0.0)])
+        self.rotation = np.concatenate([self.rotation, rows(rotation, 0.0)])
+        self.scale = np.concatenate([self.scale, rows(scale, 1.0)])
+        self.name_index = np.concatenate(
+            [self.name_index, np.arange(len(self.names), len(self.names) + count, dtype=np.int32)]
+        )
+        self.names.extend(names)
+
+    def instance_names(self):
+        return [self.names[i] for i in self.name_index]
+
+
+def write_instance_binary(path, translation, rotation, scale=None):
+    """Write instance transforms to a DIRSIG static instance binary file."""
+    sib = glist.StaticInstanceBinary(fname=str(path))
+    for row in range(len(translation)):
+        kwargs = {"scale": scale[row].tolist()} if scale is not None else {}
+        sib.add_instance(translation=translation[row].tolist(), rotation=rotation[row].tolist(), **kwargs)
+    root = et.Element("geometrylist", enabled="true")
+    sib.write(root, {"geometry": Path(path).parent})
+    return Path(path)
+
+
 class AnaDirsigObject(AnaBaseObject):
     """ A class to represent an Ana DIRSIG object.
     """
@@ -86,17 +217,36 @@ class AnaDirsigObject(AnaBaseObject):
         self.name = "{}_{}".format(self.object_type.replace(" ", ""), self.instance)
         self.match_slope = False
         self.match_elevation = True
+        # Static instances live in the table and are written to .root when it is next read
+        self.instances = InstanceTable()
+        self.instance_anchor = None
+        self.instance_tags = []
+        self._materialized = []
+        self._stale = False
+        self._shared = False
     
     def __repr__(self):
         if self.loaded:
             return f"AnaDirsigObject for {self.object_type}"
+
+    @property
+    def root(self):
+        # The glist object, with the instance table written to it
+        if self._stale and self._root is not None:
+            self.sync_instances()
+        self._shared = self._root is not None
+        return self._root
+
+    @root.setter
+    def root(self, value):
+        self._root = value
     
     def load(self, **kwargs):
         """ Load the object and store it as .root
         """
         if "file_path" in kwargs:
             filePath = Path(kwargs["file_path"])
-            glistObject = glist.Object(glist.GlistBaseGeometry(filePath))
+            glistObject = glist.Object(glist.GlistBaseGeometry(stage(filePath)))
         else:
             glistObject = glist.Object(self.object_type)
 
@@ -113,65 +263,188 @@ class AnaDirsigObject(AnaBaseObject):
         # Update the rotation by a vector (degrees) of 3 floats
         assert all([isinstance(x, (float, int)) for x in trans_vector])
         assert all([isinstance(x, (float, int)) for x in rot_vector])
-        for objInstance in self.root.get_instances():
+        self.instances.translation += trans_vector
+        self.instances.rotation += rot_vector
+        for objInstance in self.other_instances():
             objInstance.set_translation([objInstance.get_translation()[i]+trans_vector[i] for i in range(3)])
             objInstance.set_rotation([objInstance.get_rotation()[i]+rot_vector[i] for i in range(3)])
+        self.instances_changed()
         
         self.match_slope = match_slope
         self.match_elevation = match_elevation
     
     def get_size(self):
-        # Return the dimensions of the raw OBJ
+        # Return the dimensions of the raw OBJ, or [] if they cannot be read
         if self._size == []:
-            #Parse glist file
-            glist_fPath = self.root.get_base_geometry()[0]._glist
-            
-            glistTree = parse(str(glist_fPath))
-            objFilename = [e for e in glistTree.getroot().iter('filename')][0].text
-            objFilePath = glist_fPath.parents[0] / objFilename
-            
-            result = subprocess.run(
-                ["object_tool", "--geometry", f"--input_filename={objFilePath}"],
-                capture_output=True,
-                text=True,
-                env=os.environ,
-            )
-            sizeLine = [l for l in result.stdout.splitlines() if "Size = " in l][0]
-            
-            for value in sizeLine.split():
-                try:
-                    self._size.append(float(value))
-                except ValueError:
-                    pass
-            
+            self._size = glist_object_size(self._root.get_base_geometry()[0]._glist)
         return self._size
 
+    def get_footprint(self):
+        # Return the x/y footprint polygon of the raw OBJ, or [] if it is unknown
+        return glist_object_footprint(self._root.get_base_geometry()[0]._glist)
+
     def add_static_instance(self, name=None, anchor=None):
         # Add a DIRSIG Static Instance to this object
-        staticInstance = glist.StaticInstance(
-            name=name,
-            anchor=anchor,
-        )
-        self.root.add_instance(staticInstance)
+        self.instances.append([name])
+        if anchor is not None:
+            self.instance_anchor = anchor
+        self.instances_changed()
+
+    def set_static_instances(self, locations, rotations=None, names=None, tags=()):
+        # Replace the static instances with one per location (meters, z optional)
+        locations = np.asarray(locations, dtype=float).reshape(len(locations), -1)
+        if locations.shape[1] == 2:
+            locations = np.column_stack([locations, np.zeros(len(locations))])
+        if names is None:
+            names = [f"{self.name}_{str(idx).zfill(4)}" for idx in range(len(locations))]
+        self._root._instance = [] # remove any other instances
+        self._materialized = []
+        self.instances = InstanceTable()
+        self.instances.append(names, translation=locations, rotation=rotations)
+        self.instance_tags = list(tags)
+        self.instances_changed()
+
+    def scale_instances(self, scale_factors):
+        # Multiply the scale of every instance by a vector of 3 floats
+        self.instances.scale *= scale_factors
+        for objInstance in self.other_instances():
+            objInstance.set_scale([objInstance.get_scale()[i]*scale_factors[i] for i in range(3)])
+        self.instances_changed()
+
+    def instances_changed(self):
+        # Call after editing the instance table in place; .root is brought up to date
+        # when it is next read, or right away if it has already been handed out
+        self._stale = True
+        if self._shared:
+            self.sync_instances()
+
+    def other_instances(self):
+        # Instances held directly by .root: dynamic and binary-file instances
+        return [i for i in self._root.get_instances() if not any(i is m for m in self._materialized)]
+
+    def uses_binary_file(self):
+        # Large untagged tables are written as one binary file; it carries no per-instance
+        # names or tags, so its instances all report the object's name in the truth output
+        return len(self.instances) > binary_instance_threshold() and not self.instance_tags
+
+    def instance_names(self):
+        # Names of every instance, as they appear in the truth output
+        tableNames = [self.name] if self.uses_binary_file() else self.instances.instance_names()
+        return tableNames + [i.get_name() for i in self.other_instances()]
 
-    def set_dynamic_instance(self, motion, name=None):
+    def sync_instances(self):
+        # Write the instance table to .root: glist elements, or a binary file for large tables
+        others = self.other_instances()
+        table = self.instances
+        if self.uses_binary_file():
+            binPath = run_workspace().file("instances", f"{self.name}.bin")
+            scaled = not np.all(table.scale == 1)
+            write_instance_binary(binPath, table.translation, table.rotation,
+                                  table.scale if scaled else None)
+            logger.info(f"Wrote {len(table)} instances of {self.name} to {binPath}")
+            materialized = [glist.StaticInstanceBinaryFile(binPath, name=self.name, anchor=self.instance_anchor)]
+        else:
+            materialized = []
+            for row, nameIdx in enumerate(table.name_index):
+                staticInstance = glist.StaticInstance(
+                    name=table.names[nameIdx],
+                    anchor=self.instance_anchor,
+                    translation=table.translation[row].tolist(),
+                    rotation=table.rotation[row].tolist(),
+                    scale=table.scale[row].tolist(),
+                )
+                for tag in self.instance_tags:
+                    staticInstance.set_tag(tag)
+                materialized.append(staticInstance)
+        self._root._instance = others + materialized
+        self._materialized = materialized
+        self._stale = False
+
+    def set_dynamic_instance(self, motion, name=None, drape=False, drape_time_step=1.0,
+                             drape_duration=DEFAULT_DRAPE_DURATION):
         # Set this object to have a DIRSIG Dynamic Instance
+        # With drape set, the scene re-samples the motion onto its terrain (see drape_on_terrain)
         if name == None:
             name = self.name
-        self.root._instance = [] # remove any static instances
+        self._root._instance = [] # remove any static instances
+        self.instances = InstanceTable()
+        self._materialized = []
+        self._stale = False
         dynamicInstance = glist.DynamicInstance(
             name=self.name,
             motion=motion
         )
-        self.root.add_instance(dynamicInstance)
+        self._root.add_instance(dynamicInstance)
+        self.motion = motion
+        self.drape = (float(drape_time_step), float(drape_duration)) if drape else None
+
+    def drape_on_terrain(self, terrain):
+        # Replace the dynamic instance with one whose motion follows the terrain
+        # The whole trajectory is looked up in one batched terrain query
+        if not getattr(self, "drape", None):
+            return
+        drapedMotion = drape_motion(self.motion, terrain, *self.drape)
+        if drapedMotion is None:
+            return
+        self._root._instance = [
+            glist.DynamicInstance(name=i.get_name(), motion=drapedMotion)
+            if type(i) is glist.DynamicInstance else i
+            for i in self._root.get_instances()
+        ]
     
     def set_binfile_instance(self, locations_filepath, name=None, anchor_name=None):
         # Set this object to have a DIRSIG Static Instance Binary File
         if name == None:
             name = self.name
-        self.root._instance = []
+        self._root._instance = []
+        self.instances = InstanceTable()
+        self._materialized = []
+        self._stale = False
         sib = glist.StaticInstanceBinaryFile(locations_filepath, name=name, anchor=anchor_name)
-        self.root.add_instance(sib)
+        self._root.add_instance(sib)
+
+
+def _geometry_key(glist_object):
+    """Identity of a glist object apart from its instances, or None if it has no glist geometry."""
+    base = glist_object.get_base_geometry()
+    if len(base) != 1 or not isinstance(base[0], glist.GlistBaseGeometry):
+        return None
+    settings = []
+    for key, value in sorted(vars(glist_object).items()):
+        if key == "_instance" or value is base[0]:
+            continue
+        if isinstance(value, (list, tuple)) and len(value) == len(base) and all(v is b for v, b in zip(value, base)):
+            continue
+        settings.append((key, repr(value)))
+    return os.path.abspath(base[0]._glist), tuple(settings)
+
+
+def shared_geometry_objects(ana_objects):
+    """The glist objects of ``ana_objects``, one per base geometry.
+
+    Objects whose base geometry is the same glist (for example one object
+    node wired in through several modifiers) are combined into the first
+    one's glist object, which then carries all of their instances, so
+    DIRSIG loads the mesh once. Instances keep their own names and tags,
+    so the truth collection stays per instance. Reading ``.root`` writes
+    each object's instance table to its glist object; call this after the
+    instances are final (see :func:`align_objects_with_terrain`).
+    """
+    groups = {}
+    for anaObject in ana_objects:
+        key = _geometry_key(anaObject.root)
+        groups.setdefault(key if key is not None else id(anaObject), []).append(anaObject)
+    roots = []
+    for members in groups.values():
+        root = members[0].root
+        if len(members) > 1:
+            root._instance = [i for m in members for i in m.root.get_instances()]
+            logger.info(
+                f"Sharing the geometry of {root.get_base_geometry()[0]._glist} across "
+                f"{len(members)} objects ({len(root._instance)} instances)"
+            )
+        roots.append(root)
+    return roots
 
 
 def filename_to_generator(filename, object_class):
@@ -190,14 +463,84 @@ def filename_to_generator(filename, object_class):
     return wrapped_generator
 
 
+_SCANS = None
+_SCANS_LOCK = threading.Lock()
+
+
+def _scan_cache_path():
+    return cache_dir("directory_scan") / "index.json"
+
+
+def _read_scan_cache():
+    try:
+        return json.loads(_scan_cache_path().read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _check_glist(path):
+    """Problem with a glist file, or None if it parses."""
+    try:
+        glist_referenced_files(path, recursive=False)
+    except (OSError, XMLSyntaxError) as e:
+        return str(e)
+    return None
+
+
+def directory_glists(directory, max_workers=16):
+    """Sorted paths of the valid glist files directly inside ``directory``.
+
+    Every glist is parsed on a thread pool and those that cannot be read
+    are skipped with a warning. The result is kept in
+    ``<cache>/directory_scan/index.json`` keyed by the directory's mtime,
+    so an unchanged directory is not scanned again, in this run or later
+    ones. Scans saved by other processes in the meantime are merged in
+    before the index is replaced.
+    """
+    global _SCANS
+    directory = os.path.abspath(directory)
+    mtime = os.stat(directory).st_mtime_ns
+    with _SCANS_LOCK:
+        if _SCANS is None:
+            _SCANS = _read_scan_cache()
+        cached = _SCANS.get(directory)
+        if cached is not None and cached["mtime_ns"] == mtime:
+            return list(cached["glists"])
+
+    with os.scandir(directory) as entries:
+        files = sorted(e.path for e in entries if e.is_file() and not e.name.endswith(".anameta"))
+    paths = [f for f in files if f.endswith(".glist")]
+    if len(paths) < len(files):
+        logger.info(f"Skipping {len(files) - len(paths)} non-glist files in {directory}")
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        problems = list(pool.map(_check_glist, paths))
+    glists = []
+    for path, problem in zip(paths, problems):
+        if problem is None:
+            glists.append(path)
+        else:
+            logger.warning(f"Skipping unreadable glist {path} ({problem})")
+
+    with _SCANS_LOCK:
+        _SCANS = {**_SCANS, **_read_scan_cache(), directory: {"mtime_ns": mtime, "glists": glists}}
+        cachePath = _scan_cache_path()
+        tmpPath = cachePath.with_name(f"index.json.{os.getpid()}.tmp")
+        try:
+            tmpPath.write_text(json.dumps(_SCANS))
+            os.replace(tmpPath, cachePath)
+        except OSError as e:
+            logger.warning(f"Could not save the directory scan cache ({e})")
+    return list(glists)
+
+
 def file_to_objgen(generators, object_class):
     """
     Process a mixed list of generators, FileObjects, and DirectoryObjects
     For any FileObject in the list, wrap it in an ObjectGenerator. The object type returned by the
     generator will be 'object_class'. The loader method will be replaced with one appropriate
     to the file type specified in the FileObject (currently only Blender is supported).
-    For any DirectoryObject in the list, loop through all files in the directory (excluding
-    subdirectories and files ending in .anameta) and make them object generators as above.
+    For any DirectoryObject in the list, take every valid glist directly in the directory
+    (see directory_glists) and make them object generators as above.
     """
 
     # return generators
@@ -213,14 +556,11 @@ def file_to_objgen(generators, object_class):
         if isinstance(generator, FileObject):
             gen = filename_to_generator(generator.filename, object_class)
             if gen is not None:
-                wrapped_generators.append(filename_to_generator(generator.filename, object_class))
+                wrapped_generators.append(gen)
         elif isinstance(generator, DirectoryObject):
-            files = generator.get_files()
-            for filename in files:
-                gen = filename_to_generator(filename, object_class)
-                if gen is not None:
-                    wrapped_generators.append(filename_to_generator(filename, object_class))
+            for filename in directory_glists(generator.directory):
+                wrapped_generators.append(filename_to_generator(filename, object_class))
         else:
             wrapped_generators.append(generator)
 
-    return wrapped_generators
\ No newline at end of file
+    return wrapped_generators
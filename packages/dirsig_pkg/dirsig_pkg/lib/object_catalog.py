@@ -0,0 +1,260 @@
+#---------------------------------------
+# Copyright 2019-2025 DADoES, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License in the root directory in the "LICENSE" file or at:
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#---------------------------------------
+
+# Precompiled metadata for the objects declared in package.yml. For each
+# object the index holds its glist (as the package.yml volume reference), the
+# OBJ files the glist places with their triangle counts, the bounding-box
+# size, the x/y footprint polygon (convex hull) and the OBJ material names.
+#
+# Entries are validated with glist_portable_hash, so an index compiled
+# against a local copy of the volume holds on any machine:
+#
+#   python -m dirsig_pkg.lib.object_catalog --volume dirsig-shared=/path/to/dirsig-shared
+#
+# writes <cache>/object_catalog/index.json (or --output). At runtime, entries
+# that are missing or stale are built on first use and saved back.
+
+import os
+import sys
+import json
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import numpy as np
+from lxml.etree import XMLSyntaxError
+from scipy.spatial import ConvexHull, QhullError
+import anatools.lib.context as ctx
+from anatools.lib.package_utils import get_volume_path
+from dirsig_pkg.lib.cache import cache_dir
+from dirsig_pkg.lib.geometry_files import (
+    glist_placements,
+    glist_portable_hash,
+    obj_material_names,
+    obj_triangles,
+    read_obj_vertices,
+)
+from dirsig_pkg.lib.staging import source_path
+
+logger = logging.getLogger(__name__)
+
+CATALOG_PACKAGE = "dirsig_pkg"
+PACKAGE_YML = Path(__file__).resolve().parents[1] / "package.yml"
+
+
+def footprint_polygon(xy):
+    """Convex hull of x/y points as a list of ``[x, y]`` corners.
+
+    Degenerate point sets (fewer than three, or collinear) fall back to
+    their bounding rectangle.
+    """
+    xy = np.asarray(xy, dtype=float)
+    try:
+        corners = xy[ConvexHull(xy).vertices]
+    except (QhullError, ValueError):
+        (xmin, ymin), (xmax, ymax) = xy.min(axis=0), xy.max(axis=0)
+        corners = np.array([[xmin, ymin], [xmax, ymin], [xmax, ymax], [xmin, ymax]])
+    return np.round(corners, 4).tolist()
+
+
+def build_entry(glist_path):
+    """Catalog entry for one object glist.
+
+    Raises:
+        ValueError: if the glist places no Wavefront geometry.
+    """
+    glist_path = Path(glist_path)
+    placements = glist_placements(glist_path)
+    if not placements:
+        raise ValueError(f"{glist_path}: no Wavefront geometry")
+    objs = {}
+    materials = {}
+    vertices = {}
+    points = []
+    for objPath, scale, trans in placements:
+        if objPath not in vertices:
+            vertices[objPath] = read_obj_vertices(objPath)
+            objs[os.path.relpath(objPath, glist_path.parent)] = obj_triangles(objPath)
+            materials.update(dict.fromkeys(obj_material_names(objPath)))
+        points.append(vertices[objPath] * scale + trans)
+    points = np.concatenate(points)
+    if not len(points):
+        raise ValueError(f"{glist_path}: no vertices")
+    return {
+        "hash": glist_portable_hash(glist_path),
+        "objs": objs,
+        "size": [float(v) for v in points.max(axis=0) - points.min(axis=0)],
+        "footprint": footprint_polygon(points[:, :2]),
+        "materials": list(materials),
+    }
+
+
+class ObjectCatalog:
+    """Index of package.yml object metadata, shared by every object node of a run."""
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path is not None else cache_dir("object_catalog") / "index.json"
+        self.objects = self._read()
+        self._saved = dict(self.objects)  # entries as last read from disk
+        self._lock = threading.RLock()
+        self._paths = {}       # (package, object type) -> glist path
+        self._types = {}       # glist path -> (package, object type, package.yml reference)
+        self._entries = {}     # glist path -> validated entry
+        self._triangles = {}   # OBJ path -> triangles
+
+    def glist_path(self, object_type, package=CATALOG_PACKAGE):
+        """Resolved glist path of a package.yml object; resolved once per run."""
+        key = (package, object_type)
+        with self._lock:
+            if key not in self._paths:
+                ref = ctx.packages[package]["objects"][object_type]["filename"]
+                path = Path(os.path.abspath(get_volume_path(package, ref)))
+                self._paths[key] = path
+                self._types[path] = (package, object_type, ref)
+            return self._paths[key]
+
+    def _validate(self, path, package, object_type, ref):
+        name = f"{package}:{object_type}"
+        entry = self.objects.get(name)
+        try:
+            if entry is None or entry.get("ref") != ref or entry["hash"] != glist_portable_hash(path):
+                logger.info(f"Cataloging {object_type} ({path})")
+                entry = dict(build_entry(path), ref=ref)
+                self.objects[name] = entry
+                self.save()
+        except (OSError, ValueError, XMLSyntaxError) as e:
+            logger.warning(f"Could not catalog {object_type} ({e})")
+            entry = None
+        self._entries[path] = entry
+        if entry is None:
+            return None
+        for rel, triangles in entry["objs"].items():
+            self._triangles[Path(os.path.normpath(path.parent / rel))] = triangles
+        return entry
+
+    def entry(self, glist_path):
+        """Entry for a cataloged object glist (volume or staged path), or None."""
+        path = source_path(glist_path)
+        with self._lock:
+            if path in self._entries:
+                return self._entries[path]
+            if path not in self._types:
+                return None
+            return self._validate(path, *self._types[path])
+
+    def triangles(self, obj_path):
+        """Triangle count of an OBJ placed by an object resolved this run, or None."""
+        path = Path(os.path.normpath(source_path(obj_path)))
+        with self._lock:
+            for glistPath in set(self._types) - set(self._entries):
+                self.entry(glistPath)
+            return self._triangles.get(path)
+
+    def _read(self):
+        try:
+            return json.loads(self.path.read_text()).get("objects", {})
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        """Write the entries built by this process over the ones saved since.
+
+        The index is re-read first, so entries other processes cataloged
+        after it was loaded are kept rather than overwritten.
+        """
+        with self._lock:
+            objects = self._read()
+            objects.update({name: entry for name, entry in self.objects.items()
+                            if entry is not self._saved.get(name)})
+            self.objects = objects
+            self._saved = dict(objects)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmpPath = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            try:
+                tmpPath.write_text(json.dumps({"objects": objects}, separators=(",", ":")))
+                os.replace(tmpPath, self.path)
+            except OSError as e:
+                logger.warning(f"Could not save the object catalog ({e})")
+
+
+_CATALOG = None
+_CATALOG_LOCK = threading.Lock()
+
+
+def object_catalog():
+    """Return the process-wide ObjectCatalog."""
+    global _CATALOG
+    with _CATALOG_LOCK:
+        if _CATALOG is None:
+            _CATALOG = ObjectCatalog()
+        return _CATALOG
+
+
+def compile_catalog(objects, volumes, output=None, package=CATALOG_PACKAGE, max_workers=8):
+    """Build catalog entries for ``objects`` (package.yml ``objects`` mapping).
+
+    ``volumes`` maps volume names to local directories. Returns the names of
+    the objects that could not be cataloged.
+    """
+    catalog = ObjectCatalog(output)
+
+    def build(item):
+        objectType, config = item
+        volume, rel = config["filename"].split(":", 1)
+        entry = build_entry(Path(volumes[volume]) / rel)
+        return objectType, dict(entry, ref=config["filename"])
+
+    failed = []
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(build, item) for item in objects.items()]
+        for item, future in zip(objects.items(), futures):
+            try:
+                objectType, entry = future.result()
+            except (KeyError, OSError, ValueError, XMLSyntaxError) as e:
+                logger.error(f"{item[0]}: {e}")
+                failed.append(item[0])
+                continue
+            catalog.objects[f"{package}:{objectType}"] = entry
+            logger.info(f"{objectType}: {sum(entry['objs'].values())} triangles, "
+                        f"size {' x '.join(f'{v:.2f}' for v in entry['size'])} m")
+    catalog.save()
+    logger.info(f"Wrote {catalog.path} ({len(objects) - len(failed)} objects)")
+    return failed
+
+
+def main(argv=None):
+    import yaml
+
+    parser = argparse.ArgumentParser(
+        description="Compile the object catalog index from package.yml."
+    )
+    parser.add_argument("--volume", action="append", required=True, metavar="NAME=PATH",
+                        help="Local copy of a package volume (repeatable)")
+    parser.add_argument("--package-yml", type=Path, default=PACKAGE_YML,
+                        help="package.yml to read (default: the installed package's)")
+    parser.add_argument("--output", type=Path, default=None,
+                        help="Index file to write (default: <cache>/object_catalog/index.json)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    volumes = dict(v.split("=", 1) for v in args.volume)
+    objects = yaml.safe_load(args.package_yml.read_text()).get("objects", {})
+    return 1 if compile_catalog(objects, volumes, output=args.output) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
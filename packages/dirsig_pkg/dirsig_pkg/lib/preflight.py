@@ -0,0 +1,219 @@
+#---------------------------------------
+# Copyright 2019-2025 DADoES, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License in the root directory in the "LICENSE" file or at:
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#---------------------------------------
+
+# Pre-render check of every file a scene hands to DIRSIG. The scene, glist,
+# material and plugin objects are walked for file paths, glists are expanded
+# to the files they reference, and all paths are checked in parallel, so a
+# missing or empty asset fails the run in seconds with the complete list
+# instead of after DIRSIG has spent minutes loading the scene.
+#
+# Results for volume files (read-only package content) and the references of
+# each glist are kept in <cache>/preflight/index.json between runs.
+
+import os
+import json
+import time
+import types
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from lxml.etree import XMLSyntaxError
+import numpy as np
+from dirsig_pkg.lib.cache import cache_dir, cache_root, file_key
+from dirsig_pkg.lib.geometry_files import glist_referenced_files
+from dirsig_pkg.lib.workspace import run_workspace
+
+logger = logging.getLogger(__name__)
+
+# How long a volume file seen on a previous run is trusted without a stat
+INDEX_TTL = 24 * 3600
+
+# Files DIRSIG cannot use when empty
+_NON_EMPTY_SUFFIXES = {".obj", ".glist", ".bin", ".instances", ".png", ".jpg", ".jpeg", ".tif", ".tiff"}
+
+_SCALARS = (bytes, int, float, bool, complex, type(None), np.ndarray, np.generic)
+_CODE = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+
+
+def walk_objects(*roots):
+    """Yield every object reachable from ``roots``, each once.
+
+    Follows instance attributes, lists, tuples, sets and dict keys and
+    values. Strings and ``Path`` values are yielded but not entered; other
+    scalars, arrays, classes, modules and functions are skipped.
+    """
+    seen = set()
+    stack = list(roots)
+    while stack:
+        value = stack.pop()
+        if isinstance(value, (str, Path)):
+            yield value
+            continue
+        if isinstance(value, _SCALARS + _CODE) or id(value) in seen:
+            continue
+        seen.add(id(value))
+        yield value
+        if isinstance(value, dict):
+            stack.extend(value.keys())
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            stack.extend(value)
+        elif hasattr(value, "__dict__"):
+            stack.extend(vars(value).values())
+
+
+def as_file_path(value):
+    """``value`` as an absolute file path, or None if it does not look like one.
+
+    Paths with unexpanded variables such as ``$DIRSIG_HOME`` are rejected.
+    """
+    if not isinstance(value, (str, Path)):
+        return None
+    text = os.path.expandvars(str(value))
+    if os.path.isabs(text) and Path(text).suffix and "$" not in text:
+        return Path(text)
+    return None
+
+
+def referenced_paths(*roots):
+    """Every file path (``Path`` or absolute path string) held by a graph of scene objects."""
+    return {path for path in map(as_file_path, walk_objects(*roots)) if path is not None}
+
+
+class PreflightIndex:
+    """Persistent record of volume file sizes and glist references."""
+
+    def __init__(self, root=None):
+        self.path = (Path(root) if root is not None else cache_dir("preflight")) / "index.json"
+        data = self._read()
+        self.files = data.get("files", {})
+        self.glists = data.get("glists", {})
+        self._local = (cache_root(), run_workspace().root)
+
+    def _cacheable(self, path):
+        return not any(root in path.parents for root in self._local)
+
+    def size(self, path):
+        """Size of ``path`` in bytes, or None if it does not exist."""
+        entry = self.files.get(str(path))
+        if entry is not None and time.time() - entry[1] < INDEX_TTL:
+            return entry[0]
+        try:
+            size = path.stat().st_size
+        except OSError:
+            return None
+        # Only healthy volume files are remembered; problems are re-checked every run
+        if size > 0 and self._cacheable(path):
+            self.files[str(path)] = [size, time.time()]
+        return size
+
+    def references(self, glist_path):
+        """Files a glist references directly; nested glists are checked in turn."""
+        key = file_key(glist_path)
+        refs = self.glists.get(key)
+        if refs is None:
+            refs = [str(ref) for ref in glist_referenced_files(glist_path, recursive=False)]
+            self.glists[key] = refs
+        return [Path(ref) for ref in refs]
+
+    def _read(self):
+        try:
+            return json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        """Merge with the index saved by other runs and replace it.
+
+        The most recently checked size of each file wins; expired sizes
+        are dropped.
+        """
+        data = self._read()
+        now = time.time()
+        files = data.get("files", {})
+        for path, entry in self.files.items():
+            if path not in files or files[path][1] < entry[1]:
+                files[path] = entry
+        files = {path: entry for path, entry in files.items() if now - entry[1] < INDEX_TTL}
+        glists = dict(data.get("glists", {}), **self.glists)
+        tmpPath = self.path.with_name(f"index.json.{os.getpid()}.tmp")
+        tmpPath.write_text(json.dumps({"files": files, "glists": glists}))
+        os.replace(tmpPath, self.path)
+
+
+def check_files(paths, index=None, max_workers=32):
+    """Check that ``paths`` and everything their glists reference are usable.
+
+    Returns a sorted list of problem descriptions (empty when all is well).
+    """
+    index = index if index is not None else PreflightIndex()
+    problems = []
+    pending = {Path(p): None for p in paths}
+    checked = set()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while pending:
+            batch = [p for p in pending if p not in checked]
+            checked.update(batch)
+            referrers = pending
+            pending = {}
+            for path, size in zip(batch, pool.map(index.size, batch)):
+                referrer = referrers[path]
+                where = f" (referenced by {referrer})" if referrer is not None else ""
+                if size is None:
+                    problems.append(f"missing {path}{where}")
+                elif size == 0 and path.suffix.lower() in _NON_EMPTY_SUFFIXES:
+                    problems.append(f"empty {path}{where}")
+                elif path.suffix == ".glist":
+                    try:
+                        refs = index.references(path)
+                    except (OSError, XMLSyntaxError) as e:
+                        problems.append(f"unreadable glist {path}{where}: {e}")
+                        continue
+                    for ref in refs:
+                        if ref not in checked:
+                            pending.setdefault(ref, path)
+    return sorted(problems)
+
+
+def preflight(*roots):
+    """Check every file referenced by the scene objects in ``roots``.
+
+    Files the run generates before DIRSIG starts (LOD slots, static
+    instance binary files, Countryside parcels) are checked like any other
+    reference. Only the workspace's ``dirsig_input`` and ``dirsig_output``
+    trees are skipped: DIRSIG input writing and the render fill them.
+
+    Raises:
+        FileNotFoundError: listing every missing, empty or unreadable file.
+    """
+    started = time.monotonic()
+    index = PreflightIndex()
+    workspace = run_workspace().root
+    skipped = (workspace / "dirsig_input", workspace / "dirsig_output")
+    paths = [
+        p for p in referenced_paths(*roots)
+        if not any(root == p or root in p.parents for root in skipped)
+    ]
+    problems = check_files(paths, index)
+    try:
+        index.save()
+    except OSError as e:
+        logger.warning(f"Could not save the preflight index ({e})")
+    logger.info(f"Preflight checked {len(paths)} scene files in {time.monotonic() - started:.1f} s")
+    if problems:
+        raise FileNotFoundError(
+            f"Preflight found {len(problems)} problem(s) with the scene files:\n  " + "\n  ".join(problems)
+        )
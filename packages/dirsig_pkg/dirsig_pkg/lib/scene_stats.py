@@ -0,0 +1,311 @@
+#---------------------------------------
+# Copyright 2019-2025 DADoES, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License in the root directory in the "LICENSE" file or at:
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#---------------------------------------
+
+# Size of the scene handed to DIRSIG and an estimate of the memory DIRSIG
+# needs to render it. The same object graph preflight checks is walked for
+# meshes, glists, instance files and texture images; glists are expanded to
+# the files they reference. Triangle counts of meshes the object catalog does
+# not cover are kept per file in <cache>/scene_stats/meshes.json between runs,
+# merged with what other runs saved and bounded to the most recently used
+# MESH_CACHE_ENTRIES.
+#
+# The memory model is deliberately coarse: a fixed process overhead, a cost
+# per triangle (vertex data plus acceleration structure), per instance and
+# per decoded texel, and a per-thread cost for the path state of each render
+# thread. It only has to be good enough to keep the thread count within RAM.
+
+import os
+import json
+import time
+import struct
+import logging
+from pathlib import Path
+from lxml.etree import XMLSyntaxError, parse
+from dirsig_pkg.lib.cache import cache_dir, file_key
+from dirsig_pkg.lib.geometry_files import obj_triangles
+from dirsig_pkg.lib.object_catalog import object_catalog
+from dirsig_pkg.lib.preflight import as_file_path, walk_objects
+
+logger = logging.getLogger(__name__)
+
+MEMORY_ENV = "DIRSIG_PKG_MEMORY_MB"
+
+# Memory model, in bytes
+BASE_BYTES = 768 * 1024 * 1024
+BYTES_PER_TRIANGLE = 160
+BYTES_PER_INSTANCE = 256
+BYTES_PER_THREAD = 96 * 1024 * 1024
+BYTES_PER_THREAD_NODE = 16 * 1024 * 1024
+
+# Share of the available memory the render may plan to use
+MEMORY_FRACTION = 0.8
+
+# One 4x4 double transform per record in a static instance binary file
+INSTANCE_RECORD_BYTES = 128
+
+# Meshes kept in the triangle count cache
+MESH_CACHE_ENTRIES = 50000
+
+_IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg"}
+_INSTANCE_SUFFIXES = {".bin", ".instances"}
+_IN_MEMORY_INSTANCES = ("StaticInstance", "DynamicInstance")
+
+
+def image_shape(image_path):
+    """``(width, height, channels)`` of a PNG or JPEG, read from its header only.
+
+    Returns None for formats or files the header parser does not understand.
+    """
+    with open(image_path, "rb") as f:
+        head = f.read(32)
+        if head[:8] == b"\x89PNG\r\n\x1a\n":
+            width, height, depth, colorType = struct.unpack(">IIBB", head[16:26])
+            channels = {0: 1, 2: 3, 3: 3, 4: 2, 6: 4}.get(colorType, 4)
+            return width, height, channels * max(depth // 8, 1)
+        if head[:2] != b"\xff\xd8":
+            return None
+        f.seek(2)
+        while True:
+            marker = f.read(4)
+            if len(marker) < 4 or marker[0] != 0xFF:
+                return None
+            length = struct.unpack(">H", marker[2:])[0]
+            # Start-of-frame markers carry the image size
+            if 0xC0 <= marker[1] <= 0xCF and marker[1] not in (0xC4, 0xC8, 0xCC):
+                _, height, width, channels = struct.unpack(">BHHB", f.read(6))
+                return width, height, channels
+            f.seek(length - 2, os.SEEK_CUR)
+
+
+def instance_file_count(path):
+    """Number of instances in a static instance file.
+
+    Text instance files hold one instance per line; binary files are sized
+    by :data:`INSTANCE_RECORD_BYTES`, so their count is an estimate.
+    """
+    path = Path(path)
+    with open(path, "rb") as f:
+        head = f.read(512)
+    if head and all(32 <= b < 127 or b in b"\t\r\n" for b in head):
+        with open(path, "rb") as f:
+            return sum(1 for line in f if line.strip() and not line.lstrip().startswith(b"#"))
+    return path.stat().st_size // INSTANCE_RECORD_BYTES
+
+
+def glist_instances(glist_path):
+    """Instances a glist declares inline and the files it references.
+
+    Returns ``(inline_count, referenced_paths)``.
+    """
+    glist_path = Path(glist_path)
+    root = parse(str(glist_path)).getroot()
+    count = sum(1 for _ in root.iter("staticinstance", "dynamicinstance"))
+    refs = [glist_path.parent / e.text.strip() for e in root.iter("filename") if e.text]
+    return count, refs
+
+
+def _mesh_cache_path():
+    return cache_dir("scene_stats") / "meshes.json"
+
+
+def _read_mesh_cache():
+    """``{file_key: {"triangles": n, "used": unix time}}`` saved by earlier runs."""
+    try:
+        entries = json.loads(_mesh_cache_path().read_text())
+    except (OSError, ValueError):
+        return {}
+    return {k: v for k, v in entries.items() if isinstance(v, dict) and "triangles" in v}
+
+
+def _save_mesh_cache(entries):
+    """Merge ``entries`` into the saved cache, keep the most recent ones and replace it."""
+    merged = _read_mesh_cache()
+    merged.update(entries)
+    if len(merged) > MESH_CACHE_ENTRIES:
+        recent = sorted(merged.items(), key=lambda item: item[1]["used"], reverse=True)
+        merged = dict(recent[:MESH_CACHE_ENTRIES])
+    cachePath = _mesh_cache_path()
+    tmpPath = cachePath.with_name(f"{cachePath.name}.{os.getpid()}.tmp")
+    try:
+        tmpPath.write_text(json.dumps(merged, separators=(",", ":")))
+        os.replace(tmpPath, cachePath)
+    except OSError as e:
+        logger.warning(f"Could not save the mesh statistics cache ({e})")
+
+
+def available_memory():
+    """Bytes of memory the render can use: the cgroup limit, else MemAvailable.
+
+    ``DIRSIG_PKG_MEMORY_MB`` overrides the detection. Returns None when
+    nothing can be determined.
+    """
+    if os.environ.get(MEMORY_ENV):
+        return int(float(os.environ[MEMORY_ENV]) * 1024 * 1024)
+    limits = []
+    for path in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        try:
+            text = Path(path).read_text().strip()
+        except OSError:
+            continue
+        if text.isdigit() and int(text) < 1 << 60:
+            limits.append(int(text))
+    try:
+        for line in Path("/proc/meminfo").read_text().splitlines():
+            if line.startswith("MemAvailable:"):
+                limits.append(int(line.split()[1]) * 1024)
+                break
+    except OSError:
+        try:
+            limits.append(os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES"))
+        except (ValueError, OSError):
+            pass
+    return min(limits) if limits else None
+
+
+class SceneStatistics:
+    """Triangle, instance and texture totals of a scene and its memory estimate."""
+
+    def __init__(self):
+        self.meshes = {}
+        self.glists = {}
+        self.instance_files = {}
+        self.textures = {}
+        self.in_memory_instances = 0
+        self.problems = []
+
+    @property
+    def triangles(self):
+        return sum(self.meshes.values())
+
+    @property
+    def instances(self):
+        return (self.in_memory_instances + sum(self.glists.values())
+                + sum(self.instance_files.values()))
+
+    @property
+    def texture_bytes(self):
+        return sum(self.textures.values())
+
+    @classmethod
+    def collect(cls, *roots):
+        """Gather statistics for every file held by the scene objects in ``roots``."""
+        stats = cls()
+        pending = []
+        for value in walk_objects(*roots):
+            if type(value).__name__ in _IN_MEMORY_INSTANCES:
+                stats.in_memory_instances += 1
+            path = as_file_path(value)
+            if path is not None:
+                pending.append(path)
+        meshCache = _read_mesh_cache()
+        used = {}
+        now = time.time()
+        catalog = object_catalog()
+        seen = set()
+        while pending:
+            path = pending.pop()
+            if path in seen or not path.is_file():
+                continue
+            seen.add(path)
+            suffix = path.suffix.lower()
+            try:
+                if suffix == ".obj":
+                    triangles = catalog.triangles(path)
+                    if triangles is None:
+                        key = file_key(path)
+                        if key in meshCache:
+                            triangles = meshCache[key]["triangles"]
+                        else:
+                            triangles = obj_triangles(path)
+                        used[key] = {"triangles": triangles, "used": now}
+                    stats.meshes[str(path)] = triangles
+                elif suffix == ".glist":
+                    count, refs = glist_instances(path)
+                    stats.glists[str(path)] = count
+                    pending.extend(refs)
+                elif suffix in _INSTANCE_SUFFIXES:
+                    stats.instance_files[str(path)] = instance_file_count(path)
+                elif suffix in _IMAGE_SUFFIXES:
+                    shape = image_shape(path)
+                    if shape is not None:
+                        stats.textures[str(path)] = shape[0] * shape[1] * shape[2]
+            except (OSError, ValueError, struct.error, XMLSyntaxError) as e:
+                stats.problems.append(f"{path}: {e}")
+        if used:
+            _save_mesh_cache(used)
+        return stats
+
+    def estimate_memory(self, threads, max_nodes):
+        """Estimated peak DIRSIG memory in bytes for a thread count and path depth."""
+        return (BASE_BYTES
+                + self.triangles * BYTES_PER_TRIANGLE
+                + self.instances * BYTES_PER_INSTANCE
+                + self.texture_bytes
+                + threads * (BYTES_PER_THREAD + max_nodes * BYTES_PER_THREAD_NODE))
+
+    def plan(self, max_nodes, memory=None, cpus=None):
+        """Largest thread count, then path depth, that fits in ``memory``.
+
+        Threads are reduced first; the path depth only drops (down to 1)
+        when a single thread at ``max_nodes`` does not fit.
+
+        Returns:
+            (threads, max_nodes)
+        """
+        cpus = cpus or os.cpu_count() or 1
+        if memory is None:
+            return cpus, max_nodes
+        budget = memory * MEMORY_FRACTION
+        for nodes in range(max_nodes, 0, -1):
+            for threads in range(cpus, 0, -1):
+                if self.estimate_memory(threads, nodes) <= budget:
+                    return threads, nodes
+        logger.warning(
+            f"Scene needs an estimated {self.estimate_memory(1, 1) / 2**30:.1f} GiB, "
+            f"more than the {budget / 2**30:.1f} GiB available to DIRSIG"
+        )
+        return 1, 1
+
+    def report(self, threads=None, max_nodes=None, memory=None):
+        """The statistics as a JSON-serializable dict."""
+        report = {
+            "totals": {
+                "meshes": len(self.meshes),
+                "triangles": self.triangles,
+                "instances": self.instances,
+                "in_memory_instances": self.in_memory_instances,
+                "texture_bytes": self.texture_bytes,
+            },
+            "triangles_per_mesh": self.meshes,
+            "instances_per_glist": self.glists,
+            "instances_per_instance_file": self.instance_files,
+            "texture_bytes": self.textures,
+        }
+        if threads is not None:
+            report["render"] = {
+                "threads": threads,
+                "max_nodes": max_nodes,
+                "available_memory_bytes": memory,
+                "estimated_peak_memory_bytes": self.estimate_memory(threads, max_nodes),
+            }
+        if self.problems:
+            report["problems"] = self.problems
+        return report
+
+    def write(self, path, **kwargs):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.report(**kwargs), indent=2))
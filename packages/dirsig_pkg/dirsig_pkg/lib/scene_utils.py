@@ -16,27 +16,22 @@
 #---------------------------------------
 
 import pdb
+import atexit
 import subprocess
 import os
 import json
 import re
+import shutil
 import hashlib
-import tempfile
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from scipy.spatial.transform import Rotation
 from pathlib import Path
 from dirfm.scene import SCENE
 from dirfm import glist, materials,frames
-
-DIRS={
-    'root': Path("/tmp/elevation"),
-    'maps': Path("/tmp/elevation/maps"),
-    'material': Path("/tmp/elevation/materials"),
-    'geometry': Path("/tmp/elevation/geometry"),
-}
-for d in DIRS.values():
-    if not os.path.isdir(str(d)):
-        os.mkdir(str(d))
+from dirsig_pkg.lib.cache import cache_dir, cache_limit_bytes, file_key, prune_lru, touch
+from dirsig_pkg.lib.geometry_files import glist_source_hash
+from dirsig_pkg.lib.workspace import run_workspace
 
 
 # Pattern for splitting multi-curve <beziercurveset> blocks. The bundled
@@ -91,33 +86,99 @@ def _split_beziercurveset(match):
     return '\n'.join(chunks)
 
 
+_BEZIER_OPEN = "<beziercurveset>"
+_BEZIER_CLOSE = "</beziercurveset>"
+
+
+def _stream_split_beziercurvesets(src, dst, chunk_size=1 << 22):
+    """Copy ``src`` to ``dst`` splitting multi-curve sets, one chunk at a time.
+
+    Only text outside <beziercurveset> blocks plus at most one block is
+    held in memory, so memory stays flat on very large glists.
+
+    Returns:
+        True if any multi-curve set was found (and split).
+    """
+    patched = False
+    buffer = ""
+    while True:
+        chunk = src.read(chunk_size)
+        buffer += chunk
+        while True:
+            start = buffer.find(_BEZIER_OPEN)
+            if start < 0:
+                # Hold back a possible partial opening tag at the end
+                cut = len(buffer) if not chunk else max(len(buffer) - len(_BEZIER_OPEN) + 1, 0)
+                dst.write(buffer[:cut])
+                buffer = buffer[cut:]
+                break
+            end = buffer.find(_BEZIER_CLOSE, start)
+            if end < 0:
+                dst.write(buffer[:start])
+                buffer = buffer[start:]
+                break
+            end += len(_BEZIER_CLOSE)
+            dst.write(buffer[:start])
+            block = buffer[start:end]
+            match = _BEZIER_CURVESET_RE.fullmatch(block)
+            if match and len(match.group(2).split()) > 1:
+                block = _split_beziercurveset(match)
+                patched = True
+            dst.write(block)
+            buffer = buffer[end:]
+        if not chunk:
+            dst.write(buffer)
+            return patched
+
+
 def patch_glist_split_beziercurvesets(source_path):
     """Return a glist Path with single-curve <beziercurveset> blocks.
 
     If the source already contains only single-curve sets the original path
-    is returned untouched. Otherwise a patched copy is cached under
-    /tmp/dirsig_pkg_patched/ keyed by source path + mtime + size, and that
-    cached path is returned. Subsequent calls with an unchanged source reuse
-    the cached file.
+    is returned untouched. Otherwise a patched copy is written under the
+    ``patched_glists`` cache directory and that path is returned.
+
+    The verdict for each source (clean, or the name of its patched copy) is
+    remembered in ``verdicts.json`` keyed by path + mtime + size, so an
+    unchanged source is never read again. Sources are patched in a single
+    streaming pass.
     """
     source_path = Path(source_path)
-    src = source_path.read_text()
-    # Fast bail-out: only rewrite if at least one set has multiple curves.
-    if not any(
-        len(m.group(2).split()) > 1 for m in _BEZIER_CURVESET_RE.finditer(src)
-    ):
+    patchedDir = cache_dir("patched_glists")
+    verdictsPath = patchedDir / "verdicts.json"
+    try:
+        verdicts = json.loads(verdictsPath.read_text())
+    except (OSError, ValueError):
+        verdicts = {}
+
+    key = file_key(source_path)
+    verdict = verdicts.get(key)
+    if verdict == "clean":
         return source_path
+    if verdict is not None and (patchedDir / verdict).exists():
+        return patchedDir / verdict
+
+    digest = hashlib.sha1(key.encode()).hexdigest()[:12]
+    out_path = patchedDir / "{}_{}.glist".format(source_path.stem, digest)
+    tmpPath = patchedDir / "{}.{}.tmp".format(out_path.name, os.getpid())
+    with open(source_path, encoding="utf-8", newline="") as src, \
+            open(tmpPath, "w", encoding="utf-8", newline="") as dst:
+        patched = _stream_split_beziercurvesets(src, dst)
+    if patched:
+        os.replace(tmpPath, out_path)
+    else:
+        tmpPath.unlink()
 
-    stat = source_path.stat()
-    key_seed = "{}|{}|{}".format(source_path, stat.st_mtime_ns, stat.st_size)
-    digest = hashlib.sha1(key_seed.encode()).hexdigest()[:12]
-    cache_dir = Path(tempfile.gettempdir()) / "dirsig_pkg_patched"
-    cache_dir.mkdir(parents=True, exist_ok=True)
-    out_path = cache_dir / "{}_{}.glist".format(source_path.stem, digest)
-    if not out_path.exists():
-        patched = _BEZIER_CURVESET_RE.sub(_split_beziercurveset, src)
-        out_path.write_text(patched)
-    return out_path
+    # Other runs may have recorded verdicts meanwhile; merge and publish atomically
+    try:
+        verdicts = json.loads(verdictsPath.read_text())
+    except (OSError, ValueError):
+        verdicts = {}
+    verdicts[key] = out_path.name if patched else "clean"
+    tmpVerdicts = patchedDir / "verdicts.json.{}.tmp".format(os.getpid())
+    tmpVerdicts.write_text(json.dumps(verdicts, indent=1))
+    os.replace(tmpVerdicts, verdictsPath)
+    return out_path if patched else source_path
 
 
 def terrain_scene(terrain_bundle_object):
@@ -136,18 +197,19 @@ def terrain_scene(terrain_bundle_object):
         #dummyMat.set_temp_solver(materials.DataDrivenTempSolver(100))
         sceneObj.add_material(dummyMat)
 
-        sceneObj.set_ems_dir(DIRS["material"])
-        sceneObj.set_ext_dir(DIRS["material"])
-        sceneObj.set_abs_dir(DIRS["material"])
-        sceneObj.set_src_dir(DIRS["material"])
-        sceneObj.set_map_dir(DIRS["maps"])
+        dirs = run_workspace().scene_dirs("elevation")
+        sceneObj.set_ems_dir(dirs["material"])
+        sceneObj.set_ext_dir(dirs["material"])
+        sceneObj.set_abs_dir(dirs["material"])
+        sceneObj.set_src_dir(dirs["material"])
+        sceneObj.set_map_dir(dirs["maps"])
         
         terrain_bundle_object.add_instance(glist.StaticInstance("terrain"))
         sceneGlist =  glist.GLIST().add_object(terrain_bundle_object)
         sceneObj.add_geometry("Elevation", sceneGlist)
         sceneObj.set_origin(frames.GeodeticFrame(0,0,0))
 
-        sceneFilepath = str(sceneObj.write(DIRS, out_fname="elevation.scene"))
+        sceneFilepath = str(sceneObj.write(dirs, out_fname="elevation.scene"))
         
         result1 = subprocess.run(
             ["scene2hdf", sceneFilepath],
@@ -159,6 +221,38 @@ def terrain_scene(terrain_bundle_object):
         return sceneFilepath + ".hdf"
 
 
+def compiled_terrain_scene(elevation_glist_path):
+    """Return the compiled elevation scene HDF for an elevation glist.
+
+    HDFs are stored under the ``elevation_hdf`` cache directory, keyed by
+    the glist content and the identity of every file it references, so each
+    terrain is compiled once per machine. The directory is kept below
+    ``DIRSIG_PKG_CACHE_ELEVATION_HDF_MB`` (default 4 GB) by evicting the
+    least recently used scenes.
+
+    Raises:
+        RuntimeError: if scene2hdf does not produce an HDF.
+    """
+    key = glist_source_hash(elevation_glist_path)
+    hdfCacheDir = cache_dir("elevation_hdf")
+    hdfPath = hdfCacheDir / f"{key}.scene.hdf"
+    if hdfPath.exists():
+        touch(hdfPath)
+        return str(hdfPath)
+
+    terrainBundleObject = glist.Object(glist.GlistBaseGeometry(Path(elevation_glist_path)))
+    compiledPath = terrain_scene(terrainBundleObject)
+    if not os.path.exists(compiledPath):
+        raise RuntimeError(f"scene2hdf did not compile an elevation scene for {elevation_glist_path}")
+
+    # Publish atomically so concurrent runs never read a partial HDF
+    tmpPath = hdfCacheDir / f"{key}.{os.getpid()}.tmp"
+    shutil.copyfile(compiledPath, tmpPath)
+    os.replace(tmpPath, hdfPath)
+    prune_lru(hdfCacheDir, cache_limit_bytes("elevation_hdf", 4096), keep=[hdfPath])
+    return str(hdfPath)
+
+
 def elevation(scene_hdf_path, location_x, location_y):
     """Look up terrain height and surface normal at an (x, y) ENU location.
 
@@ -181,52 +275,171 @@ def elevation(scene_hdf_path, location_x, location_y):
         RuntimeError: if the raycast finds no terrain at (x, y), typically
             because the location lies outside the terrain bounds.
     """
-    result = subprocess.run(
-        ["scene_tool", "summary", scene_hdf_path],
-        capture_output=True,
-        text=True,
-        env=os.environ,
-    )
-    data0 = json.loads(result.stdout)
-    originAlt = str(
-        int(data0[scene_hdf_path]['boxMax'][2]) + 1
+    heights, normals = elevation_many(scene_hdf_path, [location_x], [location_y])
+    return float(heights[0]), [float(v) for v in normals[0]]
+
+
+def elevation_many(scene_hdf_path, locations_x, locations_y):
+    """Vectorized :func:`elevation` over arrays of ENU coordinates.
+
+    All raycasts for the batch are pipelined through the scene's shared
+    :class:`RaycastWorker`, so the scene summary is read once per HDF and
+    the rays run concurrently. For large batches prefer
+    ``terrain.TerrainElevation.elevation_many``, which answers from an
+    in-process heightfield.
+
+    Returns:
+        tuple ``(heights, normals)`` of arrays shaped ``(N,)`` and ``(N, 3)``.
+
+    Raises:
+        RuntimeError: if any raycast finds no terrain.
+    """
+    xs = np.atleast_1d(np.asarray(locations_x, dtype=float))
+    ys = np.atleast_1d(np.asarray(locations_y, dtype=float))
+    worker = raycast_worker(scene_hdf_path)
+
+    # The new scene_tool raycast no longer reports a hit normal, so derive it
+    # from a forward-difference over two neighbouring samples. Falls back to
+    # straight-up [0, 0, 1] if either neighbour misses the terrain.
+    eps = 1.0
+    z, zx, zy = np.split(
+        worker.height_many(
+            np.concatenate([xs, xs + eps, xs]),
+            np.concatenate([ys, ys, ys + eps]),
+        ),
+        3,
     )
+    missed = np.isnan(z)
+    if np.any(missed):
+        idx = int(np.argmax(missed))
+        others = int(missed.sum()) - 1
+        raise RuntimeError(
+            f"Terrain raycast failed at coordinates ({xs[idx]}, {ys[idx]})"
+            + (f" and {others} other location(s). " if others else ". ") +
+            f"No terrain geometry found at this location. "
+            f"This may indicate that the object is positioned outside the terrain bounds "
+            f"or the terrain geometry is missing from the scene."
+        )
 
-    def _raycast_z(x, y):
-        out = subprocess.run(
-            ["scene_tool", "raycast", "--origin", str(x), str(y), originAlt, "--direction", "0", "0", "-1", scene_hdf_path],
+    normals = np.stack([-(zx - z) / eps, -(zy - z) / eps, np.ones_like(z)], axis=-1)
+    flat = np.isnan(zx) | np.isnan(zy)
+    normals[flat] = [0.0, 0.0, 1.0]
+    normals /= np.linalg.norm(normals, axis=-1, keepdims=True)
+    return z, normals
+
+
+# Concurrent scene_tool processes per RaycastWorker. Each one loads the
+# whole compiled scene, so this is bounded by memory rather than cores.
+RAYCAST_WORKERS_ENV = "DIRSIG_PKG_RAYCAST_WORKERS"
+DEFAULT_RAYCAST_WORKERS = 4
+
+
+class RaycastWorker:
+    """Long-lived scene_tool raycast service for one compiled scene HDF.
+
+    The scene's ``boxMax`` is read from ``scene_tool summary`` once and kept.
+    Queries are pipelined: they are handed to a bounded pool of scene_tool
+    processes (``max_workers``, default ``DIRSIG_PKG_RAYCAST_WORKERS`` or 4)
+    as they arrive and their results are returned in request order.
+
+    Use :func:`raycast_worker` to share one worker per HDF and
+    :func:`shutdown_raycast_workers` (or ``close()``) when the node is done.
+    """
+
+    def __init__(self, scene_hdf_path, max_workers=None):
+        self.scene_hdf_path = str(scene_hdf_path)
+        self._box_max = None
+        if max_workers is None:
+            max_workers = int(os.environ.get(RAYCAST_WORKERS_ENV, DEFAULT_RAYCAST_WORKERS))
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(1, max_workers),
+            thread_name_prefix="raycast",
+        )
+
+    @staticmethod
+    def _scene_tool(*args):
+        """Run scene_tool and return its parsed JSON output.
+
+        Raises:
+            RuntimeError: if scene_tool exits with an error.
+        """
+        result = subprocess.run(
+            ["scene_tool", *args],
             capture_output=True,
             text=True,
             env=os.environ,
         )
-        hits = json.loads(out.stdout)
-        if not hits:
-            return None
-        return hits[0]['hitPosition'][2]
+        if result.returncode != 0:
+            raise RuntimeError(
+                f"scene_tool {args[0]} failed with exit status {result.returncode}: "
+                f"{result.stderr.strip()}"
+            )
+        return json.loads(result.stdout)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def box_max(self):
+        """Upper corner of the scene bounding box, read once per HDF."""
+        if self._box_max is None:
+            data0 = self._scene_tool("summary", self.scene_hdf_path)
+            self._box_max = list(data0[self.scene_hdf_path]['boxMax'])
+        return self._box_max
+
+    def _raycast(self, origin, direction):
+        return self._scene_tool(
+            "raycast",
+            "--origin", *[str(v) for v in origin],
+            "--direction", *[str(v) for v in direction],
+            self.scene_hdf_path,
+        )
 
-    locationZ = _raycast_z(location_x, location_y)
-    if locationZ is None:
-        raise RuntimeError(
-            f"Terrain raycast failed at coordinates ({location_x}, {location_y}). "
-            f"No terrain geometry found at this location. "
-            f"This may indicate that the object is positioned outside the terrain bounds "
-            f"or the terrain geometry is missing from the scene."
+    def submit(self, origin, direction):
+        """Queue one ray; returns a Future resolving to scene_tool's hit list."""
+        return self._pool.submit(self._raycast, origin, direction)
+
+    def raycast_many(self, origins, directions):
+        """Hit lists for many rays, in the order the rays were given."""
+        futures = [self.submit(o, d) for o, d in zip(origins, directions)]
+        return [f.result() for f in futures]
+
+    def height_many(self, xs, ys):
+        """Height of the first downward hit at each (x, y); NaN on a miss."""
+        originAlt = int(self.box_max[2]) + 1
+        hits = self.raycast_many(
+            [(x, y, originAlt) for x, y in zip(xs, ys)],
+            [(0, 0, -1)] * len(xs),
         )
+        return np.array([h[0]['hitPosition'][2] if h else np.nan for h in hits], dtype=float)
+
+    def close(self):
+        """Finish in-flight rays and stop the worker threads."""
+        self._pool.shutdown(wait=True)
+
+
+_RAYCAST_WORKERS = {}
+
+
+def raycast_worker(scene_hdf_path):
+    """Return the shared RaycastWorker for a compiled scene HDF."""
+    key = str(scene_hdf_path)
+    if key not in _RAYCAST_WORKERS:
+        _RAYCAST_WORKERS[key] = RaycastWorker(key)
+    return _RAYCAST_WORKERS[key]
 
-    # The new scene_tool raycast no longer reports a hit normal, so derive it
-    # from a forward-difference over two neighbouring samples. Falls back to
-    # straight-up [0, 0, 1] if either neighbour misses the terrain.
-    eps = 1.0
-    zx = _raycast_z(location_x + eps, location_y)
-    zy = _raycast_z(location_x, location_y + eps)
-    if zx is None or zy is None:
-        surfaceNormal = [0.0, 0.0, 1.0]
-    else:
-        nx, ny, nz = -(zx - locationZ) / eps, -(zy - locationZ) / eps, 1.0
-        norm = (nx * nx + ny * ny + nz * nz) ** 0.5
-        surfaceNormal = [nx / norm, ny / norm, nz / norm]
 
-    return locationZ, surfaceNormal
+def shutdown_raycast_workers():
+    """Close every shared RaycastWorker."""
+    while _RAYCAST_WORKERS:
+        _, worker = _RAYCAST_WORKERS.popitem()
+        worker.close()
+
+
+atexit.register(shutdown_raycast_workers)
 
 
 def align_directions(target_direction, source_direction, units="radians"):
@@ -256,6 +469,29 @@ def align_directions(target_direction, source_direction, units="radians"):
 
     return eulerAngles
 
+
+def align_directions_many(target_directions, source_direction, units="radians"):
+    """ Vectorized align_directions for many surface normals at once
+    Input target_directions - (N, 3) array of vectors, source_direction - a vector of 3 floats
+    Output an (N, 3) array of Euler angles ('xyz'), one row per target direction
+    """
+    surfaceNormals = np.atleast_2d(np.asarray(target_directions, dtype=float))
+    objNormal = np.asarray(source_direction, dtype=float)
+
+    rotationAxes = np.cross(objNormal, surfaceNormals)
+    axisNorms = np.linalg.norm(rotationAxes, axis=1)
+    # Parallel (or antiparallel) rows keep a zero rotation, as in align_directions
+    tilted = axisNorms >= 1e-9
+    eulerAngles = np.zeros((len(surfaceNormals), 3))
+    if np.any(tilted):
+        rotationAngles = np.arccos(np.clip(surfaceNormals[tilted] @ objNormal, -1.0, 1.0))
+        rotvecs = rotationAxes[tilted] / axisNorms[tilted, None] * rotationAngles[:, None]
+        eulerAngles[tilted] = Rotation.from_rotvec(rotvecs).as_euler('xyz') #radians
+    if units == "degrees":
+        eulerAngles = np.degrees(eulerAngles)
+
+    return eulerAngles
+
     
 if __name__ == "__main__":
 
@@ -57,6 +57,43 @@ def random_points_in_polygon(polygon, k):
     locations = [[point.x, point.y, 0.0] for point in points]
     return locations
 
+def polygon_triangles(polygon):
+    """Triangles covering a polygon as an (N, 3, 2) vertex array.
+
+    Delaunay triangles of the polygon's vertices that fall outside a
+    concave polygon are dropped.
+    """
+    triangles = [t for t in triangulate(polygon) if polygon.contains(t.representative_point())]
+    return np.array([t.exterior.coords[:3] for t in triangles], dtype=float).reshape(-1, 3, 2)
+
+
+def sample_points_in_polygon(polygon, k, random_state=None):
+    """Return a (k, 3) float array of points uniformly distributed inside the polygon (z = 0).
+
+    Vectorized counterpart of random_points_in_polygon: the triangle of every
+    point is drawn with one area-weighted choice, the barycentric coordinates
+    with one (k, 2) draw, and all points are mapped into their triangles with
+    one matmul. ``random_state`` defaults to ctx.random, so the points are
+    deterministic per (seed, interp_num).
+    """
+    random_state = ctx.random if random_state is None else random_state
+    triangles = polygon_triangles(polygon)
+    points = np.zeros((k, 3))
+    if k <= 0 or not len(triangles):
+        return points
+    origins = triangles[:, 0]
+    # Edge vectors of each triangle as the columns of a 2x2 matrix
+    edges = np.stack([triangles[:, 1] - origins, triangles[:, 2] - origins], axis=2)
+    areas = 0.5 * np.abs(np.linalg.det(edges))
+    chosen = random_state.choice(len(triangles), size=k, p=areas / areas.sum())
+    uv = random_state.random_sample((k, 2))
+    # Fold points from the far half of the unit square back into the triangle
+    flip = uv.sum(axis=1) > 1
+    uv[flip] = 1 - uv[flip]
+    points[:, :2] = origins[chosen] + np.matmul(edges[chosen], uv[:, :, None])[:, :, 0]
+    return points
+
+
 def random_points_in_polygon_with_min_distance(polygon, k, min_dist, max_attempts=1000):
     """
     Return list of k points in 2 dimensions chosen uniformly at random inside the polygon,
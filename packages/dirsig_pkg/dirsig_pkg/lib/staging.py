@@ -0,0 +1,556 @@
+#---------------------------------------
+# Copyright 2019-2025 DADoES, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License in the root directory in the "LICENSE" file or at:
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#---------------------------------------
+
+# Local staging of package volume content. Scene nodes pass every volume file
+# they hand to DIRSIG (glists, OBJs, instance files, maps) through stage(),
+# which copies it once into a content-addressed store on local disk and
+# returns a local path. Staged files are exposed under a mirror of their
+# original directory layout, so relative references between glists and
+# their geometry keep resolving to staged copies.
+#
+#   <cache>/assets/blobs/<sha256[:2]>/<sha256>   file content, stored once
+#   <cache>/assets/mirror/<original path>        hard link to the blob
+#   <cache>/assets/manifest.json                 source identity -> sha256
+#   <cache>/assets/leases/<host>-<pid>           held while a run uses the store
+#
+# Background nodes call prefetch() with their asset set as soon as they
+# execute; the files are staged on a bounded thread pool while the rest of
+# the graph runs, stage() hands out their mirror paths without waiting, and
+# Simulate calls wait_for_prefetch() before DIRSIG starts. The manifest is
+# saved then, and again when the run ends and prune_staged_assets() releases
+# its lease. The store is only pruned when no other run holds a lease, and
+# never loses content used within PRUNE_GRACE_SECONDS.
+#
+# Set DIRSIG_PKG_STAGE_ASSETS=0 to use the volume paths directly, and
+# DIRSIG_PKG_PREFETCH_WORKERS to size the prefetch pool (default 8).
+
+import os
+import json
+import hashlib
+import logging
+import shutil
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from dirsig_pkg.lib.cache import cache_dir, cache_limit_bytes, file_key
+from dirsig_pkg.lib.geometry_files import glist_referenced_files
+
+logger = logging.getLogger(__name__)
+
+STAGE_ASSETS_ENV = "DIRSIG_PKG_STAGE_ASSETS"
+PREFETCH_WORKERS_ENV = "DIRSIG_PKG_PREFETCH_WORKERS"
+
+_COPY_BUFFER = 1 << 22
+
+# Content used this recently is never pruned
+PRUNE_GRACE_SECONDS = 3600
+# Leases not refreshed for this long are treated as abandoned
+LEASE_TIMEOUT_SECONDS = 24 * 3600
+
+
+class AssetStore:
+    """Content-addressed store of staged volume files.
+
+    The manifest records, for each source path, the file identity
+    (path + mtime + size) it was staged from and the sha256 and size of
+    its content, so unchanged sources are reused without reading them.
+    The store is kept below ``max_bytes`` (default
+    ``DIRSIG_PKG_CACHE_ASSETS_MB``, 20 GB) by evicting the least recently
+    used content.
+    """
+
+    MANIFEST = "manifest.json"
+
+    def __init__(self, root=None, max_bytes=None):
+        self.root = Path(root) if root is not None else cache_dir("assets")
+        self.blobs = self.root / "blobs"
+        self.mirror = self.root / "mirror"
+        self.leases = self.root / "leases"
+        if max_bytes is None:
+            max_bytes = cache_limit_bytes("assets", 20480)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._manifest = self._read_manifest()
+        self._dirty = False
+        self.leased = False
+
+    def _read_manifest(self):
+        try:
+            return json.loads((self.root / self.MANIFEST).read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        """Merge the manifest with other processes' entries and publish it."""
+        with self._lock:
+            if not self._dirty:
+                return
+            merged = self._read_manifest()
+            for src, entry in self._manifest.items():
+                if entry.get("used", 0) >= merged.get(src, {}).get("used", 0):
+                    merged[src] = entry
+            self._manifest = {
+                src: entry for src, entry in merged.items()
+                if self._blob_path(entry["sha256"]).exists()
+            }
+            self.root.mkdir(parents=True, exist_ok=True)
+            tmpPath = self.root / f"{self.MANIFEST}.{os.getpid()}.tmp"
+            tmpPath.write_text(json.dumps(self._manifest, indent=1))
+            os.replace(tmpPath, self.root / self.MANIFEST)
+            self._dirty = False
+
+    def _blob_path(self, sha):
+        return self.blobs / sha[:2] / sha
+
+    def _lease_path(self):
+        return self.leases / f"{socket.gethostname()}-{os.getpid()}"
+
+    def acquire_lease(self):
+        """Mark the store as in use by this process until :meth:`release_lease`."""
+        self.leases.mkdir(parents=True, exist_ok=True)
+        self._lease_path().touch()
+        self.leased = True
+
+    def release_lease(self):
+        self.leased = False
+        try:
+            self._lease_path().unlink()
+        except OSError:
+            pass
+
+    def _live_leases(self):
+        """Leases held by other runs; abandoned ones are removed."""
+        live = []
+        host = socket.gethostname()
+        try:
+            leases = list(self.leases.iterdir())
+        except OSError:
+            return live
+        for leasePath in leases:
+            if leasePath == self._lease_path():
+                continue
+            leaseHost, _, pid = leasePath.name.rpartition("-")
+            try:
+                age = time.time() - leasePath.stat().st_mtime
+            except OSError:
+                continue
+            alive = age < LEASE_TIMEOUT_SECONDS
+            if alive and leaseHost == host and pid.isdigit():
+                try:
+                    os.kill(int(pid), 0)
+                except ProcessLookupError:
+                    alive = False
+                except PermissionError:
+                    pass
+            if alive:
+                live.append(leasePath)
+            else:
+                logger.info(f"Removing abandoned asset store lease {leasePath.name}")
+                try:
+                    leasePath.unlink()
+                except OSError:
+                    pass
+        return live
+
+    def mirror_path(self, source_path):
+        """Where the staged copy of ``source_path`` is exposed."""
+        return self.mirror / Path(os.path.abspath(source_path)).relative_to("/")
+
+    def is_staged_path(self, path):
+        return self.root in Path(os.path.abspath(path)).parents
+
+    def source_path(self, path):
+        """The volume path a mirror path was staged from (``path`` itself otherwise)."""
+        path = Path(os.path.abspath(path))
+        if self.mirror in path.parents:
+            return Path("/") / path.relative_to(self.mirror)
+        return path
+
+    def _store_blob(self, source_path):
+        """Copy a file into the store, hashing it on the way.
+
+        Raises:
+            OSError: if the source changed size while it was copied.
+        """
+        expected = source_path.stat().st_size
+        tmpDir = self.blobs / "tmp"
+        tmpDir.mkdir(parents=True, exist_ok=True)
+        tmpPath = tmpDir / f"{os.getpid()}.{threading.get_ident()}.tmp"
+        h = hashlib.sha256()
+        size = 0
+        with open(source_path, "rb") as src, open(tmpPath, "wb") as dst:
+            while True:
+                chunk = src.read(_COPY_BUFFER)
+                if not chunk:
+                    break
+                h.update(chunk)
+                dst.write(chunk)
+                size += len(chunk)
+        if size != expected:
+            tmpPath.unlink()
+            raise OSError(f"{source_path} changed while it was staged")
+        sha = h.hexdigest()
+        blobPath = self._blob_path(sha)
+        if blobPath.exists():
+            # Same content is already stored (possibly linked elsewhere); keep that inode
+            tmpPath.unlink()
+        else:
+            blobPath.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(tmpPath, blobPath)
+        return sha, size
+
+    def _link(self, blob_path, mirror_path):
+        """Point ``mirror_path`` at a blob (hard link, copy as fallback)."""
+        mirror_path.parent.mkdir(parents=True, exist_ok=True)
+        tmpPath = mirror_path.with_name(f".{mirror_path.name}.{os.getpid()}.{threading.get_ident()}")
+        try:
+            os.link(blob_path, tmpPath)
+        except OSError:
+            shutil.copyfile(blob_path, tmpPath)
+        os.replace(tmpPath, mirror_path)
+
+    def stage_file(self, source_path):
+        """Stage one file and return the path of its local copy."""
+        source_path = Path(os.path.abspath(source_path))
+        key = file_key(source_path)
+        mirrorPath = self.mirror_path(source_path)
+        entry = self._manifest.get(str(source_path))
+        if entry is not None and entry["key"] == key:
+            blobPath = self._blob_path(entry["sha256"])
+            try:
+                blobSize = blobPath.stat().st_size
+            except OSError:
+                blobSize = None
+            if blobSize == entry["size"]:
+                if not mirrorPath.exists() or not os.path.samefile(mirrorPath, blobPath):
+                    self._link(blobPath, mirrorPath)
+                with self._lock:
+                    entry["used"] = time.time()
+                    self._dirty = True
+                return mirrorPath
+
+        sha, size = self._store_blob(source_path)
+        self._link(self._blob_path(sha), mirrorPath)
+        with self._lock:
+            self._manifest[str(source_path)] = {
+                "key": key, "sha256": sha, "size": size, "used": time.time(),
+            }
+            self._dirty = True
+        return mirrorPath
+
+    def stage_glist(self, glist_path):
+        """Stage a glist and every file it references; return the staged glist."""
+        glist_path = Path(os.path.abspath(glist_path))
+        for ref in glist_referenced_files(glist_path):
+            if ref.exists():
+                self.stage_file(ref)
+            else:
+                logger.warning(f"{glist_path} references missing file {ref}")
+        return self.stage_file(glist_path)
+
+    def verify(self):
+        """Re-hash every blob and drop those whose content no longer matches.
+
+        Returns the number of corrupt blobs removed.
+        """
+        corrupt = 0
+        for blobPath in self.blobs.glob("??/*"):
+            h = hashlib.sha256()
+            with open(blobPath, "rb") as f:
+                for chunk in iter(lambda: f.read(_COPY_BUFFER), b""):
+                    h.update(chunk)
+            if h.hexdigest() != blobPath.name:
+                logger.warning(f"Removing corrupt staged asset {blobPath}")
+                self._evict(blobPath.name)
+                corrupt += 1
+        self.save()
+        return corrupt
+
+    def _evict(self, sha):
+        """Remove a blob and every mirror link to it."""
+        with self._lock:
+            for src in [s for s, e in self._manifest.items() if e["sha256"] == sha]:
+                del self._manifest[src]
+                try:
+                    self.mirror_path(src).unlink()
+                except OSError:
+                    pass
+            self._dirty = True
+        try:
+            self._blob_path(sha).unlink()
+        except OSError:
+            pass
+
+    def prune(self):
+        """Evict least recently used content until the store fits ``max_bytes``.
+
+        Recency comes from the manifest, not file times: staged files keep
+        the mtime they were stored with, so mtime-keyed caches built on
+        them stay valid. Blobs no manifest entry refers to go first. Nothing
+        is pruned while another run holds a lease, and content used or
+        stored within ``PRUNE_GRACE_SECONDS`` is always kept, since another
+        run may have staged it without saving the manifest yet.
+        """
+        self.save()
+        leases = self._live_leases()
+        if leases:
+            logger.info(f"Not pruning staged assets; {len(leases)} other runs are using them")
+            return
+        cutoff = time.time() - PRUNE_GRACE_SECONDS
+        used = {}
+        with self._lock:
+            for entry in self._manifest.values():
+                used[entry["sha256"]] = max(used.get(entry["sha256"], 0), entry.get("used", 0))
+        blobs = []
+        for blobPath in self.blobs.glob("??/*"):
+            try:
+                stat = blobPath.stat()
+            except OSError:
+                continue
+            blobs.append((used.get(blobPath.name, 0), stat.st_size, blobPath.name, stat.st_mtime))
+        total = sum(size for _, size, _, _ in blobs)
+        for lastUsed, size, sha, stored in sorted(blobs):
+            if total <= self.max_bytes:
+                break
+            if max(lastUsed, stored) >= cutoff:
+                continue
+            self._evict(sha)
+            total -= size
+        self.save()
+
+
+class _PrefetchBatch:
+    """Progress of one prefetch() call."""
+
+    def __init__(self, label, total):
+        self.label = label
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.bytes = 0
+        self.started = time.monotonic()
+        self._reported = 0
+        self._lock = threading.Lock()
+
+    def finished(self, size=None):
+        with self._lock:
+            self.done += 1
+            if size is None:
+                self.failed += 1
+            else:
+                self.bytes += size
+            # Report every tenth of the batch and at the end
+            step = self.done * 10 // self.total
+            if step == self._reported and self.done != self.total:
+                return
+            self._reported = step
+            message = (
+                f"Prefetched {self.done}/{self.total} {self.label} files "
+                f"({self.bytes / 2**20:.1f} MB, {time.monotonic() - self.started:.1f} s)"
+            )
+            if self.failed:
+                message += f", {self.failed} failed"
+        logger.info(message)
+
+
+class Prefetcher:
+    """Stages volume files into an AssetStore on a bounded thread pool.
+
+    :meth:`submit` returns immediately. Files still in flight are tracked by
+    source path (glist references included, once the glist is parsed) so
+    :func:`stage` can hand out their mirror paths without blocking, and
+    :meth:`wait` blocks until everything submitted is in place.
+    """
+
+    def __init__(self, store, max_workers=None):
+        if max_workers is None:
+            max_workers = int(os.environ.get(PREFETCH_WORKERS_ENV, 8))
+        self.store = store
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="prefetch")
+        self._lock = threading.Lock()
+        self._pending = {}
+
+    def submit(self, paths, label="scene"):
+        """Start staging ``paths``; directories contribute the files directly in them.
+
+        Missing paths are skipped. Returns the number of files queued.
+        """
+        files = []
+        for path in paths:
+            path = Path(os.path.abspath(path))
+            if path.is_dir():
+                files.extend(sorted(p for p in path.iterdir() if p.is_file()))
+            elif path.is_file():
+                files.append(path)
+            else:
+                logger.debug(f"Not prefetching missing {path}")
+        with self._lock:
+            files = [f for f in dict.fromkeys(files) if f not in self._pending]
+            if not files:
+                return 0
+            logger.info(f"Prefetching {len(files)} {label} files")
+            batch = _PrefetchBatch(label, len(files))
+            for f in files:
+                self._pending[f] = self._executor.submit(self._stage, f, batch)
+        return len(files)
+
+    def _stage(self, path, batch):
+        try:
+            if path.suffix == ".glist":
+                refs = [ref for ref in glist_referenced_files(path) if ref.exists()]
+                with self._lock:
+                    future = self._pending[path]
+                    for ref in refs:
+                        self._pending.setdefault(ref, future)
+                for ref in refs:
+                    self.store.stage_file(ref)
+            staged = self.store.stage_file(path)
+        except Exception:
+            batch.finished()
+            raise
+        batch.finished(staged.stat().st_size)
+        return staged
+
+    def pending(self, path):
+        """The future staging ``path``, or None if it was never prefetched."""
+        with self._lock:
+            return self._pending.get(Path(os.path.abspath(path)))
+
+    def wait(self):
+        """Block until every submitted file is staged.
+
+        Files whose prefetch failed are staged again synchronously, since
+        their mirror paths may already have been handed out.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        started = time.monotonic()
+        for path, future in pending.items():
+            if future.exception() is None:
+                continue
+            try:
+                self.store.stage_file(path)
+            except OSError as e:
+                logger.error(f"Could not stage {path} ({e}); {self.store.mirror_path(path)} is missing")
+        self.store.save()
+        logger.info(f"Prefetched assets ready after waiting {time.monotonic() - started:.1f} s")
+
+
+_STORE = None
+_STORE_LOCK = threading.Lock()
+
+
+def asset_store():
+    """Return the process-wide AssetStore."""
+    global _STORE
+    with _STORE_LOCK:
+        if _STORE is None:
+            _STORE = AssetStore()
+        if not _STORE.leased:
+            _STORE.acquire_lease()
+        return _STORE
+
+
+_PREFETCHER = None
+_PREFETCHER_LOCK = threading.Lock()
+
+
+def prefetcher():
+    """Return the process-wide Prefetcher, staging into :func:`asset_store`."""
+    global _PREFETCHER
+    store = asset_store()
+    with _PREFETCHER_LOCK:
+        if _PREFETCHER is None:
+            _PREFETCHER = Prefetcher(store)
+        return _PREFETCHER
+
+
+def staging_enabled():
+    return os.environ.get(STAGE_ASSETS_ENV, "1") != "0"
+
+
+def prefetch(paths, label="scene"):
+    """Start staging a scene's asset set in the background.
+
+    ``paths`` are files or directories (whose files are all taken). Does
+    nothing when staging is disabled.
+    """
+    if staging_enabled():
+        prefetcher().submit(paths, label)
+
+
+def wait_for_prefetch():
+    """Block until all prefetched assets are staged and save the manifest; call before DIRSIG runs."""
+    if _PREFETCHER is not None:
+        _PREFETCHER.wait()
+    if _STORE is not None:
+        _STORE.save()
+
+
+def stage(path, wait=False):
+    """Return a local staged copy of a volume file, or ``path`` itself.
+
+    Glists are staged together with every file they reference. Paths that
+    do not exist, are already staged, or cannot be staged (with a warning)
+    are returned unchanged, as is everything when staging is disabled.
+
+    A file that is still being prefetched has its staged path returned at
+    once, before the copy exists, unless ``wait`` is set; pass ``wait=True``
+    when the caller reads the file itself rather than handing it to DIRSIG.
+
+    The manifest is not saved per file; :func:`wait_for_prefetch` and
+    :func:`prune_staged_assets` save it once for the run.
+    """
+    path = Path(path)
+    if not staging_enabled() or not path.is_file():
+        return path
+    store = asset_store()
+    if store.is_staged_path(path):
+        return path
+    future = _PREFETCHER.pending(path) if _PREFETCHER is not None else None
+    if future is not None:
+        if not wait and not future.done():
+            return store.mirror_path(path)
+        if future.exception() is None:
+            return store.mirror_path(path)
+    try:
+        if path.suffix == ".glist":
+            staged = store.stage_glist(path)
+        else:
+            staged = store.stage_file(path)
+    except OSError as e:
+        logger.warning(f"Could not stage {path} ({e}); using it in place")
+        return path
+    return staged
+
+
+def source_path(path):
+    """The volume path behind a staged copy returned by :func:`stage`."""
+    return asset_store().source_path(path) if staging_enabled() else Path(path)
+
+
+def prune_staged_assets():
+    """Release this run's lease and trim the asset store to its size cap.
+
+    Called when a run ends; the next :func:`stage` takes a new lease.
+    """
+    if _STORE is not None:
+        _STORE.release_lease()
+        _STORE.prune()
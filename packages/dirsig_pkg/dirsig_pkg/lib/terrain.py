@@ -0,0 +1,752 @@
+#---------------------------------------
+# Copyright 2019-2025 DADoES, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License in the root directory in the "LICENSE" file or at:
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#---------------------------------------
+
+# In-process terrain height and normal lookups.
+#
+# scene_utils.elevation() answers every (x, y) query by starting DIRSIG's
+# scene_tool several times. For object placement a regular-grid DEM sampled
+# from the terrain mesh is accurate to well below an object's footprint, so
+# the DEM is built once per elevation glist (and cached on disk) and queried
+# with bilinear interpolation. Terrains too large for one in-memory grid
+# (Sierra Nevada) use a tiled pyramid that is memory-mapped tile by tile.
+# The raycast path remains available as the exact fallback for points the
+# DEM cannot answer.
+
+import os
+import json
+import shutil
+import logging
+from collections import OrderedDict
+from pathlib import Path
+import numpy as np
+from dirfm import glist
+from scipy.interpolate import LinearNDInterpolator, griddata
+from dirsig_pkg.lib.cache import cache_dir, cache_limit_bytes
+from dirsig_pkg.lib.geometry_files import (
+    glist_portable_hash,
+    glist_source_hash,
+    glist_wavefront_instances,
+    read_obj_vertices,
+)
+from dirsig_pkg.lib.scene_utils import align_directions_many, compiled_terrain_scene, elevation_many
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on DEM samples per axis when the spacing is derived from the
+# mesh density; keeps a full-scene DEM within a few tens of MB.
+DEFAULT_MAX_CELLS = 4096
+
+# Elevation glists of the dirsig-shared backgrounds (package volume paths).
+# These are the terrains bake_elevation produces sidecars for.
+ELEVATION_GLISTS = {
+    "Desert_Highway_v2": "dirsig-shared:Desert_Highway_v2/geometry/Terrain_elevation.glist",
+    "Sierra_Nevada": "dirsig-shared:Sierra_Nevada/bundles/terrain/elevation.glist",
+    "LWIR_Urban_Alt": "dirsig-shared:LWIR_Urban_Alt/geometry/terrain_elevation.glist",
+    "Europe7km": "dirsig-shared:Europe7km-11-July-2024/Europe7km/bundles/terrain/terrain-dirt.glist",
+}
+
+
+class Heightfield:
+    """A regular-grid DEM over the scene's ENU x/y plane.
+
+    ``heights[j, i]`` is the terrain height at
+    ``(origin[0] + i * spacing[0], origin[1] + j * spacing[1])``. Cells the
+    terrain mesh does not cover hold NaN.
+    """
+
+    def __init__(self, heights, origin, spacing, source_hash=None):
+        self.heights = heights
+        self.origin = (float(origin[0]), float(origin[1]))
+        self.spacing = (float(spacing[0]), float(spacing[1]))
+        self.source_hash = source_hash
+
+    @property
+    def shape(self):
+        return self.heights.shape
+
+    @property
+    def bounds(self):
+        """``(xmin, ymin, xmax, ymax)`` covered by the grid."""
+        ny, nx = self.heights.shape
+        return (
+            self.origin[0],
+            self.origin[1],
+            self.origin[0] + (nx - 1) * self.spacing[0],
+            self.origin[1] + (ny - 1) * self.spacing[1],
+        )
+
+    def _cells(self, x, y):
+        """Cell indices and fractional offsets of each query point."""
+        ny, nx = self.heights.shape
+        fx = (np.asarray(x, dtype=float) - self.origin[0]) / self.spacing[0]
+        fy = (np.asarray(y, dtype=float) - self.origin[1]) / self.spacing[1]
+        i = np.clip(np.floor(fx).astype(int), 0, nx - 2)
+        j = np.clip(np.floor(fy).astype(int), 0, ny - 2)
+        return i, j, fx - i, fy - j
+
+    def _corners(self, i, j):
+        h = self.heights
+        return h[j, i], h[j, i + 1], h[j + 1, i], h[j + 1, i + 1]
+
+    def contains(self, x, y):
+        """True where (x, y) lies inside the grid on fully covered cells."""
+        xmin, ymin, xmax, ymax = self.bounds
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        inside = (x >= xmin) & (x <= xmax) & (y >= ymin) & (y <= ymax)
+        i, j, _, _ = self._cells(x, y)
+        finite = np.all(np.isfinite(self._corners(i, j)), axis=0)
+        return inside & finite
+
+    def height(self, x, y):
+        """Bilinearly interpolated terrain height at (x, y)."""
+        i, j, tx, ty = self._cells(x, y)
+        h00, h10, h01, h11 = self._corners(i, j)
+        return (
+            (1 - tx) * (1 - ty) * h00
+            + tx * (1 - ty) * h10
+            + (1 - tx) * ty * h01
+            + tx * ty * h11
+        )
+
+    def normal(self, x, y, stencil="central"):
+        """Unit terrain normal at (x, y) from the DEM height gradient.
+
+        ``stencil`` selects how the gradient is estimated:
+
+        - ``"forward"``: slope of the bilinear cell containing the point
+          (one-sided, matches the old +1 m raycast differences).
+        - ``"central"``: central differences at the surrounding grid nodes,
+          bilinearly interpolated. Symmetric; the default.
+        - ``"sobel"``: 3x3 Sobel gradient at the grid nodes, interpolated.
+          Smoother on noisy DEMs.
+
+        Returns an array of shape ``(..., 3)``.
+        """
+        i, j, tx, ty = self._cells(x, y)
+        h00, h10, h01, h11 = self._corners(i, j)
+        dzdx = ((1 - ty) * (h10 - h00) + ty * (h11 - h01)) / self.spacing[0]
+        dzdy = ((1 - tx) * (h01 - h00) + tx * (h11 - h10)) / self.spacing[1]
+        if stencil != "forward":
+            gx = np.zeros_like(dzdx)
+            gy = np.zeros_like(dzdy)
+            for di, dj, w in ((0, 0, (1 - tx) * (1 - ty)), (1, 0, tx * (1 - ty)),
+                              (0, 1, (1 - tx) * ty), (1, 1, tx * ty)):
+                nodeX, nodeY = self._node_gradient(i + di, j + dj, stencil)
+                gx += w * nodeX
+                gy += w * nodeY
+            # Stencils that reach uncovered cells fall back to the cell slope
+            valid = np.isfinite(gx) & np.isfinite(gy)
+            dzdx = np.where(valid, gx, dzdx)
+            dzdy = np.where(valid, gy, dzdy)
+        n = np.stack([-dzdx, -dzdy, np.ones_like(dzdx)], axis=-1)
+        return n / np.linalg.norm(n, axis=-1, keepdims=True)
+
+    def _node_gradient(self, i, j, stencil):
+        """Height gradient (dz/dx, dz/dy) at grid nodes (i, j).
+
+        Differences are taken over clamped neighbours, so edge nodes get
+        one-sided estimates with the matching step length.
+        """
+        h = self.heights
+        ny, nx = h.shape
+        im, ip = np.maximum(i - 1, 0), np.minimum(i + 1, nx - 1)
+        jm, jp = np.maximum(j - 1, 0), np.minimum(j + 1, ny - 1)
+        stepX = (ip - im) * self.spacing[0]
+        stepY = (jp - jm) * self.spacing[1]
+        if stencil == "central":
+            return (h[j, ip] - h[j, im]) / stepX, (h[jp, i] - h[jm, i]) / stepY
+        if stencil == "sobel":
+            gx = (h[jm, ip] - h[jm, im]) + 2 * (h[j, ip] - h[j, im]) + (h[jp, ip] - h[jp, im])
+            gy = (h[jp, im] - h[jm, im]) + 2 * (h[jp, i] - h[jm, i]) + (h[jp, ip] - h[jm, ip])
+            return gx / (4 * stepX), gy / (4 * stepY)
+        raise ValueError(f"Unknown normal stencil {stencil!r}; expected forward, central or sobel")
+
+    def save(self, npy_path):
+        """Write the grid to ``npy_path`` and its header to a .json sidecar.
+
+        Both files are written to temporary names and renamed into place,
+        header last, so concurrent readers see either the old or the new
+        grid and a header only once its grid is complete.
+        """
+        npy_path = Path(npy_path)
+        tmpPath = npy_path.with_name(f"{npy_path.name}.{os.getpid()}.tmp")
+        with open(tmpPath, "wb") as f:
+            np.save(f, np.ascontiguousarray(self.heights, dtype=np.float32))
+        os.replace(tmpPath, npy_path)
+        header = {
+            "origin": list(self.origin),
+            "spacing": list(self.spacing),
+            "shape": list(self.heights.shape),
+            "bounds": list(self.bounds),
+            "source_hash": self.source_hash,
+        }
+        headerPath = npy_path.with_suffix(".json")
+        tmpPath = headerPath.with_name(f"{headerPath.name}.{os.getpid()}.tmp")
+        tmpPath.write_text(json.dumps(header, indent=2))
+        os.replace(tmpPath, headerPath)
+        return npy_path
+
+    @classmethod
+    def load(cls, npy_path, mmap=True):
+        """Load a grid written by :meth:`save` (memory-mapped by default)."""
+        npy_path = Path(npy_path)
+        header = json.loads(npy_path.with_suffix(".json").read_text())
+        heights = np.load(npy_path, mmap_mode="r" if mmap else None)
+        return cls(heights, header["origin"], header["spacing"], header.get("source_hash"))
+
+    @classmethod
+    def from_glist(cls, elevation_glist_path, spacing=None, max_cells=DEFAULT_MAX_CELLS,
+                   vertices=None):
+        """Sample the terrain mesh of an elevation glist onto a regular grid.
+
+        The mesh vertices are triangulated in x/y and linearly interpolated,
+        which reproduces the heightmap meshes the backgrounds ship with.
+        ``spacing`` defaults to the mean vertex spacing, coarsened so neither
+        axis exceeds ``max_cells`` samples. ``vertices`` may be passed when
+        the caller already read them with :func:`terrain_vertices`.
+
+        Raises:
+            ValueError: if the glist holds no Wavefront geometry or uses
+                instance transforms that cannot be resolved in-process.
+        """
+        if vertices is None:
+            vertices = terrain_vertices(elevation_glist_path)
+        (xmin, ymin), (dx, dy), (nx, ny) = grid_layout(vertices, spacing, max_cells)
+        logger.info(
+            f"Building {nx}x{ny} heightfield at {dx:.2f} m "
+            f"from {len(vertices)} vertices of {elevation_glist_path}"
+        )
+        xmax, ymax = vertices[:, :2].max(axis=0)
+        grid_x, grid_y = np.meshgrid(
+            np.minimum(xmin + np.arange(nx) * dx, xmax), np.minimum(ymin + np.arange(ny) * dy, ymax)
+        )
+        heights = griddata(vertices[:, :2], vertices[:, 2], (grid_x, grid_y), method="linear")
+        return cls(heights, (xmin, ymin), (dx, dy),
+                   source_hash=glist_source_hash(elevation_glist_path))
+
+
+def terrain_vertices(elevation_glist_path):
+    """All terrain mesh vertices of an elevation glist in scene coordinates.
+
+    Raises:
+        ValueError: if the glist holds no Wavefront geometry, too few
+            vertices, or instance transforms that cannot be resolved.
+    """
+    placements = glist_wavefront_instances(elevation_glist_path)
+    if not placements:
+        raise ValueError(f"{elevation_glist_path}: no Wavefront terrain geometry")
+    vertices = np.concatenate(
+        [read_obj_vertices(objPath) * scale + trans for objPath, scale, trans in placements]
+    )
+    if len(vertices) < 3:
+        raise ValueError(f"{elevation_glist_path}: terrain mesh has too few vertices")
+    return vertices
+
+
+def grid_layout(vertices, spacing=None, max_cells=None):
+    """Origin, spacing and sample counts of a DEM covering ``vertices``.
+
+    ``spacing`` defaults to the mean vertex spacing and is coarsened so
+    neither axis exceeds ``max_cells`` samples (unbounded when None). The
+    sample counts are snapped so the grid edges land on the mesh extent.
+
+    Returns:
+        tuple ``((xmin, ymin), (dx, dy), (nx, ny))``.
+    """
+    xmin, ymin = vertices[:, :2].min(axis=0)
+    xmax, ymax = vertices[:, :2].max(axis=0)
+    if spacing is None:
+        spacing = native_spacing(vertices)
+    spacing = float(spacing)
+    if max_cells is not None:
+        spacing = max(spacing, (xmax - xmin) / (max_cells - 1), (ymax - ymin) / (max_cells - 1))
+    nx = max(int(round((xmax - xmin) / spacing)) + 1, 2)
+    ny = max(int(round((ymax - ymin) / spacing)) + 1, 2)
+    dx = (xmax - xmin) / (nx - 1) or spacing
+    dy = (ymax - ymin) / (ny - 1) or spacing
+    return (float(xmin), float(ymin)), (float(dx), float(dy)), (nx, ny)
+
+
+def native_spacing(vertices):
+    """Mean vertex spacing of a terrain mesh in x/y."""
+    xmin, ymin = vertices[:, :2].min(axis=0)
+    xmax, ymax = vertices[:, :2].max(axis=0)
+    return float(np.sqrt((xmax - xmin) * (ymax - ymin) / len(vertices)))
+
+
+class HeightfieldPyramid:
+    """Tiled DEM read lazily from disk.
+
+    Used for terrains whose full-resolution grid is too large to hold in
+    memory (the 150 x 150 km Sierra Nevada scene). Every query (instance
+    alignment, draping) needs the native resolution, so only that grid is
+    stored, as level 0; coarser levels in pyramids baked by older versions
+    are ignored.
+
+    The grid is cut into ``tile_size`` x ``tile_size`` cells stored as
+    ``L0/{tj}_{ti}.npy``. Tiles overlap their neighbours by a
+    one-sample apron (trimmed at the grid border), so bilinear heights and
+    the central/Sobel normals of :class:`Heightfield` are answered from a
+    single tile and match the untiled grid. Tiles
+    are memory-mapped on first use and held in an LRU bounded by
+    ``max_bytes`` (default ``DIRSIG_PKG_CACHE_HEIGHTFIELD_TILES_MB``, 256 MB).
+    Tiles the terrain does not cover at all are not written.
+
+    Queries expose the same ``bounds``/``contains``/``height``/``normal``
+    interface as :class:`Heightfield`.
+    """
+
+    HEADER = "pyramid.json"
+
+    def __init__(self, root, max_bytes=None):
+        self.root = Path(root)
+        header = json.loads((self.root / self.HEADER).read_text())
+        self.origin = tuple(header["origin"])
+        self.spacing = tuple(header["spacing"])
+        self.tile_size = int(header["tile_size"])
+        self.levels = [tuple(shape) for shape in header["levels"]]
+        self.source_hash = header.get("source_hash")
+        if max_bytes is None:
+            max_bytes = cache_limit_bytes("heightfield_tiles", 256)
+        self.max_bytes = max_bytes
+        self._tiles = OrderedDict()
+        self._resident = 0
+
+    @property
+    def shape(self):
+        return self.levels[0]
+
+    @property
+    def bounds(self):
+        """``(xmin, ymin, xmax, ymax)`` covered by the grid."""
+        ny, nx = self.levels[0]
+        return (
+            self.origin[0],
+            self.origin[1],
+            self.origin[0] + (nx - 1) * self.spacing[0],
+            self.origin[1] + (ny - 1) * self.spacing[1],
+        )
+
+    def _tile_counts(self):
+        ny, nx = self.levels[0]
+        size = self.tile_size
+        return max(-(-(ny - 1) // size), 1), max(-(-(nx - 1) // size), 1)
+
+    def _tile(self, tj, ti):
+        """The Heightfield of one tile, or None if it holds no terrain."""
+        key = (tj, ti)
+        if key in self._tiles:
+            self._tiles.move_to_end(key)
+            return self._tiles[key]
+        npyPath = self.root / "L0" / f"{tj}_{ti}.npy"
+        tile = None
+        if npyPath.exists():
+            dx, dy = self.spacing
+            heights = np.load(npyPath, mmap_mode="r")
+            origin = (
+                self.origin[0] + max(ti * self.tile_size - 1, 0) * dx,
+                self.origin[1] + max(tj * self.tile_size - 1, 0) * dy,
+            )
+            tile = Heightfield(heights, origin, (dx, dy), self.source_hash)
+            self._resident += heights.nbytes
+        self._tiles[key] = tile
+        while self._resident > self.max_bytes and len(self._tiles) > 1:
+            _, evicted = self._tiles.popitem(last=False)
+            if evicted is not None:
+                self._resident -= evicted.heights.nbytes
+        return tile
+
+    def _per_tile(self, x, y, query, fill, trailing=()):
+        """Evaluate ``query(tile, x, y)`` on the points of each touched tile."""
+        x = np.atleast_1d(np.asarray(x, dtype=float))
+        y = np.atleast_1d(np.asarray(y, dtype=float))
+        dx, dy = self.spacing
+        ntj, nti = self._tile_counts()
+        ti = np.clip(np.floor((x - self.origin[0]) / (dx * self.tile_size)), 0, nti - 1).astype(int)
+        tj = np.clip(np.floor((y - self.origin[1]) / (dy * self.tile_size)), 0, ntj - 1).astype(int)
+        result = np.full(x.shape + trailing, fill)
+        keys = tj * nti + ti
+        for key in np.unique(keys):
+            tile = self._tile(int(key // nti), int(key % nti))
+            if tile is None:
+                continue
+            mask = keys == key
+            result[mask] = query(tile, x[mask], y[mask])
+        return result
+
+    def contains(self, x, y):
+        """True where (x, y) lies on fully covered cells of the grid."""
+        return self._per_tile(x, y, Heightfield.contains, False)
+
+    def height(self, x, y):
+        """Bilinearly interpolated terrain height at (x, y)."""
+        return self._per_tile(x, y, Heightfield.height, np.nan)
+
+    def normal(self, x, y, stencil="central"):
+        """Unit terrain normal at (x, y); see :meth:`Heightfield.normal`."""
+        return self._per_tile(
+            x, y, lambda tile, tx, ty: tile.normal(tx, ty, stencil), np.nan, trailing=(3,)
+        )
+
+    @classmethod
+    def build(cls, elevation_glist_path, root, spacing=None, tile_size=512, source_hash=None,
+              vertices=None):
+        """Sample an elevation glist into a tiled pyramid under ``root``.
+
+        Tiles are interpolated one at a time from a single triangulation of
+        the mesh, so the full-resolution grid is never held in memory.
+        ``spacing`` defaults to the mesh's native vertex spacing.
+
+        The pyramid is built in a temporary sibling directory and renamed
+        into place once complete, so runs reading an existing pyramid never
+        see tiles being rewritten. If a concurrent builder has already
+        published a pyramid of the same source, that one is kept.
+
+        Raises:
+            ValueError: as :meth:`Heightfield.from_glist`.
+        """
+        root = Path(root)
+        buildRoot = root.with_name(f"{root.name}.{os.getpid()}.tmp")
+        shutil.rmtree(buildRoot, ignore_errors=True)
+        if vertices is None:
+            vertices = terrain_vertices(elevation_glist_path)
+        (xmin, ymin), (dx, dy), (nx, ny) = grid_layout(vertices, spacing)
+        if source_hash is None:
+            source_hash = glist_source_hash(elevation_glist_path)
+        logger.info(
+            f"Building {nx}x{ny} heightfield pyramid at {dx:.2f} m "
+            f"from {len(vertices)} vertices of {elevation_glist_path}"
+        )
+        xmax, ymax = vertices[:, :2].max(axis=0)
+        interpolator = LinearNDInterpolator(vertices[:, :2], vertices[:, 2])
+        del vertices
+
+        levelDir = buildRoot / "L0"
+        levelDir.mkdir(parents=True, exist_ok=True)
+        for tj in range(max(-(-(ny - 1) // tile_size), 1)):
+            rows = np.arange(max(tj * tile_size - 1, 0), min((tj + 1) * tile_size + 2, ny))
+            for ti in range(max(-(-(nx - 1) // tile_size), 1)):
+                cols = np.arange(max(ti * tile_size - 1, 0), min((ti + 1) * tile_size + 2, nx))
+                # Clamp so float error cannot push the last node off the mesh
+                gx, gy = np.meshgrid(
+                    np.minimum(xmin + cols * dx, xmax),
+                    np.minimum(ymin + rows * dy, ymax),
+                )
+                heights = interpolator(gx, gy).astype(np.float32)
+                if np.isfinite(heights).any():
+                    np.save(levelDir / f"{tj}_{ti}.npy", heights)
+
+        header = {
+            "origin": [xmin, ymin],
+            "spacing": [dx, dy],
+            "tile_size": tile_size,
+            "levels": [[ny, nx]],
+            "bounds": [xmin, ymin, float(xmax), float(ymax)],
+            "source_hash": source_hash,
+        }
+        # The header is written last; a pyramid without one is incomplete
+        (buildRoot / cls.HEADER).write_text(json.dumps(header, indent=2))
+        cls._publish(buildRoot, root, source_hash)
+        return cls(root)
+
+    @classmethod
+    def _publish(cls, build_root, root, source_hash):
+        """Move a finished pyramid from ``build_root`` to ``root``."""
+        try:
+            existing = json.loads((root / cls.HEADER).read_text()).get("source_hash")
+        except (OSError, ValueError):
+            existing = None
+        if existing == source_hash:
+            # Another builder got there first with the same terrain
+            shutil.rmtree(build_root, ignore_errors=True)
+            return
+        oldRoot = root.with_name(f"{root.name}.{os.getpid()}.old")
+        try:
+            os.rename(root, oldRoot)
+        except FileNotFoundError:
+            pass
+        try:
+            os.rename(build_root, root)
+        except OSError:
+            if not (root / cls.HEADER).exists():
+                raise
+            shutil.rmtree(build_root, ignore_errors=True)
+        shutil.rmtree(oldRoot, ignore_errors=True)
+
+
+def sidecar_path(elevation_glist_path):
+    """Path of the baked ``.heightfield.npy`` sidecar next to a glist."""
+    glistPath = Path(elevation_glist_path)
+    return glistPath.with_name(glistPath.stem + ".heightfield.npy")
+
+
+def pyramid_sidecar_path(elevation_glist_path):
+    """Directory of the baked ``.heightfield.pyramid`` sidecar next to a glist."""
+    glistPath = Path(elevation_glist_path)
+    return glistPath.with_name(glistPath.stem + ".heightfield.pyramid")
+
+
+def load_sidecar(elevation_glist_path):
+    """Return the baked sidecar grid or pyramid, or None if absent or stale.
+
+    A sidecar is only used when the hash in its JSON header matches
+    :func:`glist_portable_hash` of the glist it sits next to. A pyramid
+    sidecar takes precedence over a single-grid one.
+    """
+    pyramidRoot = pyramid_sidecar_path(elevation_glist_path)
+    npyPath = sidecar_path(elevation_glist_path)
+    candidates = [
+        (pyramidRoot / HeightfieldPyramid.HEADER, lambda: HeightfieldPyramid(pyramidRoot)),
+        (npyPath.with_suffix(".json"), lambda: Heightfield.load(npyPath)),
+    ]
+    expected = None
+    for headerPath, load in candidates:
+        if not headerPath.exists():
+            continue
+        if expected is None:
+            expected = glist_portable_hash(elevation_glist_path)
+        if json.loads(headerPath.read_text()).get("source_hash") != expected:
+            logger.warning(f"Ignoring stale heightfield sidecar {headerPath.parent}")
+            continue
+        return load()
+    return None
+
+
+def needs_pyramid(vertices, spacing=None, max_cells=DEFAULT_MAX_CELLS):
+    """True when a grid at ``spacing`` would exceed ``max_cells`` per axis."""
+    _, _, (nx, ny) = grid_layout(vertices, spacing)
+    return max(nx, ny) > max_cells
+
+
+def load_heightfield(elevation_glist_path, spacing=None):
+    """Return the DEM of an elevation glist, building it at most once.
+
+    A matching baked sidecar (see ``bake_elevation``) is preferred. Otherwise
+    DEMs are cached under the ``heightfields`` cache directory keyed by
+    :func:`glist_source_hash`, so each terrain is sampled once per machine.
+    Terrains whose grid would exceed :data:`DEFAULT_MAX_CELLS` per axis get
+    a :class:`HeightfieldPyramid` at full resolution instead of a coarsened
+    :class:`Heightfield`.
+    """
+    if spacing is None:
+        heightfield = load_sidecar(elevation_glist_path)
+        if heightfield is not None:
+            return heightfield
+    key = glist_source_hash(elevation_glist_path)
+    if spacing is not None:
+        key = f"{key}_{float(spacing):g}"
+    pyramidRoot = cache_dir("heightfields") / f"{key}.pyramid"
+    if (pyramidRoot / HeightfieldPyramid.HEADER).exists():
+        return HeightfieldPyramid(pyramidRoot)
+    npyPath = cache_dir("heightfields") / f"{key}.npy"
+    if npyPath.exists() and npyPath.with_suffix(".json").exists():
+        return Heightfield.load(npyPath)
+
+    vertices = terrain_vertices(elevation_glist_path)
+    if needs_pyramid(vertices, spacing):
+        return HeightfieldPyramid.build(
+            elevation_glist_path, pyramidRoot, spacing=spacing, vertices=vertices
+        )
+    heightfield = Heightfield.from_glist(elevation_glist_path, spacing=spacing, vertices=vertices)
+    heightfield.save(npyPath)
+    return heightfield
+
+
+class TerrainElevation:
+    """Terrain height and normal lookups for one elevation glist.
+
+    Queries are answered from the in-process :class:`Heightfield` (or
+    :class:`HeightfieldPyramid` for large terrains). Points the grid does
+    not cover, or every point when ``exact`` is set, go through the
+    scene_tool raycast in :func:`scene_utils.elevation` against the compiled
+    elevation scene, which is only built if it is needed. ``stencil`` picks
+    the gradient estimate used for normals (see :meth:`Heightfield.normal`).
+    """
+
+    def __init__(self, elevation_glist_path, exact=False, stencil="central"):
+        self.elevation_glist_path = Path(elevation_glist_path)
+        self.exact = exact
+        self.stencil = stencil
+        self._heightfield = None
+        self._hdf_path = None
+
+    @property
+    def heightfield(self):
+        """The DEM for this terrain, or None when it cannot be built.
+
+        Either a :class:`Heightfield` or a :class:`HeightfieldPyramid`.
+        """
+        if self._heightfield is None and not self.exact:
+            try:
+                self._heightfield = load_heightfield(self.elevation_glist_path)
+            except (ValueError, OSError) as e:
+                logger.warning(
+                    f"No heightfield for {self.elevation_glist_path} ({e}); "
+                    f"using scene_tool raycasts"
+                )
+                self.exact = True
+        return self._heightfield
+
+    @property
+    def bounds(self):
+        """``(xmin, ymin, xmax, ymax)`` of the terrain DEM, or None if unknown."""
+        heightfield = self.heightfield
+        return None if heightfield is None else heightfield.bounds
+
+    @property
+    def hdf_path(self):
+        """Compiled elevation scene for the raycast fallback."""
+        if self._hdf_path is None:
+            self._hdf_path = compiled_terrain_scene(self.elevation_glist_path)
+        return self._hdf_path
+
+    def elevation(self, location_x, location_y):
+        """Drop-in replacement for ``scene_utils.elevation(hdf, x, y)``.
+
+        Returns:
+            tuple ``(height_m, surface_normal_xyz)``.
+
+        Raises:
+            RuntimeError: if (x, y) lies outside the terrain.
+        """
+        heights, normals = self.elevation_many([location_x], [location_y])
+        return float(heights[0]), [float(v) for v in normals[0]]
+
+    def elevation_many(self, locations_x, locations_y):
+        """Heights and unit normals for arrays of ENU (x, y) locations.
+
+        Covered points are answered in one vectorized pass over the
+        heightfield; only the remainder go through the raycast fallback.
+
+        Returns:
+            tuple ``(heights, normals)`` shaped ``(N,)`` and ``(N, 3)``.
+
+        Raises:
+            RuntimeError: if any location lies outside the terrain.
+        """
+        xs = np.atleast_1d(np.asarray(locations_x, dtype=float))
+        ys = np.atleast_1d(np.asarray(locations_y, dtype=float))
+        heights = np.empty(len(xs))
+        normals = np.empty((len(xs), 3))
+        covered = np.zeros(len(xs), dtype=bool)
+
+        heightfield = self.heightfield
+        if heightfield is not None and len(xs):
+            covered = heightfield.contains(xs, ys)
+            heights[covered] = heightfield.height(xs[covered], ys[covered])
+            normals[covered] = heightfield.normal(xs[covered], ys[covered], self.stencil)
+
+        missing = ~covered
+        if np.any(missing):
+            heights[missing], normals[missing] = elevation_many(
+                self.hdf_path, xs[missing], ys[missing]
+            )
+        return heights, normals
+
+
+_TERRAINS = {}
+
+
+def terrain_elevation(elevation_glist_path, exact=False, stencil="central"):
+    """Return the shared TerrainElevation for an elevation glist."""
+    key = (str(elevation_glist_path), exact, stencil)
+    if key not in _TERRAINS:
+        _TERRAINS[key] = TerrainElevation(elevation_glist_path, exact=exact, stencil=stencil)
+    return _TERRAINS[key]
+
+
+def align_objects_with_terrain(ana_objects, terrain, anchor_name=None):
+    """Place the instances of a scene's objects on its terrain.
+
+    This is the one alignment path for every background node:
+
+    1. Objects with ``match_elevation`` get their non-dynamic instances
+       anchored to ``anchor_name``.
+    2. Dynamic instances are draped onto the terrain when the object asks
+       for it (see :meth:`AnaDirsigObject.drape_on_terrain`).
+    3. The static instance tables of all objects are concatenated. Rows
+       outside the terrain bounds are skipped with a warning. The rest are
+       looked up in one :meth:`TerrainElevation.elevation_many` batch,
+       raised by the terrain height and, for objects with ``match_slope``,
+       rotated to lie flat on the surface.
+    4. Each object's glist object picks up its table the next time it is
+       read (:meth:`AnaDirsigObject.instances_changed`).
+
+    Args:
+        ana_objects: AnaDirsigObjects to align (or a single one).
+        terrain: TerrainElevation of the scene.
+        anchor_name: Name of the terrain instance to anchor objects to.
+    """
+    if not isinstance(ana_objects, (list, tuple)):
+        ana_objects = [ana_objects]
+
+    _align_instance_tables(ana_objects, terrain, anchor_name)
+    for anaObject in ana_objects:
+        anaObject.instances_changed()
+
+
+def _align_instance_tables(ana_objects, terrain, anchor_name):
+    for anaObject in ana_objects:
+        if anaObject.match_elevation:
+            anaObject.instance_anchor = anchor_name
+            for objInstance in anaObject.other_instances():
+                if type(objInstance) is not glist.DynamicInstance:
+                    objInstance.set_anchor(anchor_name)
+        anaObject.drape_on_terrain(terrain)
+    tables = [anaObject.instances for anaObject in ana_objects]
+    counts = [len(table) for table in tables]
+    if not sum(counts):
+        return
+
+    translations = np.concatenate([table.translation for table in tables])
+    inside = np.ones(len(translations), dtype=bool)
+    bounds = terrain.bounds
+    if bounds is not None:
+        xmin, ymin, xmax, ymax = bounds
+        inside = (
+            (translations[:, 0] >= xmin) & (translations[:, 0] <= xmax)
+            & (translations[:, 1] >= ymin) & (translations[:, 1] <= ymax)
+        )
+        names = [name for table in tables for name in table.instance_names()]
+        for idx in np.flatnonzero(~inside):
+            logger.warning(
+                f"{names[idx]} at {translations[idx, :2].tolist()} "
+                f"is outside the terrain {list(bounds)}; left unaligned"
+            )
+    indices = np.flatnonzero(inside)
+    if not len(indices):
+        return
+
+    heights, surfaceNormals = terrain.elevation_many(
+        translations[indices, 0], translations[indices, 1]
+    )
+    slope = np.repeat([anaObject.match_slope for anaObject in ana_objects], counts)[indices]
+    eulerAngles = np.zeros((len(indices), 3))
+    if np.any(slope):
+        eulerAngles[slope] = align_directions_many(surfaceNormals[slope], [0, 0, 1], units='degrees')
+
+    # Scatter the results back into each object's table
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    for table, start, stop in zip(tables, offsets[:-1], offsets[1:]):
+        rows = (indices >= start) & (indices < stop)
+        if not np.any(rows):
+            continue
+        local = indices[rows] - start
+        table.translation[local, 2] += heights[rows]
+        sloped = rows & slope
+        table.rotation[indices[sloped] - start, :2] = eulerAngles[sloped, :2]
+
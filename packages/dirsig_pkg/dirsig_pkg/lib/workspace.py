@@ -0,0 +1,111 @@
+#---------------------------------------
+# Copyright 2019-2025 DADoES, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License in the root directory in the "LICENSE" file or at:
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#---------------------------------------
+
+# Run-scoped scratch space. Every temporary file a run writes (scene files,
+# maps and materials, instance binaries, DIRSIG input and output) goes under
+# one private directory per interpretation, so several runs can share a
+# machine without overwriting each other. Persistent, machine-wide data
+# belongs in lib/cache.py instead.
+
+import os
+import atexit
+import shutil
+import logging
+import tempfile
+from pathlib import Path
+import anatools.lib.context as ctx
+
+logger = logging.getLogger(__name__)
+
+WORKSPACE_ROOT_ENV = "DIRSIG_PKG_WORKSPACE"
+KEEP_WORKSPACE_ENV = "DIRSIG_PKG_KEEP_WORKSPACE"
+
+
+class RunWorkspace:
+    """Private scratch directory tree for one run.
+
+    The root is created under ``DIRSIG_PKG_WORKSPACE`` (default: the system
+    temp directory) with a unique name, so concurrent runs never collide.
+    """
+
+    def __init__(self, interp_num=None, base=None):
+        self.interp_num = interp_num
+        self._pid = os.getpid()
+        if base is None:
+            base = os.environ.get(WORKSPACE_ROOT_ENV) or tempfile.gettempdir()
+        Path(base).mkdir(parents=True, exist_ok=True)
+        self.root = Path(tempfile.mkdtemp(prefix=f"dirsig_run{interp_num}_", dir=base))
+        logger.info(f"Run workspace {self.root}")
+
+    def path(self, *parts):
+        """Return a directory inside the workspace, creating it if needed."""
+        directory = self.root.joinpath(*parts)
+        directory.mkdir(parents=True, exist_ok=True)
+        return directory
+
+    def file(self, *parts):
+        """Return a file path inside the workspace; its directory is created."""
+        filePath = self.root.joinpath(*parts)
+        filePath.parent.mkdir(parents=True, exist_ok=True)
+        return filePath
+
+    def scene_dirs(self, name):
+        """The ``root``/``maps``/``material``/``geometry`` dict ``SCENE.write`` expects."""
+        root = self.path(name)
+        return {
+            'root': root,
+            'maps': self.path(name, "maps"),
+            'material': self.path(name, "materials"),
+            'geometry': self.path(name, "geometry"),
+        }
+
+    def cleanup(self):
+        """Remove the workspace unless ``DIRSIG_PKG_KEEP_WORKSPACE`` is set."""
+        if os.getpid() != self._pid:
+            # Forked workers (e.g. multiprocessing pools) do not own it
+            return
+        if os.environ.get(KEEP_WORKSPACE_ENV):
+            logger.info(f"Keeping run workspace {self.root}")
+            return
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+_WORKSPACE = None
+
+
+def run_workspace():
+    """Return the workspace of the current run (``ctx.interp_num``).
+
+    The workspace is created on first use; when the interpretation number
+    changes the previous run's workspace is removed and a new one created.
+    """
+    global _WORKSPACE
+    if _WORKSPACE is not None and _WORKSPACE.interp_num != ctx.interp_num:
+        close_run_workspace()
+    if _WORKSPACE is None:
+        _WORKSPACE = RunWorkspace(ctx.interp_num)
+    return _WORKSPACE
+
+
+def close_run_workspace():
+    """Remove the current run's workspace; called when the run ends."""
+    global _WORKSPACE
+    if _WORKSPACE is not None:
+        _WORKSPACE.cleanup()
+        _WORKSPACE = None
+
+
+atexit.register(close_run_workspace)
@@ -26,13 +26,11 @@ from dirfm.scene import SCENE
 from dirfm import materials
 from dirfm import frames
 from dirfm.glist import DynamicInstance
-from dirsig_pkg.lib.scene_utils import (
-    terrain_scene,
-    elevation,
-    align_directions,
-    patch_glist_split_beziercurvesets,
-)
-from dirsig_pkg.lib.object import AnaDirsigObject, file_to_objgen
+from dirsig_pkg.lib.scene_utils import patch_glist_split_beziercurvesets, shutdown_raycast_workers
+from dirsig_pkg.lib.terrain import ELEVATION_GLISTS, align_objects_with_terrain, terrain_elevation
+from dirsig_pkg.lib.object import AnaDirsigObject, file_to_objgen, shared_geometry_objects
+from dirsig_pkg.lib.lod import lod_wavefront
+from dirsig_pkg.lib.staging import prefetch, stage
 from itertools import count
 
 logger = logging.getLogger(__name__)
@@ -47,6 +45,7 @@ def scene(scene_objects, location=(0, 0, 0), offsets=None, meta={}, tags=[]):
       - offsets: list of [x, y, z] meter offsets, one per sceneObject. None
         means "register each scene at the origin" (legacy single-scene behavior).
       - timezone: estimate based on the geodetic location longitude
+      - altitude: altitude of the scene origin in meters
       - metadata, tags: passthrough
     """
 
@@ -57,6 +56,7 @@ def scene(scene_objects, location=(0, 0, 0), offsets=None, meta={}, tags=[]):
         "sceneObjects": scene_objects,
         "offsets": offsets,
         "timezone": timezone,
+        "altitude": float(location.get_pos()[2]),
         "metadata": meta,
         "tags": tags}
     return {"Scene" : bundle}
@@ -74,49 +74,6 @@ def scene_object(scene_name):
     return sceneObj
 
 
-def align_objects_with_terrain(ana_object, elevation_glist_path, anchor_name=None):
-    """ Align objects with the terrain by adjusting their position and orientation.
-    
-    This function performs two main operations:
-    1. When match_elevation is set, set anchors for StaticInstanceBinary and StaticInstanceBinaryFile
-    2. For StaticInstances:
-       - Adjust the z-coordinate based on terrain elevation at the object's x,y position
-       - When match_slope is set, rotate the object to align with the terrain's surface normal
-    
-    Args:
-        ana_object: The object to align with terrain
-        elevation_glist_path: Path to the elevation glist file
-        anchor_name: Optional name of the anchor to use for elevation matching
-    """
-    #Set anchors for all instances of objects
-    if ana_object.match_elevation:
-        for objInstance in ana_object.root.get_instances():
-            if type(objInstance) is not glist.DynamicInstance:
-                objInstance.set_anchor(anchor_name)
-
-    # Only objects with static instances can be explicitly aligned with terrain
-    if glist.StaticInstance not in [type(i) for i in ana_object.root.get_instances()]:
-        return
-
-    # Compile the elevation scene
-    baseGeometry = glist.GlistBaseGeometry(elevation_glist_path)
-    terrainBundleObject = glist.Object(baseGeometry)
-    elevationHdfpath = terrain_scene(terrainBundleObject)
-
-    # Update the position of each object instance
-    for objInstance in ana_object.root.get_instances():
-        if type(objInstance) is glist.StaticInstance:
-            trans = objInstance.get_translation()
-            e, surfaceNormal = elevation(elevationHdfpath, trans[0], trans[1])
-            trans[2]+=e
-            objInstance.set_translation(trans)
-
-            if ana_object.match_slope:
-                #Rotate the object to lay flat on the terrain
-                rot = objInstance.get_rotation()
-                eulerAngles = align_directions(surfaceNormal, [0,0,1], units='degrees')
-                objInstance.set_rotation([eulerAngles[0], eulerAngles[1], rot[2]])
-
 class SierraNevada(Node):
     """ Region of the Sierra Nevada - 150 x 150 km in size, low res scene
     """
@@ -131,7 +88,8 @@ class SierraNevada(Node):
         anchorName = "terrain"
         scene_path = Path(get_volume_path("dirsig_pkg", "dirsig-shared:Sierra_Nevada"))
         terrain_bundle_path = scene_path / "bundles" / "terrain"    
-        terrainBundleObject = glist.Object(glist.GlistBaseGeometry(terrain_bundle_path / "sierra_terrain.glist"))
+        prefetch([terrain_bundle_path / "sierra_terrain.glist"], label="Sierra Nevada")
+        terrainBundleObject = glist.Object(glist.GlistBaseGeometry(stage(terrain_bundle_path / "sierra_terrain.glist")))
         terrainBundleObject.add_instance(glist.StaticInstance(anchorName))
         sceneGlist =  glist.GLIST().add_object(terrainBundleObject)
         
@@ -154,6 +112,7 @@ class SierraNevada(Node):
         objectMetadata = []        
         objectGenerators = file_to_objgen(inputObjects, AnaDirsigObject)
         objectsGList = glist.GLIST()
+        anaObjects = []
         
         for generator in objectGenerators:
             anaObject = generator.exec() # trigger the generator
@@ -161,18 +120,22 @@ class SierraNevada(Node):
                 "name": anaObject.name,
                 "modifiers": anaObject.modifiers,
             })
-            #Add the instance to the glist
-            objectsGList.add_object(anaObject.root)
-            
-            #Update object's elevation for static instances
-            elevationGListPath = Path(get_volume_path("dirsig_pkg", "dirsig-shared:Sierra_Nevada/bundles/terrain/elevation.glist"))
-            align_objects_with_terrain(anaObject, elevationGListPath)
+            anaObjects.append(anaObject)
             
             #Collect object instance names for abundance truth collection
-            for objInstance in anaObject.root.get_instances():
-                names.append(objInstance.get_name())
-            
-            sceneObj.add_geometry("Objects", objectsGList)
+            names.extend(anaObject.instance_names())
+
+        #Update the objects' elevation for static instances, all in one batch
+        elevationGListPath = Path(get_volume_path("dirsig_pkg", ELEVATION_GLISTS["Sierra_Nevada"]))
+        align_objects_with_terrain(anaObjects, terrain_elevation(elevationGListPath))
+
+        #Add the objects to the glist, one glist object per base geometry
+        for objectRoot in shared_geometry_objects(anaObjects):
+            objectsGList.add_object(objectRoot)
+        sceneObj.add_geometry("Objects", objectsGList)
+
+        # Terrain lookups are done; stop any raycast workers
+        shutdown_raycast_workers()
 
         metadata['Object Modifiers'] = objectMetadata
         return scene([sceneObj], location=location, meta=metadata, tags=names)
@@ -223,13 +186,13 @@ def _build_desert_geometry(geom_path, mml, add_brush, anchor_name="terrain", fli
                         glist.GLIST("Terrain.glist")
                         .add_object(
                             glist.Object(
-                                glist.Wavefront(geom_path / "obj" / "Terrain.obj"),
+                                glist.Wavefront(stage(geom_path / "obj" / "Terrain.obj")),
                                 glist.StaticInstance(anchor_name, scale=[1000, 1000, 1000]),
                             )
                         )
                         .add_object(
                             glist.Object(
-                                glist.Wavefront(geom_path / "obj" / "Roads.obj"),
+                                glist.Wavefront(stage(geom_path / "obj" / "Roads.obj")),
                                 glist.StaticInstance(),
                             )
                         )
@@ -243,11 +206,11 @@ def _build_desert_geometry(geom_path, mml, add_brush, anchor_name="terrain", fli
                 glist.GlistBaseGeometry(
                     glist.GLIST("Grass.glist").add_object(
                         glist.Object(
-                            glist.Wavefront(geom_path / "obj" / "Grass_01.obj"),
-                            glist.Wavefront(geom_path / "obj" / "Grass_02.obj"),
-                            glist.Wavefront(geom_path / "obj" / "Grass_03.obj"),
+                            glist.Wavefront(lod_wavefront(geom_path / "obj" / "Grass_01.obj")),
+                            glist.Wavefront(lod_wavefront(geom_path / "obj" / "Grass_02.obj")),
+                            glist.Wavefront(lod_wavefront(geom_path / "obj" / "Grass_03.obj")),
                             glist.StaticInstanceBinaryFile(
-                                geom_path / "generated" / "Grass.instances"
+                                stage(geom_path / "generated" / "Grass.instances")
                             ),
                         )
                         .add_material_variant(
@@ -315,10 +278,10 @@ def _build_desert_geometry(geom_path, mml, add_brush, anchor_name="terrain", fli
                 glist.GlistBaseGeometry(
                     glist.GLIST("BigRocks.glist").add_object(
                         glist.Object(
-                            glist.Wavefront(geom_path / "obj" / "BigRock_01.obj"),
-                            glist.Wavefront(geom_path / "obj" / "BigRock_02.obj"),
+                            glist.Wavefront(lod_wavefront(geom_path / "obj" / "BigRock_01.obj")),
+                            glist.Wavefront(lod_wavefront(geom_path / "obj" / "BigRock_02.obj")),
                             glist.StaticInstanceBinaryFile(
-                                geom_path / "generated" / "BigRocks.instances"
+                                stage(geom_path / "generated" / "BigRocks.instances")
                             ),
                         )
                     )
@@ -332,15 +295,15 @@ def _build_desert_geometry(geom_path, mml, add_brush, anchor_name="terrain", fli
             glist.GLIST("Shrubs.glist").add_object(
                 glist.Object(
                     glist.GlistBaseGeometry(
-                        geom_path / "bundles" / "Restio_eleocharis" / "Restio_eleocharis.glist"
+                        stage(geom_path / "bundles" / "Restio_eleocharis" / "Restio_eleocharis.glist")
                     ),
                     glist.GlistBaseGeometry(
-                        geom_path / "bundles" / "Euclea_racemosa" / "Euclea_racemosa.glist"
+                        stage(geom_path / "bundles" / "Euclea_racemosa" / "Euclea_racemosa.glist")
                     ),
-                    glist.Wavefront(geom_path / "obj" / "Brush_01.obj"),
-                    glist.Wavefront(geom_path / "obj" / "Brush_02.obj"),
+                    glist.Wavefront(lod_wavefront(geom_path / "obj" / "Brush_01.obj")),
+                    glist.Wavefront(lod_wavefront(geom_path / "obj" / "Brush_02.obj")),
                     glist.StaticInstanceBinaryFile(
-                        geom_path / "generated" / "Shrubs.instances"
+                        stage(geom_path / "generated" / "Shrubs.instances")
                     ),
                 )
             )
@@ -396,12 +359,29 @@ class DesertHighwayScene(Node):
         else:
             add_brush = (add_brush_input == "True")
 
-        from dirsig_pkg.lib.materials_large_desert import create_mml
-        mml = create_mml(road_type=road_type)
+        from dirsig_pkg.lib.materials_large_desert import create_mml, map_path
 
         geom_path = (
             Path(get_volume_path("dirsig_pkg", "dirsig-shared:Desert_Highway_v2")) / "geometry"
         )
+        # Start staging the scene assets while the rest of the graph runs
+        meshes = ["Terrain", "Roads", "Grass_01", "Grass_02", "Grass_03", "BigRock_01", "BigRock_02"]
+        instances = ["Grass", "BigRocks"]
+        assets = [map_path / "Asphalt-Normal.png", map_path / "Terrain.png"]
+        if road_type != "Paved":
+            assets.append(map_path / "Dirt-Normal.jpg")
+        if add_brush:
+            meshes += ["Brush_01", "Brush_02"]
+            instances.append("Shrubs")
+            assets += [
+                geom_path / "bundles" / "Restio_eleocharis" / "Restio_eleocharis.glist",
+                geom_path / "bundles" / "Euclea_racemosa" / "Euclea_racemosa.glist",
+            ]
+        assets += [geom_path / "obj" / f"{name}.obj" for name in meshes]
+        assets += [geom_path / "generated" / f"{name}.instances" for name in instances]
+        prefetch(assets, label="Desert Highway")
+
+        mml = create_mml(road_type=road_type)
         anchor_name = "terrain"
         location = frames.GeodeticFrame(39.593, -2.1015, 0)
 
@@ -454,21 +434,25 @@ class DesertHighwayScene(Node):
                 objectGenerators = file_to_objgen(inputObjects, AnaDirsigObject)
                 objectsGList = glist.GLIST()
                 elevationGListPath = Path(get_volume_path(
-                    "dirsig_pkg",
-                    "dirsig-shared:Desert_Highway_v2/geometry/Terrain_elevation.glist",
+                    "dirsig_pkg", ELEVATION_GLISTS["Desert_Highway_v2"],
                 ))
+                anaObjects = []
                 for generator in objectGenerators:
                     anaObject = generator.exec()
                     objectMetadata.append({
                         "name": anaObject.name,
                         "modifiers": anaObject.modifiers,
                     })
-                    objectsGList.add_object(anaObject.root)
-                    align_objects_with_terrain(anaObject, elevationGListPath, anchor_name)
-                    for objInstance in anaObject.root.get_instances():
-                        names.append(objInstance.get_name())
+                    anaObjects.append(anaObject)
+                    names.extend(anaObject.instance_names())
+                align_objects_with_terrain(
+                    anaObjects, terrain_elevation(elevationGListPath), anchor_name
+                )
+                for objectRoot in shared_geometry_objects(anaObjects):
+                    objectsGList.add_object(objectRoot)
                 sceneObj.add_geometry("Objects", objectsGList)
                 metadata['Object Modifiers'] = objectMetadata
+                shutdown_raycast_workers()
 
             sceneList.append(sceneObj)
             offsetList.append(offset)
@@ -479,6 +463,136 @@ class DesertHighwayScene(Node):
         )
 
 
+# LWIR Urban Alt scenery below the terrain glist. Each entry is
+# (glist name, geometry files, instance file, anchored): the files are
+# relative to the scene's geometry directory, and parts without an instance
+# file are placed once at the origin. The list doubles as the scene's
+# prefetch set, so every file the node reads must appear here.
+_LWIR_URBAN_PARTS = [
+    ("building_commercial_part_tall_1", ["obj/building_commercial_part_tall_1.obj"],
+     "generated/building_commercial_part_tall_1_positions.bin", False),
+    ("building_commercial_part_tall_1_roof_junk", ["obj/building_commercial_part_tall_1_roof_junk_1.obj"],
+     "generated/building_commercial_part_tall_1_roof_junk_positions.bin", False),
+    ("building_commercial_part_tall_2", ["obj/building_commercial_part_tall_2.obj"],
+     "generated/building_commercial_part_tall_2_positions.bin", False),
+    ("building_commercial_part_tall_2_roof_junk", ["obj/building_commercial_part_tall_2_roof_junk_1.obj"],
+     "generated/building_commercial_part_tall_2_roof_junk_positions.bin", False),
+    ("building_commercial_part_tall_3", ["obj/building_commercial_part_tall_3.obj"],
+     "generated/building_commercial_part_tall_3_positions.bin", False),
+    ("building_commercial_part_wide_1", ["obj/building_commercial_part_wide_1.obj"],
+     "generated/building_commercial_part_wide_1_positions.bin", False),
+    ("building_commercial_part_wide_1_roof_junk", ["obj/building_commercial_part_wide_1_roof_junk_1.obj"],
+     "generated/building_commercial_part_wide_1_roof_junk_positions.bin", False),
+    ("building_commercial_part_wide_2", ["obj/building_commercial_part_wide_2.obj"],
+     "generated/building_commercial_part_wide_2_positions.bin", False),
+    ("building_commercial_part_wide_2_roof_junk", ["obj/building_commercial_part_wide_2_roof_junk_1.obj"],
+     "generated/building_commercial_part_wide_2_roof_junk_positions.bin", False),
+    ("building_commercial_part_wide_3", ["obj/building_commercial_part_wide_3.obj"],
+     "generated/building_commercial_part_wide_3_positions.bin", False),
+    ("building_commercial_part_wide_3_roof_junk", ["obj/building_commercial_part_wide_3_roof_junk_1.obj"],
+     "generated/building_commercial_part_wide_3_roof_junk_positions.bin", False),
+    ("building_commercial_part_wide_4", ["obj/building_commercial_part_wide_4.obj"],
+     "generated/building_commercial_part_wide_4_positions.bin", False),
+    ("building_residential_1", ["obj/building_residential_1.obj"],
+     "generated/building_residential_1_positions.bin", False),
+    ("building_residential_2", ["obj/building_residential_2.obj"],
+     "generated/building_residential_2_positions.bin", False),
+    ("detritus", ["obj/detritus_1.obj"], "generated/detritus_positions.bin", False),
+    ("dumpster", ["obj/dumpster.obj"], "generated/dumpster_positions.bin", False),
+    ("grass", [f"obj/grass_{i}.obj" for i in range(1, 5)], "generated/grass_positions.bin", False),
+    # this model had a facet issue, likely due to an ngon
+    ("mailbox_residential", ["obj/mailbox_residential.obj"], None, False),
+    ("mailbox_usps", ["obj/mailbox_usps.obj"], "generated/mailbox_usps_positions.bin", False),
+    ("power_line", ["generated/power_line.glist"], None, False),
+    ("power_pole", ["obj/power_pole_12m.obj"], "generated/power_pole_positions.bin", False),
+    ("rock", [f"obj/rock_{i}.obj" for i in range(1, 7)], None, True),
+    ("shrub", ["obj/shrub_1.obj", "obj/shrub_2.obj"], None, True),
+    ("street_light_short", ["obj/street_light_short.obj"],
+     "generated/street_light_short_positions.bin", False),
+    ("street_light_tall_traffic_light", ["obj/street_light_tall_traffic_light.obj"],
+     "generated/street_light_tall_traffic_light_positions.bin", False),
+    ("street_light_tall", ["obj/street_light_tall.obj"], "generated/street_light_tall_positions.bin", False),
+    ("street_sign", [f"obj/street_sign_{i}.obj" for i in range(1, 5)], "generated/street_sign_positions.bin", False),
+    ("subcanopy", [f"obj/subcanopy_{i}.obj" for i in range(1, 4)], "generated/subcanopy_positions.bin", False),
+    ("traffic_cone", ["obj/traffic_cone.obj"], None, False),
+    ("trash_can", ["obj/trash_can.obj"], "generated/trash_can_positions.bin", False),
+    ("tree_conif_large", ["obj/tree_conif_large_1.obj"], "generated/tree_conif_large_positions.bin", False),
+    ("tree_decid_large", ["obj/tree_decid_large_1.obj", "obj/tree_decid_large_2.obj"],
+     "generated/tree_decid_large_positions.bin", False),
+    ("tree_decid_small", [f"obj/tree_decid_small_{i}.obj" for i in range(1, 4)],
+     "generated/tree_decid_small_positions.bin", False),
+]
+
+
+def _lwir_urban_assets(geom_path):
+    """Every volume file the LWIR Urban Alt geometry reads, for prefetching."""
+    assets = [geom_path / "terrain.obj", geom_path / "roads.obj"]
+    for _, files, instances, _ in _LWIR_URBAN_PARTS:
+        assets += [geom_path / f for f in files]
+        if instances is not None:
+            assets.append(geom_path / instances)
+    return assets
+
+
+def _build_lwir_urban_geometry(geom_path):
+    """Assemble the LWIR Urban Alt geometry GLIST from :data:`_LWIR_URBAN_PARTS`."""
+    urban = (
+        glist.GLIST()
+        .add_object(
+            glist.Object(
+                glist.GlistBaseGeometry(
+                    glist.GLIST("terrain.glist")
+                    .add_object(
+                        glist.Object(
+                            glist.Wavefront(stage(geom_path / "terrain.obj")),
+                            glist.StaticInstance("terrain"),
+                        )
+                    )
+                    .add_object(
+                        glist.Object(
+                            glist.Wavefront(stage(geom_path / "roads.obj")),
+                            glist.StaticInstance(),
+                        )
+                    )
+                ),
+                glist.StaticInstance(translation=[0,0,0]),
+            )
+        )
+    )
+    for name, files, instances, anchored in _LWIR_URBAN_PARTS:
+        geometry = []
+        for f in files:
+            if f.endswith(".glist"):
+                # The bundled power_line.glist packs 3 cubic Bezier curves
+                # into each <beziercurveset> with a single <matid>; DIRSIG
+                # sizes the per-object materialData array to 1 and then
+                # aborts with 'Out of range object material requested!'
+                # when shadow rays hit the 2nd or 3rd curve. Patch the
+                # asset on stage so each set holds exactly one curve.
+                geometry.append(glist.GlistBaseGeometry(
+                    patch_glist_split_beziercurvesets(stage(geom_path / f, wait=True))
+                ))
+            else:
+                geometry.append(glist.Wavefront(lod_wavefront(geom_path / f)))
+        if instances is None:
+            instance = glist.StaticInstance()
+        else:
+            instance = glist.StaticInstanceBinaryFile(stage(geom_path / instances))
+        placement = (
+            glist.StaticInstance(translation=[0,0,0], anchor='terrain') if anchored
+            else glist.StaticInstance(translation=[0,0,0])
+        )
+        urban.add_object(
+            glist.Object(
+                glist.GlistBaseGeometry(
+                    glist.GLIST(f"{name}.glist").add_object(glist.Object(*geometry, instance))
+                ),
+                placement,
+            )
+        )
+    return urban
+
+
 class LWIRUrbanAltScene(Node):
     """
     3m x 3km
@@ -492,544 +606,10 @@ class LWIRUrbanAltScene(Node):
         geom_path = (
             Path(get_volume_path("dirsig_pkg", "dirsig-shared:LWIR_Urban_Alt")) / "geometry"
         )
+        # Start staging the scene assets while the rest of the graph runs
+        prefetch(_lwir_urban_assets(geom_path), label="LWIR Urban Alt")
         anchorName = "terrain"
-        urban = (
-            glist.GLIST()
-            .add_object(
-                glist.Object(
-                    glist.GlistBaseGeometry(
-                        glist.GLIST("terrain.glist")
-                        .add_object(
-                            glist.Object(
-                                glist.Wavefront(geom_path / "terrain.obj"),
-                                glist.StaticInstance("terrain"),
-                            )
-                        )
-                        .add_object(
-                            glist.Object(
-                                glist.Wavefront(geom_path / "roads.obj"),
-                                glist.StaticInstance(),
-                            )
-                        )
-                    ),
-                    glist.StaticInstance(translation=[0,0,0]),
-                )
-            )
-            .add_object(
-                glist.Object(
-                    glist.GlistBaseGeometry(
-                        glist.GLIST("building_commercial_part_tall_1.glist").add_object(
-                            glist.Object(
-                                glist.Wavefront(geom_path / "obj" / "building_commercial_part_tall_1.obj"),
-                                glist.StaticInstanceBinaryFile(
-                                    geom_path / "generated" / "building_commercial_part_tall_1_positions.bin"
-                                ),
-                            )
-                        )
-                    ),
-                    glist.StaticInstance(translation=[0,0,0]),
-                )
-            )
-            .add_object(
-                glist.Object(
-                    glist.GlistBaseGeometry(
-                        glist.GLIST("building_commercial_part_tall_1_roof_junk.glist").add_object(
-                            glist.Object(
-                                glist.Wavefront(geom_path / "obj" / "building_commercial_part_tall_1_roof_junk_1.obj"),
-                                glist.StaticInstanceBinaryFile(
-                                    geom_path / "generated" / "building_commercial_part_tall_1_roof_junk_positions.bin"
-                                ),
-                            )
-                        )
-                    ),
-                    glist.StaticInstance(translation=[0,0,0]),
-                )
-            )
-            .add_object(
-                glist.Object(
-                    glist.GlistBaseGeometry(
-                        glist.GLIST("building_commercial_part_tall_2.glist").add_object(
-                            glist.Object(
-                                glist.Wavefront(geom_path / "obj" / "building_commercial_part_tall_2.obj"),
-                                glist.StaticInstanceBinaryFile(
-                                    geom_path / "generated" / "building_commercial_part_tall_2_positions.bin"
-                                ),
-                            )
-                        )
-                    ),
-                    glist.StaticInstance(translation=[0,0,0]),
-                )
-            )
-            .add_object(
-                glist.Object(
-                    glist.GlistBaseGeometry(
-                        glist.GLIST("building_commercial_part_tall_2_roof_junk.glist").add_object(
-                            glist.Object(
-                                glist.Wavefront(geom_path / "obj" / "building_commercial_part_tall_2_roof_junk_1.obj"),
-                                glist.StaticInstanceBinaryFile(
-                                    geom_path / "generated" / "building_commercial_part_tall_2_roof_junk_positions.bin"
-                                ),
-                            )
-                        )
-                    ),
-                    glist.StaticInstance(translation=[0,0,0]),
-                )
-            )
-            .add_object(
-                glist.Object(
-                    glist.GlistBaseGeometry(
-                        glist.GLIST("building_commercial_part_tall_3.glist").add_object(
-                            glist.Object(
-                                glist.Wavefront(geom_path / "obj" / "building_commercial_part_tall_3.obj"),
-                                glist.StaticInstanceBinaryFile(
-                                    geom_path / "generated" / "building_commercial_part_tall_3_positions.bin"
-                                ),
-                            )
-                        )
-                    ),
-                    glist.StaticInstance(translation=[0,0,0]),
-                )
-            )
-            .add_object(
-                glist.Object(
-                    glist.GlistBaseGeometry(
-                        glist.GLIST("building_commercial_part_wide_1.glist").add_object(
-                            glist.Object(
-                                glist.Wavefront(geom_path / "obj" / "building_commercial_part_wide_1.obj"),
-                                glist.StaticInstanceBinaryFile(
-                                    geom_path / "generated" / "building_commercial_part_wide_1_positions.bin"
-                                ),
-                            )
-                        )
-                    ),
-                    glist.StaticInstance(translation=[0,0,0]),
-                )
-            )
-            .add_object(
-                glist.Object(
-                    glist.GlistBaseGeometry(
-                        glist.GLIST("building_commercial_part_wide_1_roof_junk.glist").add_object(
-                            glist.Object(
-                                glist.Wavefront(geom_path / "obj" / "building_commercial_part_wide_1_roof_junk_1.obj"),
-                                glist.StaticInstanceBinaryFile(
-                                    geom_path / "generated" / "building_commercial_part_wide_1_roof_junk_positions.bin"
-                                ),
-                            )
-                        )
-                    ),
-                    glist.StaticInstance(translation=[0,0,0]),
-                )
-            )
-            .add_object(
-                glist.Object(
-                    glist.GlistBaseGeometry(
-                        glist.GLIST("building_commercial_part_wide_2.glist").add_object(
-                            glist.Object(
-                                glist.Wavefront(geom_path / "obj" / "building_commercial_part_wide_2.obj"),
-                                glist.StaticInstanceBinaryFile(
-                                    geom_path / "generated" / "building_commercial_part_wide_2_positions.bin"
-                                ),
-                            )
-                        )
-                    ),
-                    glist.StaticInstance(translation=[0,0,0]),
-                )
-            )
-            .add_object(
-                glist.Object(
-                    glist.GlistBaseGeometry(
-                        glist.GLIST("building_commercial_part_wide_2_roof_junk.glist").add_object(
-                            glist.Object(
-                                glist.Wavefront(geom_path / "obj" / "building_commercial_part_wide_2_roof_junk_1.obj"),
-                                glist.StaticInstanceBinaryFile(
-                                    geom_path / "generated" / "building_commercial_part_wide_2_roof_junk_positions.bin"
-                                ),
-                            )
-                        )
-                    ),
-                    glist.StaticInstance(translation=[0,0,0]),
-                )
-            )
-            .add_object(
-                glist.Object(
-                    glist.GlistBaseGeometry(
-                        glist.GLIST("building_commercial_part_wide_3.glist").add_object(
-                            glist.Object(
-                                glist.Wavefront(geom_path / "obj" / "building_commercial_part_wide_3.obj"),
-                                glist.StaticInstanceBinaryFile(
-                                    geom_path / "generated" / "building_commercial_part_wide_3_positions.bin"
-                                ),
-                            )
-                        )
-                    ),
-                    glist.StaticInstance(translation=[0,0,0]),
-                )
-            )
-            .add_object(
-                glist.Object(
-                    glist.GlistBaseGeometry(
-                        glist.GLIST("building_commercial_part_wide_3_roof_junk.glist").add_object(
-                            glist.Object(
-                                glist.Wavefront(geom_path / "obj" / "building_commercial_part_wide_3_roof_junk_1.obj"),
-                                glist.StaticInstanceBinaryFile(
-                                    geom_path / "generated" / "building_commercial_part_wide_3_roof_junk_positions.bin"
-                                ),
-                            )
-                        )
-                    ),
-                    glist.StaticInstance(translation=[0,0,0]),
-                )
-            )
-            .add_object(
-                glist.Object(
-                    glist.GlistBaseGeometry(
-                        glist.GLIST("building_commercial_part_wide_4.glist").add_object(
-                            glist.Object(
-                                glist.Wavefront(geom_path / "obj" / "building_commercial_part_wide_4.obj"),
-                                glist.StaticInstanceBinaryFile(
-                                    geom_path / "generated" / "building_commercial_part_wide_4_positions.bin"
-                                ),
-                            )
-                        )
-                    ),
-                    glist.StaticInstance(translation=[0,0,0]),
-                )
-            )
-            .add_object(
-                glist.Object(
-                    glist.GlistBaseGeometry(
-                        glist.GLIST("building_residential_1.glist").add_object(
-                            glist.Object(
-                                glist.Wavefront(geom_path / "obj" / "building_residential_1.obj"),
-                                glist.StaticInstanceBinaryFile(
-                                    geom_path / "generated" / "building_residential_1_positions.bin"
-                                ),
-                            )
-                        )
-                    ),
-                    glist.StaticInstance(translation=[0,0,0]),
-                )
-            )
-            .add_object(
-                glist.Object(
-                    glist.GlistBaseGeometry(
-                        glist.GLIST("building_residential_2.glist").add_object(
-                            glist.Object(
-                                glist.Wavefront(geom_path / "obj" / "building_residential_2.obj"),
-                                glist.StaticInstanceBinaryFile(
-                                    geom_path / "generated" / "building_residential_2_positions.bin"
-                                ),
-                            )
-                        )
-                    ),
-                    glist.StaticInstance(translation=[0,0,0]),
-                )
-            )
-            .add_object(
-                glist.Object(
-                    glist.GlistBaseGeometry(
-                        glist.GLIST("detritus.glist").add_object(
-                            glist.Object(
-                                glist.Wavefront(geom_path / "obj" / "detritus_1.obj"),
-                                glist.StaticInstanceBinaryFile(
-                                    geom_path / "generated" / "detritus_positions.bin"
-                                ),
-                            )
-                        )
-                    ),
-                    glist.StaticInstance(translation=[0,0,0]),
-                )
-            )
-            .add_object(
-                glist.Object(
-                    glist.GlistBaseGeometry(
-                        glist.GLIST("dumpster.glist").add_object(
-                            glist.Object(
-                                glist.Wavefront(geom_path / "obj" / "dumpster.obj"),
-                                glist.StaticInstanceBinaryFile(
-                                    geom_path / "generated" / "dumpster_positions.bin"
-                                ),
-                            )
-                        )
-                    ),
-                    glist.StaticInstance(translation=[0,0,0]),
-                )
-            )
-            .add_object(
-                glist.Object(
-                    glist.GlistBaseGeometry(
-                        glist.GLIST("grass.glist").add_object(
-                            glist.Object(
-                                glist.Wavefront(geom_path / "obj" / "grass_1.obj"),
-                                glist.Wavefront(geom_path / "obj" / "grass_2.obj"),
-                                glist.Wavefront(geom_path / "obj" / "grass_3.obj"),
-                                glist.Wavefront(geom_path / "obj" / "grass_4.obj"),
-                                glist.StaticInstanceBinaryFile(
-                                    geom_path / "generated" / "grass_positions.bin"
-                                ),
-                            )
-                        )
-                    ),
-                    glist.StaticInstance(translation=[0,0,0]),
-                )
-            )
-            .add_object( # this model had a facet issue, likely due to an ngon
-                glist.Object(
-                    glist.GlistBaseGeometry(
-                        glist.GLIST("mailbox_residential.glist").add_object(
-                            glist.Object(
-                                glist.Wavefront(geom_path / "obj" / "mailbox_residential.obj"),
-                                glist.StaticInstance(),
-                            )
-                        )
-                    ),
-                    glist.StaticInstance(translation=[0,0,0]),
-                )
-            )
-            .add_object(
-                glist.Object(
-                    glist.GlistBaseGeometry(
-                        glist.GLIST("mailbox_usps.glist").add_object(
-                            glist.Object(
-                                glist.Wavefront(geom_path / "obj" / "mailbox_usps.obj"),
-                                glist.StaticInstanceBinaryFile(
-                                    geom_path / "generated" / "mailbox_usps_positions.bin"
-                                ),
-                            )
-                        )
-                    ),
-                    glist.StaticInstance(translation=[0,0,0]),
-                )
-            )
-            .add_object(
-                glist.Object(
-                    glist.GlistBaseGeometry(
-                        glist.GLIST("power_line.glist").add_object(
-                            glist.Object(
-                                glist.GlistBaseGeometry(
-                                    # The bundled power_line.glist packs 3 cubic
-                                    # Bezier curves into each <beziercurveset>
-                                    # with a single <matid>; DIRSIG sizes the
-                                    # per-object materialData array to 1 and
-                                    # then aborts with 'Out of range object
-                                    # material requested!' when shadow rays hit
-                                    # the 2nd or 3rd curve. Patch the asset on
-                                    # stage so each set holds exactly one curve.
-                                    patch_glist_split_beziercurvesets(
-                                        geom_path / "generated" / "power_line.glist"
-                                    )
-                                ),
-                                glist.StaticInstance(),
-                            )
-                        )
-                    ),
-                    glist.StaticInstance(translation=[0,0,0]),
-                )
-            )
-            .add_object(
-                glist.Object(
-                    glist.GlistBaseGeometry(
-                        glist.GLIST("power_pole.glist").add_object(
-                            glist.Object(
-                                glist.Wavefront(geom_path / "obj" / "power_pole_12m.obj"),
-                                glist.StaticInstanceBinaryFile(
-                                    geom_path / "generated" / "power_pole_positions.bin"
-                                ),
-                            )
-                        )
-                    ),
-                    glist.StaticInstance(translation=[0,0,0]),
-                )
-            )
-            .add_object(
-                glist.Object(
-                    glist.GlistBaseGeometry(
-                        glist.GLIST("rock.glist").add_object(
-                            glist.Object(
-                                glist.Wavefront(geom_path / "obj" / "rock_1.obj"),
-                                glist.Wavefront(geom_path / "obj" / "rock_2.obj"),
-                                glist.Wavefront(geom_path / "obj" / "rock_3.obj"),
-                                glist.Wavefront(geom_path / "obj" / "rock_4.obj"),
-                                glist.Wavefront(geom_path / "obj" / "rock_5.obj"),
-                                glist.Wavefront(geom_path / "obj" / "rock_6.obj"),
-                                glist.StaticInstance(),
-                            )
-                        )
-                    ),
-                    glist.StaticInstance(translation=[0,0,0],anchor='terrain'),
-                )
-            )
-            .add_object(
-                glist.Object(
-                    glist.GlistBaseGeometry(
-                        glist.GLIST("shrub.glist").add_object(
-                            glist.Object(
-                                glist.Wavefront(geom_path / "obj" / "shrub_1.obj"),
-                                glist.Wavefront(geom_path / "obj" / "shrub_2.obj"),
-                                glist.StaticInstance(),
-                            )
-                        )
-                    ),
-                    glist.StaticInstance(translation=[0,0,0],anchor='terrain'),
-                )
-            )
-            .add_object(
-                glist.Object(
-                    glist.GlistBaseGeometry(
-                        glist.GLIST("street_light_short.glist").add_object(
-                            glist.Object(
-                                glist.Wavefront(geom_path / "obj" / "street_light_short.obj"),
-                                glist.StaticInstanceBinaryFile(
-                                    geom_path / "generated" / "street_light_short_positions.bin"
-                                ),
-                            )
-                        )
-                    ),
-                    glist.StaticInstance(translation=[0,0,0]),
-                )
-            )
-            .add_object(
-                glist.Object(
-                    glist.GlistBaseGeometry(
-                        glist.GLIST("street_light_tall_traffic_light.glist").add_object(
-                            glist.Object(
-                                glist.Wavefront(geom_path / "obj" / "street_light_tall_traffic_light.obj"),
-                                glist.StaticInstanceBinaryFile(
-                                    geom_path / "generated" / "street_light_tall_traffic_light_positions.bin"
-                                ),
-                            )
-                        )
-                    ),
-                    glist.StaticInstance(translation=[0,0,0]),
-                )
-            )
-            .add_object(
-                glist.Object(
-                    glist.GlistBaseGeometry(
-                        glist.GLIST("street_light_tall.glist").add_object(
-                            glist.Object(
-                                glist.Wavefront(geom_path / "obj" / "street_light_tall.obj"),
-                                glist.StaticInstanceBinaryFile(
-                                    geom_path / "generated" / "street_light_tall_positions.bin"
-                                ),
-                            )
-                        )
-                    ),
-                    glist.StaticInstance(translation=[0,0,0]),
-                )
-            )
-            .add_object(
-                glist.Object(
-                    glist.GlistBaseGeometry(
-                        glist.GLIST("street_sign.glist").add_object(
-                            glist.Object(
-                                glist.Wavefront(geom_path / "obj" / "street_sign_1.obj"),
-                                glist.Wavefront(geom_path / "obj" / "street_sign_2.obj"),
-                                glist.Wavefront(geom_path / "obj" / "street_sign_3.obj"),
-                                glist.Wavefront(geom_path / "obj" / "street_sign_4.obj"),
-                                glist.StaticInstanceBinaryFile(
-                                    geom_path / "generated" / "street_sign_positions.bin"
-                                ),
-                            )
-                        )
-                    ),
-                    glist.StaticInstance(translation=[0,0,0]),
-                )
-            )
-            .add_object(
-                glist.Object(
-                    glist.GlistBaseGeometry(
-                        glist.GLIST("subcanopy.glist").add_object(
-                            glist.Object(
-                                glist.Wavefront(geom_path / "obj" / "subcanopy_1.obj"),
-                                glist.Wavefront(geom_path / "obj" / "subcanopy_2.obj"),
-                                glist.Wavefront(geom_path / "obj" / "subcanopy_3.obj"),
-                                glist.StaticInstanceBinaryFile(
-                                    geom_path / "generated" / "subcanopy_positions.bin"
-                                ),
-                            )
-                        )
-                    ),
-                    glist.StaticInstance(translation=[0,0,0]),
-                )
-            )
-            .add_object(
-                glist.Object(
-                    glist.GlistBaseGeometry(
-                        glist.GLIST("traffic_cone.glist").add_object(
-                            glist.Object(
-                                glist.Wavefront(geom_path / "obj" / "traffic_cone.obj"),
-                                glist.StaticInstance(),
-                            )
-                        )
-                    ),
-                    glist.StaticInstance(translation=[0,0,0]),
-                )
-            )
-            .add_object(
-                glist.Object(
-                    glist.GlistBaseGeometry(
-                        glist.GLIST("trash_can.glist").add_object(
-                            glist.Object(
-                                glist.Wavefront(geom_path / "obj" / "trash_can.obj"),
-                                glist.StaticInstanceBinaryFile(
-                                    geom_path / "generated" / "trash_can_positions.bin"
-                                ),
-                            )
-                        )
-                    ),
-                    glist.StaticInstance(translation=[0,0,0]),
-                )
-            )
-            .add_object(
-                glist.Object(
-                    glist.GlistBaseGeometry(
-                        glist.GLIST("tree_conif_large.glist").add_object(
-                            glist.Object(
-                                glist.Wavefront(geom_path / "obj" / "tree_conif_large_1.obj"),
-                                glist.StaticInstanceBinaryFile(
-                                    geom_path / "generated" / "tree_conif_large_positions.bin"
-                                ),
-                            )
-                        )
-                    ),
-                    glist.StaticInstance(translation=[0,0,0]),
-                )
-            )
-            .add_object(
-                glist.Object(
-                    glist.GlistBaseGeometry(
-                        glist.GLIST("tree_decid_large.glist").add_object(
-                            glist.Object(
-                                glist.Wavefront(geom_path / "obj" / "tree_decid_large_1.obj"),
-                                glist.Wavefront(geom_path / "obj" / "tree_decid_large_2.obj"),
-                                glist.StaticInstanceBinaryFile(
-                                    geom_path / "generated" / "tree_decid_large_positions.bin"
-                                ),
-                            )
-                        )
-                    ),
-                    glist.StaticInstance(translation=[0,0,0]),
-                )
-            )
-            .add_object(
-                glist.Object(
-                    glist.GlistBaseGeometry(
-                        glist.GLIST("tree_decid_small.glist").add_object(
-                            glist.Object(
-                                glist.Wavefront(geom_path / "obj" / "tree_decid_small_1.obj"),
-                                glist.Wavefront(geom_path / "obj" / "tree_decid_small_2.obj"),
-                                glist.Wavefront(geom_path / "obj" / "tree_decid_small_3.obj"),
-                                glist.StaticInstanceBinaryFile(
-                                    geom_path / "generated" / "tree_decid_small_positions.bin"
-                                ),
-                            )
-                        )
-                    ),
-                    glist.StaticInstance(translation=[0,0,0]),
-                )
-            )
-        )
+        urban = _build_lwir_urban_geometry(geom_path)
 
         location = frames.GeodeticFrame(3.15, -77.61, 0)
         sceneObj = (
@@ -1056,23 +636,29 @@ class LWIRUrbanAltScene(Node):
         objectMetadata = []        
         objectGenerators = file_to_objgen(inputObjects, AnaDirsigObject)
         objectsGList = glist.GLIST()
+        anaObjects = []
         for generator in objectGenerators:
             anaObject = generator.exec() # trigger the generator
             objectMetadata.append({
                 "name": anaObject.name,
                 "modifiers": anaObject.modifiers,
             })
-            objectsGList.add_object(anaObject.root)
-            
-            #Update object's elevation for static instances
-            elevationGListPath = Path(get_volume_path("dirsig_pkg", "dirsig-shared:LWIR_Urban_Alt/geometry/terrain_elevation.glist"))
-            align_objects_with_terrain(anaObject, elevationGListPath, anchorName)
+            anaObjects.append(anaObject)
 
             #Collect object instance names for abundance truth collection
-            for objInstance in anaObject.root.get_instances():
-                names.append(objInstance.get_name())
-            
+            names.extend(anaObject.instance_names())
+
+        #Update the objects' elevation for static instances, all in one batch
+        elevationGListPath = Path(get_volume_path("dirsig_pkg", ELEVATION_GLISTS["LWIR_Urban_Alt"]))
+        align_objects_with_terrain(anaObjects, terrain_elevation(elevationGListPath), anchorName)
+
+        #Add the objects to the glist, one glist object per base geometry
+        for objectRoot in shared_geometry_objects(anaObjects):
+            objectsGList.add_object(objectRoot)
         sceneObj.add_geometry("Objects", objectsGList)
 
+        # Terrain lookups are done; stop any raycast workers
+        shutdown_raycast_workers()
+
         metadata['Object Modifiers'] = objectMetadata
         return scene([sceneObj], location=location, meta=metadata,tags=names)
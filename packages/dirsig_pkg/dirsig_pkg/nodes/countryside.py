@@ -33,9 +33,13 @@ from dirfm import materials
 import dirfm.glist as glist
 from dirfm import frames
 from dirfm.utilities.grid_position_generator import grid_position_generator
-from dirsig_pkg.lib.scene_utils import terrain_scene, elevation, align_directions
-from dirsig_pkg.lib.object import AnaDirsigObject, file_to_objgen
+from dirsig_pkg.lib.scene_utils import shutdown_raycast_workers
+from dirsig_pkg.lib.terrain import ELEVATION_GLISTS, align_objects_with_terrain, terrain_elevation
+from dirsig_pkg.lib.object import AnaDirsigObject, file_to_objgen, shared_geometry_objects
 from dirsig_pkg.lib.materials_large_desert import mml, map_path
+from dirsig_pkg.lib.lod import lod_texture
+from dirsig_pkg.lib.staging import prefetch, stage
+from dirsig_pkg.lib.workspace import run_workspace
 
 logger = logging.getLogger(__name__)
 
@@ -45,12 +49,12 @@ scene_path = (
 )
 
 
-def make_locations(parcel_idx, di, sp, ro, dev, poly):
+def make_locations(parcel_idx, di, sp, ro, dev, poly, out_dir):
     """Generate locations for a parcel using grid position generator."""
     
     #mask (Polygon, optional): A Polygon object to mask out grid positions outside of its boundary.
     locations = grid_position_generator(di, sp, ro, dev, poly)
-    locationsFilepath = Path("/tmp") / f"parcel{parcel_idx}.bin"
+    locationsFilepath = Path(out_dir) / f"parcel{parcel_idx}.bin"
     sib = glist.StaticInstanceBinary(fname=str(locationsFilepath))
     for loc in locations:
         sib.add_instance(translation=loc, rotation=[0, 0, ctx.random.random() * 360])
@@ -64,6 +68,7 @@ def scene(scene_objects, location=(0, 0, 0), meta={}, tags=[]):
         Output:
         - scene objects
         - scene group timezone
+        - scene origin altitude
         - scene metadata
     """
     # An estimate to find the correct time zone based on position
@@ -72,6 +77,7 @@ def scene(scene_objects, location=(0, 0, 0), meta={}, tags=[]):
     bundle = {
         "sceneObjects": scene_objects,
         "timezone": timezone,
+        "altitude": float(location.get_pos()[2]),
         "metadata": meta,
         "tags": tags}
     return {"Scene" : bundle}
@@ -82,18 +88,9 @@ def scene_object(scene_name):
     """
     sceneObj = SCENE(scene_name).set_properties("vis,nir,swir")
     
-    # Set up directories like the working implementation
-    dirs = {
-        'root': Path("/tmp"),
-        'maps': Path("/tmp/maps"),
-        'material': Path("/tmp/materials"),
-        'geometry': Path("/tmp/geometry"),
-    }
-    
-    for d in dirs.values():
-        if not os.path.isdir(str(d)):
-            os.makedirs(str(d), exist_ok=True)
-            
+    # Maps and materials are written to this run's workspace
+    dirs = run_workspace().scene_dirs("countryside")
+
     sceneObj.set_ems_dir(dirs["material"])
     sceneObj.set_ext_dir(dirs["material"])
     sceneObj.set_abs_dir(dirs["material"])
@@ -115,7 +112,7 @@ def region_bundle_object(region, region_type, anchor_name, verticies):
     else:
         # Fallback to desert if no biome node is linked (region_type could be "Desert" string)
         bundleObject = glist.Object(
-            glist.GlistBaseGeometry(scene_path / "bundles" / "Euclea_racemosa" / "Euclea_racemosa.glist"),
+            glist.GlistBaseGeometry(stage(scene_path / "bundles" / "Euclea_racemosa" / "Euclea_racemosa.glist")),
         )
         di = [70, 70]
         sp = [10, 10]
@@ -125,9 +122,10 @@ def region_bundle_object(region, region_type, anchor_name, verticies):
     rot = ctx.random.randint(0,360)
     
     # Create jobs for multiprocessing
+    parcelDir = run_workspace().path("parcels")
     jobs = []
     for parcelIdx in region['parcels']:
-        jobs.append((parcelIdx, di, sp, rot, dev, Polygon(verticies[parcelIdx])))
+        jobs.append((parcelIdx, di, sp, rot, dev, Polygon(verticies[parcelIdx]), parcelDir))
     
     with Pool() as pool:
         locFilepaths = pool.starmap(make_locations, jobs)
@@ -169,22 +167,29 @@ def create_terrain(sceneObj):
     terrain_material = (
         materials.Material("Terrain", True, ID="terrain")
         .set_rad_solver(materials.SimpleRadiationSolver("LOW"))
-        .set_normal_map(
-            materials.NormalMap(
-                map_path / "Dirt-Normal.jpg",
-                materials.DrapeProjection(
-                    [0, 0], 0.001, origin="cartesian", extendx="repeat", extendy="repeat"
-                ),
-            )
+    )
+
+    def normal_map(image_path, pixel_size):
+        return materials.NormalMap(
+            image_path,
+            materials.DrapeProjection(
+                [0, 0], pixel_size, origin="cartesian", extendx="repeat", extendy="repeat"
+            ),
         )
-        .set_material_map(
-            materials.MaterialMap(
-                "Gradient",
-                scene_path / "bundles" / "terrain" / "maps" / "Terrain.png",
-                materials.DrapeProjection([0, 0], 6, origin="cartesian"),
-                [(0, mml["Soil-0000"]), (128, mml["Soil-0001"]), (255, mml["Soil-0002"])],
-            )
+
+    def material_map(image_path, pixel_size):
+        return materials.MaterialMap(
+            "Gradient",
+            image_path,
+            materials.DrapeProjection([0, 0], pixel_size, origin="cartesian"),
+            [(0, mml["Soil-0000"]), (128, mml["Soil-0001"]), (255, mml["Soil-0002"])],
         )
+
+    # Both maps are switched to a mip level matching the sensor GSD at render time
+    lod_texture(terrain_material, "set_normal_map", normal_map, map_path / "Dirt-Normal.jpg", 0.001, normal=True)
+    lod_texture(
+        terrain_material, "set_material_map", material_map,
+        scene_path / "bundles" / "terrain" / "maps" / "Terrain.png", 6,
     )
     
     mml.add_entry(terrain_material)
@@ -194,7 +199,7 @@ def create_terrain(sceneObj):
     terrainGLIST = (
         glist.GLIST("Terrain.glist").add_object(
             glist.Object(
-                glist.Wavefront(scene_path / "geometry" / "terrain.obj"),
+                glist.Wavefront(stage(scene_path / "geometry" / "terrain.obj")),
                 glist.StaticInstance(),
             )
         )
@@ -203,42 +208,6 @@ def create_terrain(sceneObj):
     terrainObject.add_instance(glist.StaticInstance("terrain"))
     sceneObj.add_geometry("Terrain", glist.GLIST().add_object(terrainObject))
 
-def align_objects_with_terrain(ana_object, elevationHdfpath, anchor_name=None, location=[0,0,0]):
-    """ Update the position of each object instance as follows
-    1. Raise the z value of the translation by the elevation of the terrain
-    2. Optionally, rotate the object to match the terrain normal
-    """
-    #Set anchors for all instances of objects
-    if ana_object.match_elevation:
-        for objInstance in ana_object.root.get_instances():
-            if type(objInstance) is not glist.DynamicInstance:
-                objInstance.set_anchor(anchor_name)
-
-    # Only objects with static instances can be explicitly aligned with terrain
-    if glist.StaticInstance not in [type(i) for i in ana_object.root.get_instances()]:
-        return
-
-    # Update the position of each object instance
-    for objInstance in ana_object.root.get_instances():
-        if type(objInstance) == glist.StaticInstance:
-            trans = objInstance.get_translation()
-            e, surfaceNormal = elevation(elevationHdfpath, int(trans[0]), int(trans[1]))
-            
-            trans[2]+=e
-            objInstance.set_translation(trans)
-
-            if ana_object.name == "Trees":
-                # The trees glist is a population and cannot be anchored.
-                # It must be included directly.
-                sceneObj.add_geometry_include(ana_object.root.get_base_geometry()[0]._glist)
-            else:
-                if ana_object.match_slope:
-                    #Rotate the object to lay flat on the terrain
-                    rot = objInstance.get_rotation()
-                    eulerAngles = align_directions(surfaceNormal, [0,0,1], units='degrees')
-                    objInstance.set_rotation([eulerAngles[0], eulerAngles[1], rot[2]])
-
-
 class Countryside(Node):
     """ A minimal scene with terrain and trees
     """
@@ -246,35 +215,10 @@ class Countryside(Node):
     def exec(self):
         logger.info("Executing {}".format(self.name))
 
-        # Define the scene object
-        sceneObj = scene_object("Contryside_Scene")
-        
-        # Set scene location and origin
-        location = frames.GeodeticFrame(44.685, 10.2172, 0.000)
-        sceneObj.set_origin(location)
-        
-        # Create the background terrain
+        # Build the parcels/regions first: their locations are generated on a forked
+        # process pool, which must not be started while prefetch threads are running
+        # (a child forked mid-copy can inherit a held lock and hang)
         anchorName = "terrain"
-        create_terrain(sceneObj)
-        
-        # Add roads as decal maps
-        roadGlistPath = scene_path / "bundles" / "roads" / "decalMaps.glist"
-        roadDecal = DecalMap('Road Decal Map', 'terrain', roadGlistPath)
-        sceneObj.add_decal_map(roadDecal)
-        
-        # Add trees if enabled
-        use_trees_input = self.inputs.get("Use Trees")[0]
-        if use_trees_input == 'True':
-            treesBundleObject = glist.Object(glist.GlistBaseGeometry(scene_path / "bundles" / "trees" / "trees.glist"))
-            treeLocationsFilepath = scene_path / "treeInstances.bin"
-            treesBundleObject.add_instance(glist.StaticInstanceBinaryFile(treeLocationsFilepath, anchor=anchorName))
-            sceneObj.add_geometry("Trees", glist.GLIST().add_object(treesBundleObject))
-            logger.info("Added trees to the scene")
-        else:
-            logger.info(f"User disabled trees")
-        
-
-        # Add parcels/regions
         regions = {
             "central":  {'parcels': [102, 115, 121, 109, 119, 117, 128, 123, 122, 124]},
             "northern": {'parcels': [83, 88, 85, 91, 93, 99, 86, 90, 87, 92, 96, 118, 114, 116, 95,94, 89, 112, 110, 120, 113, 111, 97, 107, 104, 101, 547, 108]},
@@ -307,7 +251,45 @@ class Countryside(Node):
                 logger.info(f"{regionName} Region: Selected '{regionInput.get('Biome', 'Unknown')}' from {len(linked_biomes)} linked biomes (seed: {ctx.seed}, interp_num: {ctx.interp_num})")
             regionBundleObject = region_bundle_object(regions[regionName.lower()], regionInput, anchorName, verticies)
             regionsGList.add_object(regionBundleObject)
+
+        # Start staging the scene assets while the rest of the graph runs
+        assets = [
+            scene_path / "geometry" / "terrain.obj",
+            scene_path / "bundles" / "terrain" / "maps" / "Terrain.png",
+            map_path / "Dirt-Normal.jpg",
+            scene_path / "bundles" / "roads" / "decalMaps.glist",
+        ]
+        if self.inputs.get("Use Trees")[0] == 'True':
+            assets += [scene_path / "bundles" / "trees" / "trees.glist", scene_path / "treeInstances.bin"]
+        prefetch(assets, label="Countryside")
+
+        # Define the scene object
+        sceneObj = scene_object("Contryside_Scene")
+        
+        # Set scene location and origin
+        location = frames.GeodeticFrame(44.685, 10.2172, 0.000)
+        sceneObj.set_origin(location)
+        
+        # Create the background terrain
+        create_terrain(sceneObj)
+        
+        # Add roads as decal maps
+        roadGlistPath = stage(scene_path / "bundles" / "roads" / "decalMaps.glist")
+        roadDecal = DecalMap('Road Decal Map', 'terrain', roadGlistPath)
+        sceneObj.add_decal_map(roadDecal)
         
+        # Add trees if enabled
+        use_trees_input = self.inputs.get("Use Trees")[0]
+        if use_trees_input == 'True':
+            treesBundleObject = glist.Object(glist.GlistBaseGeometry(stage(scene_path / "bundles" / "trees" / "trees.glist")))
+            treeLocationsFilepath = stage(scene_path / "treeInstances.bin")
+            treesBundleObject.add_instance(glist.StaticInstanceBinaryFile(treeLocationsFilepath, anchor=anchorName))
+            sceneObj.add_geometry("Trees", glist.GLIST().add_object(treesBundleObject))
+            logger.info("Added trees to the scene")
+        else:
+            logger.info(f"User disabled trees")
+        
+
         sceneObj.add_geometry("Regions", regionsGList)
         
         # Add towers and cables
@@ -328,7 +310,7 @@ class Countryside(Node):
             )
         else:  # Default to Aluminum
             # Aluminum cable properties - using brushed aluminum BRDF
-            cableParameterFile = scene_path / "materials" / "brushedAluminium" / "al-crc-0125.TS.brdf"
+            cableParameterFile = stage(scene_path / "materials" / "brushedAluminium" / "al-crc-0125.TS.brdf")
             enableDiffuseContribution=True
             enableShadowingFunction=True
             cableMaterial.add_surface_properties(
@@ -381,7 +363,7 @@ class Countryside(Node):
                     # Define glists for towers and cables
                     for towerPositionIdx in range(len(positions)-1):
                         logger.info(f"Adding {positions[towerPositionIdx]['Tower Name']} (group {groupNumber+1})")
-                        tower = glist.Object(glist.GlistBaseGeometry(bundle1Filepath))
+                        tower = glist.Object(glist.GlistBaseGeometry(stage(bundle1Filepath)))
                         translation = positions[towerPositionIdx]['Scene Location']
                         rotation = positions[towerPositionIdx]['Rotation']
                         # Ensure each tower has a unique name by suffixing with its group number
@@ -454,10 +436,7 @@ class Countryside(Node):
             objectMetadata = []        
             objectGenerators = file_to_objgen(inputObjects, AnaDirsigObject)
             objectsGList = glist.GLIST()
-            
-            # Compile elevation scene once before processing objects
-            elevationGListPath = scene_path / "bundles" / "terrain" / "terrain-dirt.glist"
-            elevationHdfpath = self._compile_elevation_scene(elevationGListPath)
+            anaObjects = []
 
             for generator in objectGenerators:
                 if not generator:
@@ -469,36 +448,40 @@ class Countryside(Node):
                     "name": anaObject.name,
                     "modifiers": anaObject.modifiers,
                 })
-                # Add the instance to the glist
-                objectsGList.add_object(anaObject.root)
-                
-                # Update object's elevation for static instances
-                align_objects_with_terrain(anaObject, elevationHdfpath, anchorName)
+                anaObjects.append(anaObject)
+
+                if anaObject.name == "Trees":
+                    # The trees glist is a population and cannot be anchored.
+                    # It must be included directly, without slope alignment.
+                    anaObject.match_slope = False
+                    sceneObj.add_geometry_include(anaObject.root.get_base_geometry()[0]._glist)
                 
                 # Collect object instance names for abundance truth collection
-                for objInstance in anaObject.root.get_instances():
-                    names.append(objInstance.get_name())
+                names.extend(anaObject.instance_names())
             
-            sceneObj.add_geometry("Objects", objectsGList)
             metadata['Object Modifiers'] = objectMetadata
+
+            # Update the objects' elevation for static instances, all in one batch
+            elevationGListPath = Path(get_volume_path("dirsig_pkg", ELEVATION_GLISTS["Europe7km"]))
+            align_objects_with_terrain(anaObjects, terrain_elevation(elevationGListPath), anchorName)
+
+            # Add the objects to the glist, one glist object per base geometry
+            for objectRoot in shared_geometry_objects(anaObjects):
+                objectsGList.add_object(objectRoot)
+            sceneObj.add_geometry("Objects", objectsGList)
+            shutdown_raycast_workers()
         
         # Deduplicate tag names before returning the scene so the truth collection receives unique tags
         unique_names = sorted(set(names))
         return scene([sceneObj], location=location, meta=metadata, tags=unique_names)
 
-    def _compile_elevation_scene(self, elevation_glist_path):
-        """Compile the elevation scene and return the HDF file path."""
-        baseGeometry = glist.GlistBaseGeometry(elevation_glist_path)
-        terrainBundleObject = glist.Object(baseGeometry)
-        return terrain_scene(terrainBundleObject)
-
 
 class GrassBiome(Node):
     """Represents the Grass biome."""
 
     def exec(self):
         logger.info(f"Executing {self.name}")
-        bundleObject = glist.Object(glist.GlistBaseGeometry(scene_path / "bundles" / "grass" / "grass.glist"))
+        bundleObject = glist.Object(glist.GlistBaseGeometry(stage(scene_path / "bundles" / "grass" / "grass.glist")))
         
         # Get density preference
         density = self.inputs.get('Density', ['Lush & Thick'])[0]
@@ -533,7 +516,7 @@ class WheatBiome(Node):
 
     def exec(self):
         logger.info(f"Executing {self.name}")
-        bundleObject = glist.Object(glist.GlistBaseGeometry(scene_path / "bundles" / "wheat" / "wheat.glist"))
+        bundleObject = glist.Object(glist.GlistBaseGeometry(stage(scene_path / "bundles" / "wheat" / "wheat.glist")))
         return {
             "Biome": {
                 "Biome": "Wheat",
@@ -550,7 +533,7 @@ class CornBiome(Node):
 
     def exec(self):
         logger.info(f"Executing {self.name}")
-        bundleObject = glist.Object(glist.GlistBaseGeometry(scene_path / "bundles" / "corn" / "corn.glist"))
+        bundleObject = glist.Object(glist.GlistBaseGeometry(stage(scene_path / "bundles" / "corn" / "corn.glist")))
         return {
             "Biome": {
                 "Biome": "Corn",
@@ -568,8 +551,8 @@ class DesertBiome(Node):
     def exec(self):
         logger.info(f"Executing {self.name}")
         bundleObject = glist.Object(
-            glist.GlistBaseGeometry(scene_path / "bundles" / "Euclea_racemosa" / "Euclea_racemosa.glist"),
-            glist.GlistBaseGeometry(scene_path / "bundles" / "Restio_eleocharis" / "Restio_eleocharis.glist"),
+            glist.GlistBaseGeometry(stage(scene_path / "bundles" / "Euclea_racemosa" / "Euclea_racemosa.glist")),
+            glist.GlistBaseGeometry(stage(scene_path / "bundles" / "Restio_eleocharis" / "Restio_eleocharis.glist")),
         )
         return {
             "Biome": {
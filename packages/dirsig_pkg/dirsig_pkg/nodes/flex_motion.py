@@ -18,6 +18,7 @@
 import logging
 from anatools.lib.node import Node
 from dirsig_pkg.lib.utils import array_input
+from dirsig_pkg.lib.motion import Trajectory, flex_motion, set_trajectory
 
 import dirfm.flexible_motion as fm
 
@@ -44,9 +45,12 @@ class WaypointLocationEngine(Node):
             le.add_point(entry[0],entry[1])
 
         # This engine requires at least two inputs so if one is provided the add a copy 100 seconds later
-        if len(self.inputs["Position(s)"])==1:
-            entry = self.inputs["Position(s)"][0]
+        entries = list(self.inputs["Position(s)"])
+        if len(entries)==1:
+            entry = entries[0]
             le.add_point(entry[0]+100,entry[1])
+            entries.append((entry[0]+100,entry[1]))
+        set_trajectory(le, Trajectory.waypoints(entries, frame=self.inputs["Frame"][0]))
 
         return {"LocationEngine": le}
 
@@ -67,6 +71,7 @@ class StraightLineLocationEngine(Node):
            p = fm.GeodeticFrame(pos[0],pos[1],pos[2])
 
         le = fm.StraightLocationEngine(p,heading,velocity)
+        set_trajectory(le, Trajectory.straight(pos, heading, velocity, frame=frame))
 
         return {"LocationEngine": le}
 
@@ -84,6 +89,7 @@ class FixedLocationEngine(Node):
         elif frame=="geodetic":
            p = fm.GeodeticFrame(pos[0],pos[1],pos[2])
         le = fm.FixedLocationEngine(p)
+        set_trajectory(le, Trajectory.fixed(pos, frame=frame))
 
         return {"LocationEngine": le}
 
@@ -143,7 +149,7 @@ class FlexMotion(Node):
         if self.inputs["LocationEngine"][0]: # Not None or empty string
             le = self.inputs["LocationEngine"][0]
         else:
-            le = fm.FixedLocationEngine(fm.ENUFrame(0,0,0))
+            le = set_trajectory(fm.FixedLocationEngine(fm.ENUFrame(0,0,0)), Trajectory.fixed([0,0,0]))
 
         if self.inputs["OrientationEngine"][0]: # Not None or empty string
             oe = self.inputs["OrientationEngine"][0]
@@ -151,6 +157,6 @@ class FlexMotion(Node):
             oe = fm.LookAtOrientationEngine(
                 fm.FixedLocationEngine(
                     fm.ENUFrame(0,0.1,0)),up=[0,0,1])
-        motion = fm.FlexMotion(le,oe)
+        motion = flex_motion(le,oe)
 
         return {"Motion": motion}
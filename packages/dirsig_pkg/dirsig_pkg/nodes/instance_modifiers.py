@@ -63,11 +63,17 @@ class DynamizeObjects(Node):
         # Collect inputs
         children = file_to_objgen(self.inputs["Objects"], AnaDirsigObject)
         m = self.inputs["Flex Motion"][0]
+        drape = self.inputs["Drape on Terrain"][0]
+        drapeTimeStep = float(self.inputs["Drape Time Step (s)"][0])
+        drapeDuration = float(self.inputs["Drape Duration (s)"][0])
         
         # Add modifier to the generator tree
         generator = ObjectModifier(
             method="set_dynamic_instance",
             children=children,
             motion=m,
+            drape=drape=="True",
+            drape_time_step=drapeTimeStep,
+            drape_duration=drapeDuration,
         )
         return {"Objects": generator}
@@ -49,11 +49,12 @@ class WorldView3(Node):
         if ctx.preview:
             schedule = "simulation"
 
-        platformSensorObject = wv3_sensor(truth_bands=truthBands, schedule=schedule, detector_clock_rate=detectorClockRate)
+        platformSensorObject, ifov = wv3_sensor(truth_bands=truthBands, schedule=schedule, detector_clock_rate=detectorClockRate)
         motion = self.inputs['Flex Motion'][0]
         sensorAssets = {
             'sensor': platformSensorObject,
             'motion': motion,
+            'ifov': ifov,
             'convert_args': ["--bands=2,3,4", "--percent=0", "--per_band"],
         }
         return {"Sensor": sensorAssets}
@@ -78,12 +79,13 @@ class SkySat(Node):
         if ctx.preview:
             schedule = "simulation"
         
-        platformSensorObject = skysat_sensor(truth_bands=truthBands, schedule=schedule, detector_clock_rate=detectorClockRate)
+        platformSensorObject, ifov = skysat_sensor(truth_bands=truthBands, schedule=schedule, detector_clock_rate=detectorClockRate)
 
         motion = self.inputs['Flex Motion'][0]
         sensorAssets = {
             'sensor': platformSensorObject,
             'motion': motion,
+            'ifov': ifov,
             'convert_args': ["--bands=2,1,0", "--sigma=2"]
         }
         return {"Sensor": sensorAssets}
@@ -111,11 +113,12 @@ class SuperDove(Node):
             schedule = "simulation"
         
         # Create the platform bundle
-        platformSensorObject = superdove_sensor(truth_bands=truthBands, schedule=schedule, detector_clock_rate=detectorClockRate)
+        platformSensorObject, ifov = superdove_sensor(truth_bands=truthBands, schedule=schedule, detector_clock_rate=detectorClockRate)
         motion = self.inputs['Flex Motion'][0]
         sensorAssets = {
             'sensor': platformSensorObject,
             'motion': motion,
+            'ifov': ifov,
             'convert_args': ["--bands=5, 3, 1", "--percent=0", "--per_band"],
         }
         return {"Sensor": sensorAssets}
@@ -134,7 +137,7 @@ class Drone(Node):
             schedule = "simulation"
         
         # Create the platform bundle
-        platforSensorObject = rgb_camera(
+        platforSensorObject, ifov = rgb_camera(
             focal_length=35,
             truth_bands=[],
             schedule=schedule, detector_clock_rate=detectorClockRate,
@@ -143,6 +146,7 @@ class Drone(Node):
         sensorAssets = {
             'sensor': platforSensorObject,
             'motion': motion,
+            'ifov': ifov,
             'convert_args': ["--bands=0, 1, 2", "--percent=2"],
         }
         return {"Sensor": sensorAssets}
@@ -170,11 +174,12 @@ class SatelliteHSI(Node):
             schedule = "simulation"
 
         # Get spectrometer the altitude and create the platform bundle
-        platformSensorObject = aviris_sensor(truth_bands=[], schedule=schedule, detector_clock_rate=detectorClockRate)
+        platformSensorObject, ifov = aviris_sensor(truth_bands=[], schedule=schedule, detector_clock_rate=detectorClockRate)
         motion = self.inputs['Flex Motion'][0]
         sensorAssets = {
             'sensor': platformSensorObject,
             'motion': motion,
+            'ifov': ifov,
             'convert_args': ["--band=10", "--percent=0"],
         }
         return {"Sensor": sensorAssets}
@@ -289,12 +294,14 @@ class CustomRGBSensor(Node):
                 )
             )
         )
+        ifov = pixel_ifov(pitch[0], focal_length) if mount_orientation != "Forward" else None
             
         # Get spectrometer the altitude and create the platform bundle
         motion = self.inputs['Flex Motion'][0]
         sensorAssets = {
             'sensor': sensor,
             'motion': motion,
+            'ifov': ifov,
             'convert_args': ["--bands=0,1,2", "--percent=2", "--xyztorgb", "--tonemap=srgb"],
         }
         return {"Sensor": sensorAssets}
@@ -361,11 +368,13 @@ class ThermalSensor(Node):
         mountAttachment = ps.Attachment(ps.StaticMount("Static Mount").set_rotation("xyz", "degrees", mount_rotation[0], mount_rotation[1], mount_rotation[2]))
         mountAttachment.add_attachment(ps.Attachment(instrument))
         sensor = ps.PlatformSensorPlugin().add_attachment(mountAttachment)
+        ifov = pixel_ifov(pitch[0], focal_length) if mount_orientation != "Forward" else None
     
         motion = self.inputs['Flex Motion'][0]
         sensorAssets = {
             'sensor': sensor,
             'motion': motion,
+            'ifov': ifov,
             'convert_args': [],
         }
         return {"Sensor": sensorAssets}
@@ -400,7 +409,7 @@ class AltumPT(Node):
 
         truthBands = []
         truthBands.append("Intersection")
-        sensor = altumPT_sensor(
+        sensor, ifov = altumPT_sensor(
             resolution=resolution, 
             truth_bands=truthBands, 
             rgb_only=rgb_only,
@@ -417,6 +426,7 @@ class AltumPT(Node):
         sensorAssets = {
             'sensor': sensor,
             'motion': motion,
+            'ifov': ifov,
             'convert_args': ["--band=2"],
         }
         return {"Sensor": sensorAssets}
@@ -447,7 +457,7 @@ class ElectroOptical(Node):
         collect_truth = self.inputs.get('Collect Truth', ['True'])[0] == 'True'
         if collect_truth:
             truthBands.append("Intersection")
-        sensor = altumPT_sensor(
+        sensor, ifov = altumPT_sensor(
             resolution=resolution,
             truth_bands=truthBands,
             rgb_only=False,
@@ -466,6 +476,7 @@ class ElectroOptical(Node):
         sensorAssets = {
             'sensor': sensor,
             'motion': motion,
+            'ifov': ifov,
             'convert_args': ["--band=0"],
         }
         return {"Sensor": sensorAssets}
\ No newline at end of file
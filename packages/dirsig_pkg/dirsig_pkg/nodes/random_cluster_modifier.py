@@ -24,12 +24,11 @@
 import logging
 from anatools.lib.node import Node
 from anatools.lib.generator import ObjectModifier
-from dirsig_pkg.lib.object import AnaDirsigObject, file_to_objgen
+from dirsig_pkg.lib.object import AnaDirsigObject, file_to_objgen, generator_size
 from dirsig_pkg.lib.utils import array_input
-from dirsig_pkg.lib.spatial_sampling_utils import random_points_in_polygon, hexagon, random_points_in_polygon_with_min_distance
+from dirsig_pkg.lib.spatial_sampling_utils import sample_points_in_polygon, hexagon, random_points_in_polygon_with_min_distance
 import numpy as np
 import anatools.lib.context as ctx
-from dirfm import glist
 
 logger = logging.getLogger(__name__)
 
@@ -41,15 +40,10 @@ def set_static_instances(ana_object, locations, tags=[]):
         tags: A list of tags to apply to the instances. Labels that control object behavior in simulations.
             An example use of an instance tag is to enable LightCurve tracking: https://dirsig.cis.rit.edu/docs/new/lightcurve_plugin.html
     """
-    # Remove any existing instances
-    ana_object.root._instance = []
-
-    # Create a static instance for each location
-    for idx, loc in enumerate(locations):
-        instance = glist.StaticInstance(name=f"{ana_object.name}_{str(idx).zfill(4)}", translation=loc, rotation=[0, 0, ctx.random.random() * 360])
-        for tag in tags:
-            instance.set_tag(tag)
-        ana_object.root.add_instance(instance)
+    # Replace any existing instances with one static instance per location
+    rotations = np.zeros((len(locations), 3))
+    rotations[:, 2] = ctx.random.random(len(locations)) * 360
+    ana_object.set_static_instances(locations, rotations=rotations, tags=tags)
     
     # Collect metadata
     ana_object.modifiers.append({
@@ -79,11 +73,10 @@ class ClusterObjects(Node):
 
         if prevent_overlap:
             # Get the size of each object and find the largest dimension
+            # Sizes come from the generators, so no object is loaded here
             max_dim = 0
-            # Instantiate each object to get its size
-            object_instances = [child.exec() for child in children]
-            for obj in object_instances:
-                size = obj.get_size()
+            for child in children:
+                size = generator_size(child)
                 if size:
                     max_dim = max(max_dim, np.max(size[:2]))
             if max_dim > 0:
@@ -92,9 +85,9 @@ class ClusterObjects(Node):
                 xy_locations = random_points_in_polygon_with_min_distance(poly, n_objects, spacing)
             else:
                 logger.warning("Could not determine object size, placing objects without overlap prevention.")
-                xy_locations = random_points_in_polygon(poly, n_objects)
+                xy_locations = sample_points_in_polygon(poly, n_objects)
         else:
-            xy_locations = random_points_in_polygon(poly, n_objects)
+            xy_locations = sample_points_in_polygon(poly, n_objects)
 
         # Add modifier to the generator tree
         generator = ObjectModifier(
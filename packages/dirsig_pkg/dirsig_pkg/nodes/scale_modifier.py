@@ -29,16 +29,15 @@ logger = logging.getLogger(__name__)
 
 def scale_modifier(ana_object, scale_factors):
     """ AnaObject plugin - Adjust the scale of an object """
-    # Update the scale factors if all this glist object's instances by the input array of 3 floats
-    for objInstance in ana_object.root.get_instances():
-        objInstance.set_scale([objInstance.get_scale()[i]*scale_factors[i] for i in range(3)])
-        
-        # Collect metadata
-        ana_object.modifiers.append({
-            "Scale_N": {
-                "Scale Factors": scale_factors
-            }
-        })
+    # Update the scale factors of all this glist object's instances by the input array of 3 floats
+    ana_object.scale_instances(scale_factors)
+
+    # Collect metadata
+    ana_object.modifiers.append({
+        "Scale_N": {
+            "Scale Factors": scale_factors
+        }
+    })
 
 
 class ScaleObjects(Node):
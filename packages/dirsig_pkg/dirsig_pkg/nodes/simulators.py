@@ -31,6 +31,11 @@ from dirfm.dirsig import DIRSIG
 import dirfm.platform_sensor as ps
 from dirfm.utilities.annotations import AnnotationsMetadata
 from dirsig_pkg.lib.mask import mask_to_annotation
+from dirsig_pkg.lib.lod import estimate_gsd, resolve_lod
+from dirsig_pkg.lib.preflight import preflight
+from dirsig_pkg.lib.scene_stats import SceneStatistics, available_memory
+from dirsig_pkg.lib.staging import prune_staged_assets, wait_for_prefetch
+from dirsig_pkg.lib.workspace import close_run_workspace, run_workspace
 from spectral import open_image
 
 logger = logging.getLogger(__name__)
@@ -42,8 +47,17 @@ class Simulate(Node):
     def exec(self):
         logger.info("Executing {}".format(self.name))
 
-        inPath = Path("/tmp/dirsig_input")
-        outPath = Path("/tmp/dirsig_output")
+        try:
+            return self._simulate()
+        finally:
+            # The run ends here; drop its scene, input and output files
+            close_run_workspace()
+            prune_staged_assets()
+
+    def _simulate(self):
+        workspace = run_workspace()
+        inPath = workspace.path("dirsig_input")
+        outPath = workspace.path("dirsig_output")
         dirsig = DIRSIG(inPath, outPath)
         dirsig.set_seed(ctx.seed)
 
@@ -133,14 +147,42 @@ class Simulate(Node):
 
         sceneMetadata['atmosphere'] = atm.get_metadata()
 
-        # Run the simulation
+        # Scene assets prefetched by the background nodes must be in place
+        wait_for_prefetch()
+
+        # Pick mesh levels of detail for the sensor's ground sample distance
+        gsd = estimate_gsd(platform_assets, ground_altitude=sceneBundle.get("altitude", 0.0))
+        resolve_lod(gsd)
+
+        # Fail fast, with the full list, if any scene file is missing or empty
+        preflight(sceneObjects, platformObject, atm)
+
+        # Size the render to the scene: as many threads (then path nodes) as fit in RAM
         if "debug" in ctx.output:
-            dirsig.run(log_level="debug", convergence="10,10,0", max_nodes="1")
+            runArgs = {"log_level": "debug", "convergence": "10,10,0"}
+            maxNodes = 1
         elif ctx.preview:
-            dirsig.run(convergence="3,3,0", max_nodes="1")
+            runArgs = {"convergence": "3,3,0"}
+            maxNodes = 1
         else:
-            dirsig.run(convergence="20,100,1e-6", max_nodes="4") #default
-            #dirsig.run(convergence="30,500,1e-6", max_nodes="5") #better
+            runArgs = {"convergence": "20,100,1e-6"} #default
+            maxNodes = 4
+            #runArgs, maxNodes = {"convergence": "30,500,1e-6"}, 5 #better
+        sceneStats = SceneStatistics.collect(sceneObjects, platformObject, atm)
+        memory = available_memory()
+        threads, maxNodes = sceneStats.plan(maxNodes, memory)
+        sceneStats.write(
+            Path(ctx.output) / "scene_stats" / f"{ctx.interp_num:010}-scene_stats.json",
+            threads=threads, max_nodes=maxNodes, memory=memory,
+        )
+        logger.info(
+            f"Scene has {sceneStats.triangles} triangles, {sceneStats.instances} instances and "
+            f"{sceneStats.texture_bytes / 2**20:.0f} MiB of textures; rendering with {threads} threads, "
+            f"max_nodes={maxNodes} (estimated {sceneStats.estimate_memory(threads, maxNodes) / 2**30:.1f} GiB)"
+        )
+
+        # Run the simulation
+        dirsig.run(max_nodes=str(maxNodes), threads=str(threads), **runArgs)
 
         #Process radiance measurements and collcted truth        
         for instruments in platformObject.get_instruments().values():